@@ -0,0 +1,214 @@
+"""
+batch_crawl.py
+Crawl many court complexes over a date range in one process, with checkpointing.
+
+Every (complex URL, date) pair is one job; a line naming "State | District | Complex"
+instead of a URL is resolved through the cached court directory (court_directory.py).
+Jobs share the pooled HTTP sessions and the headless browser pool. Each job fetches its
+page ({date} substituted) and drops it once its PDFs are downloaded, so only the current
+page is held however long the date range. With --use-selenium --browsers N, the pages of
+the next N jobs render in parallel on N pooled browsers while the current job downloads. A URL without {date} only serves the live
+(today's) board, so it is crawled for today alone; other dates are skipped for it.
+Progress is checkpointed to <out>/batch_checkpoint.json after every job, so a rerun after
+a crash skips jobs that already finished. A run report with per-job status and timing is
+written to <out>/batch_report_<timestamp>.json.
+
+Usage:
+  (venv) python batch_crawl.py --urls-file complexes.txt --from 2025-10-01 --to 2025-10-19
+  (venv) python batch_crawl.py --urls-file complexes.txt --from 2025-10-19 --to 2025-10-19 --use-selenium
+  (venv) python batch_crawl.py --urls-file complexes.txt --from 2025-10-01 --to 2025-10-19 --use-selenium --browsers 4
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from dateutil import parser as dateparser
+
+from court_directory import DirectoryError, default_directory, parse_location
+from download_all_judges import download_judges, fetch_soup
+from downloader import DEFAULT_WORKERS
+from rate_control import host_stats, print_host_stats
+
+CHECKPOINT_NAME = "batch_checkpoint.json"
+
+def load_urls(path):
+    """
+    One complex URL, or "State | District | Complex" (resolved through court_directory.py),
+    per line; blank lines and lines starting with '#' are ignored.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        lines = [ln.strip() for ln in fh if ln.strip() and not ln.lstrip().startswith("#")]
+    urls = []
+    for ln in lines:
+        location = parse_location(ln)
+        if location:
+            r = default_directory().resolve(*location)
+            print(f"[+] {r['state']} / {r['district']} / {r['complex']} -> {r['url']}")
+            urls.append(r["url"])
+        else:
+            urls.append(ln)
+    return urls
+
+def date_range(start, end):
+    d = dateparser.parse(start).date()
+    last = dateparser.parse(end).date()
+    while d <= last:
+        yield d.strftime("%Y-%m-%d")
+        d += timedelta(days=1)
+
+def job_key(url, date_str):
+    return f"{url}|{date_str}"
+
+class Checkpoint:
+    """Job status persisted as JSON after every update."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                self.jobs = json.load(fh)
+        except (OSError, ValueError):
+            self.jobs = {}
+
+    def is_done(self, key):
+        return self.jobs.get(key, {}).get("status") == "done"
+
+    def record(self, key, **fields):
+        self.jobs[key] = fields
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.jobs, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+def plan_jobs(urls, dates, today=None):
+    """
+    (url, date) jobs. A URL without a {date} placeholder always returns the live board, so
+    it only gets a job for today (and none when today is outside `dates`).
+    """
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    jobs = []
+    for u in urls:
+        if "{date}" in u:
+            jobs += [(u, d) for d in dates]
+            continue
+        if dates != [today]:
+            which = "today only" if today in dates else "skipped: today is not in the date range"
+            print(f"  ! no {{date}} in {u}; its page only shows the current board, {which}")
+        if today in dates:
+            jobs.append((u, today))
+    return jobs
+
+def run_batch(urls, dates, out="outputs", use_selenium=False, workers=DEFAULT_WORKERS, retry_failed=True,
+              packed=False, browsers=None):
+    """
+    Run every (url, date) job not already done in the checkpoint. Returns the per-job report.
+    With `use_selenium`, the browser pool renders up to `browsers` (default $ECOURTS_BROWSERS)
+    job pages at once, ahead of their jobs.
+    """
+    os.makedirs(out, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(out, CHECKPOINT_NAME))
+    report = []
+    jobs = plan_jobs(urls, dates)
+    print(f"[+] {len(jobs)} job(s) for {len(urls)} complex(es) over {len(dates)} date(s)")
+
+    def skip(key):
+        prev = checkpoint.jobs.get(key, {})
+        return checkpoint.is_done(key) or (prev.get("status") == "failed" and not retry_failed)
+
+    skipped = {job_key(url, date_str) for url, date_str in jobs if skip(job_key(url, date_str))}
+    todo = [(url, date_str) for url, date_str in jobs if job_key(url, date_str) not in skipped]
+    ahead = 1
+    if use_selenium:
+        from browser_pool import get_pool
+        ahead = get_pool(size=browsers).size
+    fetches = {}
+
+    def prefetch(i, fetcher):
+        # Job i's page plus the next ones: at most `ahead` pages fetched or held at a time.
+        for url, date_str in todo[i:i + ahead]:
+            key = job_key(url, date_str)
+            if key not in fetches:
+                fetches[key] = fetcher.submit(fetch_soup, url.replace("{date}", date_str), use_selenium=use_selenium)
+
+    i = 0
+    with ThreadPoolExecutor(max_workers=ahead) as fetcher:
+        for n, (url, date_str) in enumerate(jobs, start=1):
+            key = job_key(url, date_str)
+            if key in skipped:
+                report.append(dict(checkpoint.jobs.get(key, {}), url=url, date=date_str, skipped=True))
+                continue
+            prefetch(i, fetcher)
+            i += 1
+            print(f"[*] Job {n}/{len(jobs)}: {url} @ {date_str}")
+            t0 = time.perf_counter()
+            started = datetime.now().isoformat(timespec="seconds")
+            try:
+                soup, final_url = fetches.pop(key).result()
+                out_folder, results = download_judges(soup, final_url, date_str, out=out, workers=workers,
+                                                       packed=packed)
+                del soup
+                entry = {"status": "done", "pdfs": len(results), "out_folder": out_folder}
+            except Exception as e:
+                print(f"  ! job failed: {e}")
+                entry = {"status": "failed", "error": str(e)}
+            entry.update(started=started, seconds=round(time.perf_counter() - t0, 3))
+            checkpoint.record(key, **entry)
+            report.append(dict(entry, url=url, date=date_str, skipped=False))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch crawl court complexes over a date range")
+    parser.add_argument("--urls-file", required=True,
+                        help="File with one court complex URL ({date} is substituted; URLs without it are crawled "
+                             "for today only) or 'State | District | Complex' per line")
+    parser.add_argument("--from", dest="date_from", help="First date YYYY-MM-DD (default today)")
+    parser.add_argument("--to", dest="date_to", help="Last date YYYY-MM-DD (default: same as --from)")
+    parser.add_argument("--out", default="outputs", help="Output folder")
+    parser.add_argument("--use-selenium", action="store_true", help="Render complex pages with the shared browser pool")
+    parser.add_argument("--browsers", type=int, default=None,
+                        help="With --use-selenium: headless browsers rendering upcoming job pages in parallel "
+                             "(default: $ECOURTS_BROWSERS or 1)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent PDF downloads per job")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry jobs that failed in an earlier run")
+    parser.add_argument("--packed", action="store_true", help="Store PDFs in the deduplicated pack store under <out>/blobs/")
+    args = parser.parse_args()
+
+    date_from = args.date_from or datetime.now().strftime("%Y-%m-%d")
+    dates = list(date_range(date_from, args.date_to or date_from))
+    try:
+        urls = load_urls(args.urls_file)
+    except DirectoryError as e:
+        parser.error(str(e))
+    except requests.RequestException as e:
+        parser.error(f"could not fetch the court directory from the eCourts portal: {e}")
+    t0 = time.perf_counter()
+    report = run_batch(urls, dates, out=args.out, use_selenium=args.use_selenium,
+                       workers=args.workers, retry_failed=not args.skip_failed, packed=args.packed,
+                       browsers=args.browsers)
+
+    report_path = os.path.join(args.out, f"batch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    summary = {
+        "total_seconds": round(time.perf_counter() - t0, 3),
+        "done": sum(1 for r in report if r.get("status") == "done"),
+        "failed": sum(1 for r in report if r.get("status") == "failed"),
+        "skipped": sum(1 for r in report if r.get("skipped")),
+        "hosts": host_stats(),
+        "jobs": report,
+    }
+    with open(report_path, "w", encoding="utf-8") as fh:
+        json.dump(summary, fh, ensure_ascii=False, indent=2)
+
+    for r in report:
+        state = "skip" if r.get("skipped") else r.get("status", "?")
+        print(f"  {state:6} {r.get('seconds', 0):8.2f}s  {r['date']}  {r['url']}")
+    print_host_stats()
+    print(f"[+] Done: {summary['done']} done, {summary['failed']} failed, {summary['skipped']} skipped "
+          f"in {summary['total_seconds']:.1f}s. Report: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+benchmark.py
+Offline end-to-end benchmark of the scraper pipeline against a local stand-in eCourts server.
+
+Synthetic cause-list PDFs (court header, serial / case / CNR / parties / advocate columns)
+are generated with PyMuPDF together with a cause-list HTML page linking them. They are
+served from a local HTTP server that can inject per-request latency and a bandwidth cap.
+Each stage is then timed: page fetch, link extraction, cold and conditional (warm)
+downloads, text extraction, filling the text cache, and the searches the CLI runs over it
+(pdf_search.search_pdf for a CNR, a case number and a party name, search_pdf_multi for a
+watchlist), then heuristics parsing. The text cache lives in the benchmark's temp folder.
+Results are written as JSON; pass --compare with an earlier result to see the ratios.
+
+Usage:
+  (venv) python benchmark.py --judges 20 --pages 30 --out-json bench.json
+  (venv) python benchmark.py --latency-ms 150 --throttle-kbps 2000 --compare bench.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+from email.utils import formatdate
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz
+
+CASE_TYPES = ("CS", "C.S. No.", "CR Cases", "Bail Matters", "Ct Cases", "MACT", "CA", "Execution")
+NAMES = ("Ram Lal", "Shyam Sunder", "State", "Mohan Kumar", "Sita Devi", "Union of India", "Ravi Verma", "DDA")
+ADVOCATES = ("A. Sharma", "B. Gupta", "C. Singh", "D. Khan", "E. Jain")
+
+def make_cnr(rng):
+    return "DLND01" + "".join(rng.choice("0123456789") for _ in range(6)) + str(rng.randint(2000, 2025))
+
+def make_board_pdf(path, judge_no, pages, rows_per_page, rng):
+    """Write one judge's synthetic cause list and return the (CNR, case number) rows it lists."""
+    doc = fitz.open()
+    listed = []
+    serial = 0
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_text((120, 40), f"IN THE COURT OF SH. JUDGE {judge_no}, ASJ-{judge_no:02d}, NEW DELHI", fontsize=10)
+        y = 70
+        for _ in range(rows_per_page):
+            serial += 1
+            cnr = make_cnr(rng)
+            case = f"{rng.choice(CASE_TYPES)} {rng.randint(1, 9999)}/{rng.randint(2015, 2025)}"
+            listed.append((cnr, case))
+            parties = f"{rng.choice(NAMES)} vs {rng.choice(NAMES)}"
+            page.insert_text((30, y), str(serial), fontsize=8)
+            page.insert_text((60, y), case, fontsize=8)
+            page.insert_text((200, y), parties, fontsize=8)
+            page.insert_text((420, y), f"Adv. {rng.choice(ADVOCATES)}", fontsize=8)
+            page.insert_text((60, y + 10), cnr, fontsize=8)
+            y += 24
+    doc.save(path)
+    doc.close()
+    return listed
+
+def generate_site(root, judges, pages, rows_per_page, seed=1):
+    """Create <root>/judge_<n>.pdf files plus <root>/index.html. Returns all listed (CNR, case number) rows."""
+    rng = random.Random(seed)
+    listed = []
+    rows = []
+    for j in range(1, judges + 1):
+        name = f"judge_{j}.pdf"
+        listed += make_board_pdf(os.path.join(root, name), j, pages, rows_per_page, rng)
+        rows.append(f'<tr><td>{j}</td><td>Court of Judge {j}</td><td><a href="/{name}">Cause list - Judge {j}</a></td></tr>')
+    with open(os.path.join(root, "index.html"), "w", encoding="utf-8") as fh:
+        fh.write("<html><body><h1>Daily Board</h1><table>" + "".join(rows) + "</table></body></html>")
+    return listed
+
+def make_handler(root, latency_ms, throttle_kbps):
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, directory=root, **kw)
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000.0)
+            path = self.translate_path(self.path)
+            if not os.path.isfile(path):
+                return super().do_GET()
+            with open(path, "rb") as fh:
+                body = fh.read()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(os.path.getmtime(path), usegmt=True))
+            self.end_headers()
+            chunk = 16 * 1024
+            for i in range(0, len(body), chunk):
+                self.wfile.write(body[i:i + chunk])
+                if throttle_kbps:
+                    time.sleep(chunk / (throttle_kbps * 1024.0))
+    return Handler
+
+def start_server(root, latency_ms=0, throttle_kbps=0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(root, latency_ms, throttle_kbps))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/index.html"
+
+def timed(repeat, fn):
+    """Run `fn` `repeat` times; return (median_seconds, all_runs, last_result)."""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs), runs, result
+
+def run_benchmarks(args):
+    work = tempfile.mkdtemp(prefix="ecourts-bench-")
+    # Read by text_cache at import time: time a cache of our own, not the user's.
+    os.environ["ECOURTS_TEXT_CACHE"] = os.path.join(work, "text_cache.sqlite")
+    from downloader import download_many
+    from ecourts_scraper import fetch_soup_requests
+    from html_parse import CauseListPage
+    from multi_match import AhoCorasick
+    from pdf_search import heuristics_parse, key_queries_for, search_pdf, search_pdf_multi
+    from text_cache import extract_pages, iter_keyed_page_texts
+
+    site, dl = os.path.join(work, "site"), os.path.join(work, "dl")
+    os.makedirs(site)
+    stages = {}
+
+    def record(name, seconds, runs, **metrics):
+        stages[name] = dict(seconds=round(seconds, 6), runs=[round(r, 6) for r in runs], **metrics)
+        extra = "  ".join(f"{k}={v}" for k, v in metrics.items())
+        print(f"  {name:22} {seconds * 1000:10.1f} ms  {extra}")
+
+    try:
+        t0 = time.perf_counter()
+        listed = generate_site(site, args.judges, args.pages, args.rows, seed=args.seed)
+        cnrs = [cnr for cnr, _ in listed]
+        # Civil suits, to be searched for in another spelling ("CS 12/2020" as "civil suit 12 of 2020").
+        suits = [case.split()[-1].split("/") for _, case in listed if case.startswith(("CS ", "C.S. "))] or [("1", "2020")]
+        corpus_bytes = sum(os.path.getsize(os.path.join(site, f)) for f in os.listdir(site) if f.endswith(".pdf"))
+        print(f"[+] Generated {args.judges} PDFs ({corpus_bytes / 1e6:.1f} MB, {len(cnrs)} rows) "
+              f"in {time.perf_counter() - t0:.1f}s")
+        server, url = start_server(site, args.latency_ms, args.throttle_kbps)
+
+        sec, runs, (soup, final_url) = timed(args.repeat, lambda: fetch_soup_requests(url))
+        record("page_fetch", sec, runs)
+        sec, runs, page = timed(args.repeat, lambda: CauseListPage(soup, final_url))
+        record("link_extraction", sec, runs, links=len(page.pdf_links), rows=len(page.rows))
+
+        def cold_download():
+            shutil.rmtree(dl, ignore_errors=True)
+            return download_many(page.pdf_links, dl, workers=args.workers, desc="bench")
+        sec, runs, res = timed(args.repeat, cold_download)
+        record("download_cold", sec, runs, files=len(res), mb_per_s=round(corpus_bytes / 1e6 / sec, 2))
+        sec, runs, res = timed(args.repeat, lambda: download_many(page.pdf_links, dl, workers=args.workers, desc="bench"))
+        record("download_conditional", sec, runs, files=len(res))
+
+        pdfs = sorted(os.path.join(dl, f) for f in os.listdir(dl) if f.endswith(".pdf"))
+        sec, runs, _ = timed(args.repeat, lambda: [extract_pages(p) for p in pdfs])
+        total_pages = args.judges * args.pages
+        record("text_extraction", sec, runs, pages=total_pages, pages_per_s=round(total_pages / sec, 1))
+        # Once: the first read extracts the text and builds each page's case-key map.
+        sec, runs, _ = timed(1, lambda: [list(iter_keyed_page_texts(p)) for p in pdfs])
+        record("text_cache_fill", sec, runs, pages=total_pages)
+
+        def search_all(query):
+            return sum(search_pdf(p, query)["num_hits"] for p in pdfs)
+
+        rng = random.Random(args.seed + 1)
+        for name, query in (("search_single", rng.choice(cnrs)),
+                            ("search_case_number", "civil suit {} of {}".format(*rng.choice(suits))),
+                            ("search_party", f"{rng.choice(NAMES)} vs {rng.choice(NAMES)}")):
+            sec, runs, hits = timed(args.repeat, lambda: search_all(query))
+            record(name, sec, runs, hits=hits)
+
+        queries = rng.sample(cnrs, min(args.batch_queries, len(cnrs)))
+        automaton = AhoCorasick(queries)
+        key_queries = key_queries_for(automaton.patterns)
+        sec, runs, found = timed(args.repeat, lambda: [r for p in pdfs for r in search_pdf_multi(p, automaton, True,
+                                                                                                  key_queries)])
+        record("search_batch", sec, runs, queries=len(queries), matched=len(found))
+
+        snippets = [h["snippet"] for r in found for h in r["hits"]]
+        sec, runs, _ = timed(args.repeat, lambda: [heuristics_parse(s) for s in snippets])
+        record("heuristics_parse", sec, runs, snippets=len(snippets))
+        server.shutdown()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("out_json", "compare")},
+        },
+        "stages": stages,
+    }
+
+def compare(current, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    print(f"[*] Compared with {baseline_path} ({baseline['meta']['timestamp']}); ratio > 1 means slower now")
+    for name, stage in current["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if old and old["seconds"]:
+            print(f"  {name:22} {stage['seconds'] / old['seconds']:6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the cause-list pipeline")
+    parser.add_argument("--judges", type=int, default=12, help="Number of judge PDFs")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per PDF")
+    parser.add_argument("--rows", type=int, default=28, help="Case rows per page")
+    parser.add_argument("--batch-queries", type=int, default=2000, help="Watchlist size for the batch search stage")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Injected server latency per request")
+    parser.add_argument("--throttle-kbps", type=int, default=0, help="Server bandwidth cap per response (KiB/s)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (median is reported)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out-json", default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    print("[*] Running benchmarks ...")
+    results = run_benchmarks(args)
+    with open(args.out_json, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, ensure_ascii=False, indent=2)
+    print("[+] Results saved to", args.out_json)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+blob_store.py
+Content-addressed, deduplicated storage for downloaded PDFs: sha256 -> blob.
+
+Blobs are appended to packed segment files (<out>/blobs/seg-000001.pack, ...) and found
+through an SQLite index (<out>/blobs/index.sqlite: sha256 -> segment, offset, length, codec).
+A board published again under another date, site or URL is stored once. Blobs that deflate
+well are kept zlib-compressed, the rest raw; raw blobs are read through a read-only mmap
+of their segment, so readers get a memoryview instead of a copy.
+
+Downloaders write into the store with --packed (downloader.download_many(store=...)). A
+packed PDF keeps its usual path outputs/<site>/<date>/<name>.pdf as its identity but has
+no loose file; the folder's manifest.json records its blob id. pdf_data(), list_pdfs()
+and friends resolve such paths, so text and row extraction, searches, the index and the
+watchlist read packed and loose PDFs alike.
+
+Usage:
+  (venv) python blob_store.py --out outputs pack      # move existing loose PDFs into the store
+  (venv) python blob_store.py --out outputs stats
+  (venv) python blob_store.py --out outputs verify
+  (venv) python blob_store.py --out outputs export "outputs/<site>/<date>/<name>.pdf" copy.pdf
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+BLOB_DIR = "blobs"
+MANIFEST_NAME = "manifest.json"  # downloader.MANIFEST_NAME; not imported to keep readers light
+SEGMENT_SIZE = 256 * 1024 * 1024
+# Keep the compressed form only when it saves at least this fraction of the size.
+MIN_SAVING = 0.1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    codec TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+"""
+
+class BlobStore:
+    def __init__(self, root, segment_size=SEGMENT_SIZE, compress=True):
+        self.root = root
+        self.segment_size = segment_size
+        self.compress = compress
+        os.makedirs(root, exist_ok=True)
+        # One connection shared by this process's threads (guarded by _lock); isolation_level=None
+        # so put() can take the cross-process write lock itself with BEGIN IMMEDIATE.
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite"), timeout=60,
+                                    isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._maps = {}
+
+    def close(self):
+        self.conn.close()
+
+    def segment_path(self, segment):
+        return os.path.join(self.root, f"seg-{segment:06d}.pack")
+
+    def _row(self, sha256):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT segment, offset, length, size, codec FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+
+    def has(self, sha256):
+        return self._row(sha256) is not None
+
+    def _encode(self, data):
+        if self.compress:
+            packed = zlib.compress(data, 6)
+            if len(packed) <= (1 - MIN_SAVING) * len(data):
+                return "zlib", packed
+        return "raw", data
+
+    def put(self, data):
+        """Store `data` unless a blob with the same sha256 exists. Returns (sha256, newly_stored)."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        if self.has(sha256):
+            return sha256, False
+        codec, payload = self._encode(bytes(data))
+        with self._lock:
+            # Serializes writers across processes: segment appends and index rows stay in step.
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone():
+                    self.conn.execute("ROLLBACK")
+                    return sha256, False
+                segment = self.conn.execute("SELECT COALESCE(MAX(segment), 1) FROM blobs").fetchone()[0]
+                path = self.segment_path(segment)
+                if os.path.exists(path) and os.path.getsize(path) + len(payload) > self.segment_size:
+                    segment += 1
+                    path = self.segment_path(segment)
+                with open(path, "ab") as fh:
+                    # The real end of file: bytes of an append cut off by a crash are simply skipped.
+                    offset = fh.seek(0, os.SEEK_END)
+                    fh.write(payload)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                self.conn.execute("INSERT INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (sha256, segment, offset, len(payload), len(data), codec, time.time()))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return sha256, True
+
+    def _map(self, segment, end):
+        """Read-only mmap of a segment covering at least `end` bytes (remapped after appends)."""
+        with self._lock:
+            mm = self._maps.get(segment)
+            if mm is None or len(mm) < end:
+                with open(self.segment_path(segment), "rb") as fh:
+                    mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                # An older, shorter map is dropped, not closed: readers may still hold views of it.
+                self._maps[segment] = mm
+            return mm
+
+    def get(self, sha256):
+        """The blob's bytes: a memoryview into the mapped segment for raw blobs, bytes otherwise."""
+        row = self._row(sha256)
+        if row is None:
+            raise KeyError(sha256)
+        segment, offset, length, size, codec = row
+        view = memoryview(self._map(segment, offset + length))[offset:offset + length]
+        if codec == "zlib":
+            return zlib.decompress(view)
+        return view
+
+    def iter_blobs(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT sha256, segment, length, size, codec FROM blobs").fetchall()
+        yield from rows
+
+    def verify(self):
+        """sha256 of every blob whose content no longer matches its id."""
+        return [sha for sha, *_ in self.iter_blobs() if hashlib.sha256(self.get(sha)).hexdigest() != sha]
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def open_store(out_root):
+    """The (per-process, shared) store under <out_root>/blobs/."""
+    root = os.path.abspath(os.path.join(out_root, BLOB_DIR))
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = BlobStore(root)
+        return store
+
+def reset_stores():
+    """Forget inherited stores; call in a freshly forked child process."""
+    global _stores
+    _stores = {}
+
+_manifests = {}
+
+def _manifest(folder):
+    """A folder's manifest.json entries, re-read only when the file changes."""
+    path = os.path.join(folder, MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _manifests.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            entries = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    _manifests[path] = (mtime, entries)
+    return entries
+
+def packed_entry(pdf_path):
+    """Manifest entry of a packed PDF (no loose file, blob recorded), else None."""
+    if os.path.exists(pdf_path):
+        return None
+    folder, fname = os.path.split(os.path.abspath(pdf_path))
+    entry = _manifest(folder).get(fname)
+    return entry if entry and entry.get("blob") else None
+
+def packed_sha256(pdf_path):
+    entry = packed_entry(pdf_path)
+    return entry["blob"] if entry else None
+
+def pdf_data(pdf_path):
+    """
+    Content of a packed PDF, read from <out>/blobs/ (<out>/<site>/<date>/<name>.pdf layout),
+    or None when `pdf_path` is not packed and should be opened as a file.
+    """
+    entry = packed_entry(pdf_path)
+    if entry is None:
+        return None
+    out_root = Path(pdf_path).resolve().parents[2]
+    return open_store(out_root).get(entry["blob"])
+
+def pdf_mtime(pdf_path):
+    """Modification time of a loose PDF, or when a packed PDF's current blob was stored."""
+    entry = packed_entry(pdf_path)
+    return entry["stored_at"] if entry else os.path.getmtime(pdf_path)
+
+def list_pdfs(folder):
+    """Sorted paths of every PDF in `folder`, loose files and packed entries alike."""
+    folder = Path(folder)
+    pdfs = set(folder.glob("*.pdf"))
+    for fname, entry in _manifest(str(folder)).items():
+        if entry.get("blob") and fname.lower().endswith(".pdf"):
+            pdfs.add(folder / fname)
+    return sorted(pdfs)
+
+def iter_date_folders(out_root):
+    """<out>/<site>/<date>/ folders (the blob store itself is skipped)."""
+    if not os.path.isdir(out_root):
+        return
+    for site in sorted(Path(out_root).iterdir()):
+        if site.is_dir() and site.name != BLOB_DIR:
+            for date in sorted(site.iterdir()):
+                if date.is_dir():
+                    yield date
+
+def pack_folder(store, folder):
+    """Move a date folder's loose PDFs into the store; returns (packed, newly_stored_bytes)."""
+    from downloader import Manifest
+    manifest = Manifest(str(folder))
+    packed = stored = 0
+    for pdf in sorted(Path(folder).glob("*.pdf")):
+        data = pdf.read_bytes()
+        sha256, new = store.put(data)
+        if hashlib.sha256(store.get(sha256)).hexdigest() != sha256:
+            raise RuntimeError(f"blob {sha256} does not read back correctly; {pdf} left in place")
+        manifest.update(pdf.name, blob=sha256, sha256=sha256, size=len(data), partial=False, stored_at=time.time())
+        os.remove(pdf)
+        packed += 1
+        stored += len(data) if new else 0
+    return packed, stored
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed pack store for downloaded PDFs")
+    parser.add_argument("--out", default="outputs", help="Outputs folder containing <site>/<date>/ and blobs/")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("pack", help="Move loose PDFs under --out into the store")
+    sub.add_parser("stats", help="Blob count, logical vs stored bytes")
+    sub.add_parser("verify", help="Re-hash every blob")
+    ex = sub.add_parser("export", help="Write a packed PDF back out as a file")
+    ex.add_argument("pdf", help="Path of the PDF as listed in the outputs (outputs/<site>/<date>/<name>.pdf)")
+    ex.add_argument("dest")
+    args = parser.parse_args()
+
+    store = open_store(args.out)
+    if args.command == "pack":
+        total = new_bytes = 0
+        for folder in iter_date_folders(args.out):
+            n, b = pack_folder(store, folder)
+            if n:
+                print(f"  -> packed {n} PDF(s) from {folder}")
+            total += n
+            new_bytes += b
+        print(f"[+] {total} PDF(s) packed; {new_bytes / 1e6:.1f} MB of new content stored.")
+    elif args.command == "stats":
+        blobs = list(store.iter_blobs())
+        refs = logical = 0
+        for folder in iter_date_folders(args.out):
+            for entry in _manifest(str(folder)).values():
+                if entry.get("blob"):
+                    refs += 1
+                    logical += entry.get("size") or 0
+        stored = sum(b[2] for b in blobs)
+        print(f"[+] {len(blobs)} blob(s) in {len({b[1] for b in blobs})} segment(s), referenced by {refs} PDF(s)")
+        print(f"[+] {logical / 1e6:.1f} MB referenced, {sum(b[3] for b in blobs) / 1e6:.1f} MB unique, "
+              f"{stored / 1e6:.1f} MB on disk ({sum(1 for b in blobs if b[4] == 'zlib')} compressed)")
+    elif args.command == "verify":
+        bad = store.verify()
+        for sha in bad:
+            print("  ! corrupt blob", sha)
+        print(f"[+] {len(list(store.iter_blobs())) - len(bad)} blob(s) OK, {len(bad)} corrupt.")
+    else:
+        data = pdf_data(args.pdf)
+        if data is None:
+            raise SystemExit(f"{args.pdf} is not a packed PDF")
+        with open(args.dest, "wb") as fh:
+            fh.write(data)
+        print("[+] Written to", args.dest)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+browser_pool.py
+Long-lived pool of headless Chrome drivers for rendering cause-list pages.
+
+Drivers are started once, when the pool is created, and reused for every page instead of
+launching Chrome per URL.
+The chromedriver binary path from webdriver_manager is cached on disk so later runs skip
+the version lookup. Pages are handed back as soon as the cause list itself has rendered
+(explicit wait) rather than after a fixed sleep: a PDF link or iframe, or a table row
+naming a case number or CNR. Any table cell is not enough, since portal pages are laid
+out in tables before the list arrives.
+
+Pool size: $ECOURTS_BROWSERS (default 1); batch_crawl.py --browsers N renders N pages at once.
+
+Usage (from another script):
+  from browser_pool import get_pool
+  html, final_url = get_pool().fetch(url, timeout=15)
+"""
+
+import atexit
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from case_keys import iter_keys
+
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "ecourts-scraper", "chromedriver_path")
+DEFAULT_TIMEOUT = 15
+DEFAULT_SIZE = int(os.environ.get("ECOURTS_BROWSERS", "1"))
+# Seconds between checks for a driver given back (or discarded) by another thread.
+BORROW_POLL = 0.5
+
+# A PDF link or iframe means the cause list has rendered ("i": any case of ".pdf").
+READY_SELECTORS = (
+    "a[href*='.pdf' i]",
+    "iframe[src*='.pdf' i]",
+)
+# Otherwise the table rows' text, checked for a case number or CNR.
+_ROW_TEXT_JS = "return Array.from(document.querySelectorAll('table tr'), r => r.innerText).join('\\n');"
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def chromedriver_path():
+    """Path of the chromedriver binary, resolved through webdriver_manager at most once."""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+        try:
+            with open(DRIVER_PATH_CACHE, "r", encoding="utf-8") as fh:
+                cached = fh.read().strip()
+        except OSError:
+            cached = ""
+        if cached and os.path.exists(cached):
+            _driver_path = cached
+            return _driver_path
+        from webdriver_manager.chrome import ChromeDriverManager
+        _driver_path = ChromeDriverManager().install()
+        os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+        with open(DRIVER_PATH_CACHE, "w", encoding="utf-8") as fh:
+            fh.write(_driver_path)
+        return _driver_path
+
+def make_driver(headless=True, block_images=True):
+    opts = webdriver.ChromeOptions()
+    if headless:
+        opts.add_argument("--headless=new")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--no-sandbox")
+    if block_images:
+        opts.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return webdriver.Chrome(service=Service(chromedriver_path()), options=opts)
+
+def cause_list_ready(driver):
+    """True once the page links a PDF or a table row names a case number / CNR."""
+    if driver.find_elements(By.CSS_SELECTOR, ", ".join(READY_SELECTORS)):
+        return True
+    return next(iter_keys(driver.execute_script(_ROW_TEXT_JS) or ""), None) is not None
+
+def wait_until_ready(driver, timeout=DEFAULT_TIMEOUT):
+    """Block until the cause list has rendered (see cause_list_ready). Returns False on timeout."""
+    try:
+        WebDriverWait(driver, timeout, ignored_exceptions=(JavascriptException, StaleElementReferenceException)).until(
+            cause_list_ready
+        )
+        return True
+    except TimeoutException:
+        return False
+
+class DriverPool:
+    """Bounded pool of warmed Chrome drivers; safe to share between threads."""
+
+    def __init__(self, size=1, headless=True, warm=True):
+        self.size = max(1, size)
+        self.headless = headless
+        self._idle = queue.Queue()
+        self._all = []
+        # Drivers running or being started; a slot is taken under the lock before Chrome starts.
+        self._count = 0
+        self._lock = threading.Lock()
+        if warm:
+            self.warm()
+
+    def warm(self):
+        """
+        Start drivers (in parallel) until the pool holds `size` of them. If any fails to
+        start, the ones that did are quit again and the error is raised.
+        """
+        with self._lock:
+            n = self.size - self._count
+            self._count += max(0, n)
+        if n <= 0:
+            return
+        started, error = [], None
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            for f in [ex.submit(self._start) for _ in range(n)]:
+                try:
+                    started.append(f.result())
+                except BaseException as e:
+                    error = error or e
+        if error is not None:
+            for d in started:
+                self._discard(d)
+            raise error
+        for d in started:
+            self._idle.put(d)
+
+    def resize(self, size):
+        """Raise the pool's size; the extra drivers start on demand."""
+        with self._lock:
+            self.size = max(self.size, size)
+
+    def _reserve(self):
+        """Take a slot for a new driver if the pool is below its size."""
+        with self._lock:
+            if self._count >= self.size:
+                return False
+            self._count += 1
+            return True
+
+    def _start(self):
+        """Start a driver in a slot already counted in _count (given back if Chrome fails to start)."""
+        try:
+            driver = make_driver(headless=self.headless)
+        except BaseException:
+            with self._lock:
+                self._count -= 1
+            raise
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver, starting a new one while the pool is below its size."""
+        d = self._borrow()
+        try:
+            yield d
+        except Exception:
+            # A driver that raised may be wedged; replace it rather than return it.
+            self._discard(d)
+            raise
+        else:
+            self._idle.put(d)
+
+    def _borrow(self):
+        """
+        An idle driver, or a new one while the pool is below its size. Waits in short steps,
+        since a driver discarded by another thread frees a slot without ever becoming idle.
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._reserve():
+                return self._start()
+            try:
+                return self._idle.get(timeout=BORROW_POLL)
+            except queue.Empty:
+                continue
+
+    def _discard(self, d):
+        with self._lock:
+            if d in self._all:
+                self._all.remove(d)
+                self._count -= 1
+        try:
+            d.quit()
+        except Exception:
+            pass
+
+    def fetch(self, url, timeout=DEFAULT_TIMEOUT):
+        """Render `url` and return (page_source, current_url) once the cause list is ready."""
+        with self.driver() as d:
+            d.get(url)
+            if not wait_until_ready(d, timeout):
+                print(f"  ! page not ready after {timeout}s, using what has rendered: {url}")
+            return d.page_source, d.current_url
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+            self._count -= len(drivers)
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool(size=None, headless=True):
+    """
+    Process-wide pool of `size` drivers (default $ECOURTS_BROWSERS), created (and warmed)
+    on first use and closed at exit. A later call asking for more drivers grows the pool;
+    asking for a different headless mode is an error.
+    """
+    global _pool
+    size = size or DEFAULT_SIZE
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(size=size, headless=headless)
+            atexit.register(_pool.close)
+            return _pool
+    if _pool.headless != headless:
+        raise ValueError(f"browser pool already running with headless={_pool.headless}")
+    _pool.resize(size)
+    return _pool
@@ -0,0 +1,176 @@
+"""
+case_keys.py
+Canonical keys for case numbers and CNRs, so any spelling of a case resolves the same way.
+
+  "CS 1234/2025", "CS/1234/2025", "C.S. No. 1234 of 2025", "CIVIL SUIT 1234-2025",
+  "civil 1234 2025"  -> "CS/1234/2025"
+  "DLND01-000001-2024", "dlnd 01 000001 2024", "CNRDLND010000012024"  -> "DLND010000012024"
+
+Case types are folded through CASE_TYPE_ALIASES (dots dropped, "No."/"of" ignored, leading
+zeros removed from the number). Only types in that table are keyed, so "FIR/123/2024" or
+"DATED/12/2024" never become case keys. page_key_map() turns a page's text into
+{key: [(start, end), ...]} once, when the page is cached (text_cache.py) or indexed
+(cause_list_index.py); after that every keyed query is a dictionary lookup, and free-text
+queries never scan for keys.
+
+Key matching adds to literal matching, it never replaces it: QueryMatcher finds a query's
+literal occurrences plus every other spelling of the same case, one hit per offset.
+"""
+
+import re
+
+# Stored with cached key maps (text_cache.py); bump it whenever the keys found in a text change.
+KEYS_VERSION = "1"
+
+# Canonical code -> spellings seen on cause lists. Compared after normalize_type().
+CASE_TYPE_ALIASES = {
+    "CS": ("CS", "CIVIL SUIT", "CIVIL", "SUIT", "CS DJ", "CS DJ ADJ", "CS SCJ"),
+    "CS COMM": ("CS COMM", "CS COMMERCIAL", "COMMERCIAL SUIT", "COMM SUIT"),
+    "OS": ("OS", "ORIGINAL SUIT"),
+    "CR": ("CR", "CR CASE", "CR CASES", "CRIMINAL CASE", "CRIMINAL CASES", "CRIMINAL", "CRL CASE"),
+    "CT": ("CT", "CT CASE", "CT CASES", "COMPLAINT CASE", "COMPLAINT CASES", "COMPLAINT", "CC"),
+    "BAIL": ("BAIL", "BAIL MATTER", "BAIL MATTERS", "BAIL APPLICATION", "BAIL APPLN", "BA"),
+    "SC": ("SC", "SESSIONS CASE", "SESSIONS", "SESSION CASE"),
+    "MACT": ("MACT", "MACP", "MAC", "MACT CASE", "MOTOR ACCIDENT CLAIM", "MOTOR ACCIDENT CLAIMS"),
+    "CA": ("CA", "CIVIL APPEAL", "RCA", "REGULAR CIVIL APPEAL"),
+    "CRL A": ("CRL A", "CRL APPEAL", "CRIMINAL APPEAL", "CRA"),
+    "CRL REV": ("CRL REV", "CR REV", "CRIMINAL REVISION", "REVISION"),
+    "EX": ("EX", "EXE", "EXECUTION", "EXECUTION PETITION", "EXECUTION CASE", "EP"),
+    "MC": ("MC", "MISC CASE", "MISCELLANEOUS CASE", "MISC"),
+    "MCA": ("MCA", "MISC CIVIL APPEAL"),
+    "HMA": ("HMA", "HINDU MARRIAGE ACT", "HMA PETITION"),
+    "GP": ("GP", "GUARDIANSHIP PETITION", "GUARDIANSHIP"),
+}
+
+_NOISE = {"NO", "NOS", "NUMBER", "CASE NO"}
+
+def normalize_type(text):
+    """
+    Upper-case, treat dots/brackets/dashes as spaces, join spelled-out letters ("C. S." -> "CS")
+    and drop a trailing "No".
+    """
+    t = re.sub(r"[.()\[\]\-_/,:&]", " ", text.upper())
+    words = []
+    letters = False  # whether words[-1] was built from single letters
+    for w in t.split():
+        if len(w) == 1 and w.isalpha() and letters:
+            words[-1] += w
+        else:
+            words.append(w)
+            letters = len(w) == 1 and w.isalpha()
+    while words and words[-1] in _NOISE:
+        words.pop()
+    return " ".join(words)
+
+_ALIASES = {normalize_type(v): code for code, variants in CASE_TYPE_ALIASES.items() for v in variants}
+_MAX_ALIAS_WORDS = max(len(a.split()) for a in _ALIASES)
+
+def canonical_type(type_text):
+    """
+    Canonical code for the words in front of a case number. The longest known alias at the
+    end of the words wins (so "Adv. B. Gupta C.S." -> "CS"); None if no known type ends them.
+    """
+    words = normalize_type(type_text).split()
+    for n in range(min(len(words), _MAX_ALIAS_WORDS), 0, -1):
+        code = _ALIASES.get(" ".join(words[-n:]))
+        if code:
+            return code
+    return None
+
+def case_key(case_type, number, year):
+    return f"{case_type}/{int(number)}/{year}"
+
+# A type word starts a word (never mid-word) and is short, so scanning a long run of letters stays linear.
+_TYPE_WORD = r"(?<![A-Za-z])[A-Za-z(][A-Za-z.()&]{0,23}"
+# Type and number may be separated by spaces, "/" or "-" ("CS 1234/2025", "CS/1234/2025", "CS-1234-2025").
+CASE_REF_RE = re.compile(
+    rf"((?:{_TYPE_WORD}\s+){{0,3}}?{_TYPE_WORD})\.?\s*(?:[/-]\s*)?(?:No\.?\s*)?(\d{{1,7}})\s*(?:/|-|\bof\b)\s*"
+    rf"((?:19|20)\d{{2}})\b"
+)
+# Lookarounds rather than \b: a CNR glued to a label ("CNRDLND010000012024") still counts.
+CNR_REF_RE = re.compile(r"(?<![0-9])([A-Za-z]{4})[-\s]?(\d{2})[-\s]?(\d{6})[-\s]?(\d{4})(?![0-9])")
+# Queries may also separate number and year with a plain space ("CIVIL 1234 2025"). At most four
+# whitespace-separated type words, as in CASE_REF_RE: a free-text query must fail fast.
+_QUERY_CASE_RE = re.compile(
+    rf"^\s*((?:{_TYPE_WORD}\s+){{0,3}}{_TYPE_WORD})\.?\s*(?:[/-]\s*)?(?:No\.?\s*)?(\d{{1,7}})\s*(?:/|-|\bof\b|\s)\s*((?:19|20)\d{{2}})\s*$",
+    re.IGNORECASE,
+)
+_QUERY_CNR_RE = re.compile(r"^[A-Za-z]{4}\d{12}$")
+
+def query_key(query):
+    """Canonical key for a CNR or case-number query, or None for free text."""
+    compact = re.sub(r"[\s\-/]", "", query)
+    if _QUERY_CNR_RE.match(compact):
+        return compact.upper()
+    m = _QUERY_CASE_RE.match(query)
+    if not m:
+        return None
+    code = canonical_type(m.group(1))
+    return case_key(code, m.group(2), m.group(3)) if code else None
+
+def _type_start(type_text, code):
+    """Offset of the shortest trailing run of words in `type_text` that still yields `code`."""
+    starts = [w.start() for w in re.finditer(r"\S+", type_text)]
+    for i in reversed(starts):
+        if canonical_type(type_text[i:]) == code:
+            return i
+    return 0
+
+def iter_keys(text):
+    """Yield (key, start, end) for every CNR and case number in `text`."""
+    for m in CNR_REF_RE.finditer(text):
+        yield "".join(m.groups()).upper(), m.start(), m.end()
+    for m in CASE_REF_RE.finditer(text):
+        code = canonical_type(m.group(1))
+        if not code:
+            continue
+        # Start the span at the words naming the type, not at a party name before them.
+        yield case_key(code, m.group(2), m.group(3)), m.start(1) + _type_start(m.group(1), code), m.end()
+
+def page_key_map(text):
+    """{key: [(start, end), ...]} for one page of text."""
+    found = {}
+    for key, start, end in iter_keys(text):
+        found.setdefault(key, []).append((start, end))
+    return found
+
+def merge_spans(spans):
+    """Sorted (start, end) spans with any span overlapping an earlier one dropped: one hit per offset."""
+    merged = []
+    for a, b in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if merged and a < merged[-1][1]:
+            continue
+        merged.append((a, b))
+    return merged
+
+class QueryMatcher:
+    """
+    One query's matches in a text: its literal occurrences (case-insensitive) plus, when the
+    query is a case number or CNR, every other spelling of that case.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.needle = query.lower()
+        self.key = query_key(query)
+
+    def literal_spans(self, text):
+        spans = []
+        if not self.needle:
+            return spans
+        lowered = text.lower()
+        i = lowered.find(self.needle)
+        while i != -1:
+            spans.append((i, i + len(self.needle)))
+            i = lowered.find(self.needle, i + len(self.needle))
+        return spans
+
+    def spans(self, text, key_map=None):
+        """Merged spans in `text`; pass the page's page_key_map() as `key_map` if already built."""
+        spans = self.literal_spans(text)
+        if self.key:
+            spans += (page_key_map(text) if key_map is None else key_map).get(self.key, [])
+        return merge_spans(spans)
+
+    def matches(self, text, key_map=None):
+        return bool(self.spans(text, key_map))
@@ -0,0 +1,263 @@
+"""
+cause_list_index.py
+SQLite FTS5 index over every downloaded cause-list PDF under outputs/.
+
+Each PDF page is indexed with its site, date, judge text (from all_judges_<date>.json or
+result_<date>.json) and PDF path. Indexing is incremental: PDFs whose content hash is
+unchanged are skipped, changed ones are re-indexed and deleted ones are dropped.
+
+Every case number and CNR on a page is also stored under its canonical key (case_keys.py),
+so a query such as "CIVIL 1234 2025" finds "CS 1234/2025" and "C.S. No. 1234 of 2025"
+with one indexed lookup instead of a phrase search per spelling.
+
+Usage:
+  (venv) python cause_list_index.py build --out outputs
+  (venv) python cause_list_index.py query "MHAU019999992015"
+  (venv) python cause_list_index.py query "CS 1234/2025" --site newdelhi --date 2025-10-19
+  (venv) python cause_list_index.py query "civil suit 1234 of 2025"
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from blob_store import iter_date_folders, list_pdfs
+from case_keys import QueryMatcher
+from ocr import add_ocr_args, apply_ocr_args
+from text_cache import default_cache
+
+INDEX_NAME = "cause_list_index.sqlite"
+# Bump when the schema or the case-key rules change; older indexes are rebuilt from scratch.
+INDEX_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    pdf_path TEXT PRIMARY KEY,
+    site TEXT NOT NULL,
+    date TEXT NOT NULL,
+    judge TEXT,
+    sha256 TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+    text,
+    judge,
+    site UNINDEXED,
+    date UNINDEXED,
+    pdf_path UNINDEXED,
+    page_no UNINDEXED
+);
+CREATE TABLE IF NOT EXISTS case_keys (
+    key TEXT NOT NULL,
+    page_rowid INTEGER NOT NULL,
+    pdf_path TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS case_keys_key ON case_keys (key);
+CREATE INDEX IF NOT EXISTS case_keys_pdf ON case_keys (pdf_path);
+"""
+
+def open_index(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(_SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION:
+        with conn:
+            conn.execute("DELETE FROM docs")
+            conn.execute("DELETE FROM pages")
+            conn.execute("DELETE FROM case_keys")
+            conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    return conn
+
+def connect_index(path):
+    """A connection for queries; the schema is only set up (open_index) when the index is new."""
+    if not os.path.exists(path):
+        return open_index(path)
+    return sqlite3.connect(path, timeout=30)
+
+def _delete_pdf(conn, pdf_path):
+    conn.execute("DELETE FROM pages WHERE pdf_path = ?", (pdf_path,))
+    conn.execute("DELETE FROM case_keys WHERE pdf_path = ?", (pdf_path,))
+
+def load_judge_names(date_folder):
+    """Map PDF basename -> judge/link text from the JSON files the downloaders write."""
+    names = {}
+    for js in sorted(Path(date_folder).glob("*.json")):
+        if not (js.name.startswith("all_judges_") or js.name.startswith("result_")):
+            continue
+        try:
+            with open(js, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        entries = data.get("downloaded", []) if isinstance(data, dict) else data
+        for e in entries:
+            path = e.get("pdf_path") or e.get("path")
+            judge = e.get("judge") or e.get("text")
+            if path and judge:
+                names.setdefault(os.path.basename(path), judge)
+    return names
+
+def iter_cause_list_pdfs(out_root):
+    """Yield (site, date, pdf_path) for outputs/<site>/<date>/*.pdf, loose or packed (blob_store.py)."""
+    for folder in iter_date_folders(out_root):
+        for pdf in list_pdfs(folder):
+            yield folder.parent.name, folder.name, pdf
+
+def build_index(out_root, index_path=None):
+    """Incrementally (re)index every PDF under `out_root`. Returns counts per action."""
+    index_path = index_path or os.path.join(out_root, INDEX_NAME)
+    conn = open_index(index_path)
+    cache = default_cache()
+    known = {row[0]: row[1] for row in conn.execute("SELECT pdf_path, sha256 FROM docs")}
+    judges_by_folder = {}
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    seen = set()
+
+    for site, date, pdf in iter_cause_list_pdfs(out_root):
+        key = str(pdf)
+        seen.add(key)
+        try:
+            digest = cache.file_sha256(key)
+            if known.get(key) == digest:
+                stats["unchanged"] += 1
+                continue
+            if pdf.parent not in judges_by_folder:
+                judges_by_folder[pdf.parent] = load_judge_names(pdf.parent)
+            judge = judges_by_folder[pdf.parent].get(pdf.name)
+            pages = list(cache.iter_keyed_pages(key))
+        except Exception as e:
+            print("  ! failed to index", key, e)
+            stats["failed"] += 1
+            continue
+        with conn:
+            _delete_pdf(conn, key)
+            for i, (text, key_map) in enumerate(pages):
+                rowid = conn.execute(
+                    "INSERT INTO pages (text, judge, site, date, pdf_path, page_no) VALUES (?, ?, ?, ?, ?, ?)",
+                    (text, judge or "", site, date, key, i + 1),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO case_keys VALUES (?, ?, ?, ?, ?)",
+                    [(k, rowid, key, a, b) for k, spans in key_map.items() for a, b in spans],
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?, ?)",
+                (key, site, date, judge, digest, time.time()),
+            )
+        stats["updated" if key in known else "added"] += 1
+        print(f"  -> indexed {key} ({len(pages)} pages)")
+
+    gone = [p for p in known if p not in seen]
+    with conn:
+        for p in gone:
+            _delete_pdf(conn, p)
+            conn.execute("DELETE FROM docs WHERE pdf_path = ?", (p,))
+    stats["removed"] = len(gone)
+    conn.close()
+    return stats
+
+def fts_phrase(query):
+    """Quote free text as one FTS5 phrase so punctuation like '/' is not parsed as syntax."""
+    return '"' + query.replace('"', '""') + '"'
+
+def _key_snippet(text, start, end, context=60):
+    snippet = text[max(0, start - context):start] + "[" + text[start:end] + "]" + text[end:end + context]
+    return " ".join(snippet.split())
+
+def _filter(sql, params, site, date, prefix=""):
+    if site:
+        sql += f" AND {prefix}site LIKE ?"
+        params.append(f"%{site}%")
+    if date:
+        sql += f" AND {prefix}date = ?"
+        params.append(date)
+    return sql
+
+def _hit(r, snippet):
+    return {"site": r[0], "date": r[1], "judge": r[2], "pdf": r[3], "page": r[4], "snippet": snippet}
+
+def _case_key_rows(conn, key, site, date, limit):
+    sql = (
+        "SELECT p.site, p.date, p.judge, p.pdf_path, p.page_no, p.text, k.start, k.end "
+        "FROM case_keys k JOIN pages p ON p.rowid = k.page_rowid WHERE k.key = ?"
+    )
+    params = [key]
+    sql = _filter(sql, params, site, date, prefix="p.")
+    sql += " ORDER BY p.date DESC, p.pdf_path, p.page_no, k.start LIMIT ?"
+    return conn.execute(sql, params + [limit]).fetchall()
+
+def query_case_key(conn, key, site=None, date=None, limit=50):
+    """Hits for a canonical case key / CNR, via the case_keys table."""
+    return [_hit(r, _key_snippet(r[5], r[6], r[7])) for r in _case_key_rows(conn, key, site, date, limit)]
+
+def query_index(index_path, query, site=None, date=None, limit=50):
+    """
+    Literal matches of `query` (an FTS phrase search) plus, for a case number or CNR, every
+    other spelling of it via the case_keys table. One hit per page and offset, newest first.
+    """
+    conn = connect_index(index_path)
+    matcher = QueryMatcher(query)
+    found = {}
+    if matcher.key:
+        for r in _case_key_rows(conn, matcher.key, site, date, limit):
+            found[(r[3], r[4], r[6])] = (r, _key_snippet(r[5], r[6], r[7]))
+    params = [fts_phrase(query)]
+    sql = _filter(
+        "SELECT site, date, judge, pdf_path, page_no, text, snippet(pages, 0, '[', ']', ' ... ', 16) "
+        "FROM pages WHERE pages MATCH ?", params, site, date,
+    )
+    sql += " ORDER BY date DESC, rank LIMIT ?"
+    for r in conn.execute(sql, params + [limit]):
+        spans = matcher.literal_spans(r[5])
+        for a, b in spans:
+            found.setdefault((r[3], r[4], a), (r, _key_snippet(r[5], a, b)))
+        if not spans and not any(k[:2] == (r[3], r[4]) for k in found):
+            # FTS matched the words with different punctuation; keep its own snippet.
+            found[(r[3], r[4], -1)] = (r, r[6].replace("\n", " "))
+    conn.close()
+    ordered = sorted(found.items(), key=lambda kv: kv[0])
+    ordered.sort(key=lambda kv: kv[1][0][1], reverse=True)
+    return [_hit(r, snippet) for (pdf, page, start), (r, snippet) in ordered[:limit]]
+
+def main():
+    parser = argparse.ArgumentParser(description="FTS5 index over downloaded cause-list PDFs")
+    parser.add_argument("--out", default="outputs", help="Outputs folder containing <site>/<date>/ PDFs")
+    parser.add_argument("--index", help=f"Index file (default: <out>/{INDEX_NAME})")
+    add_ocr_args(parser)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Add new/changed PDFs to the index")
+    q = sub.add_parser("query", help="Look up a CNR or case text")
+    q.add_argument("query", help="CNR, case number in any spelling (CS 1234/2025, civil suit 1234 of 2025) or free text")
+    q.add_argument("--site", help="Only sites containing this text")
+    q.add_argument("--date", help="Only this date (YYYY-MM-DD)")
+    q.add_argument("--limit", type=int, default=50)
+    q.add_argument("--out-json", help="Save hits as JSON")
+    args = parser.parse_args()
+    apply_ocr_args(args)
+
+    index_path = args.index or os.path.join(args.out, INDEX_NAME)
+    if args.command == "build":
+        t0 = time.perf_counter()
+        stats = build_index(args.out, index_path)
+        print(f"[+] Index updated in {time.perf_counter() - t0:.2f}s:", ", ".join(f"{k} {v}" for k, v in stats.items()))
+        return
+
+    t0 = time.perf_counter()
+    hits = query_index(index_path, args.query, site=args.site, date=args.date, limit=args.limit)
+    elapsed = (time.perf_counter() - t0) * 1000
+    for h in hits:
+        print(f"{h['date']}  {h['site']}  p.{h['page']}  {h['judge'] or os.path.basename(h['pdf'])}")
+        print(f"    {h['snippet']}")
+    print(f"[+] {len(hits)} hit(s) in {elapsed:.1f} ms")
+    if args.out_json:
+        with open(args.out_json, "w", encoding="utf-8") as fh:
+            json.dump(hits, fh, ensure_ascii=False, indent=2)
+        print("[+] JSON saved to", args.out_json)
+
+if __name__ == "__main__":
+    main()
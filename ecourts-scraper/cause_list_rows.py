@@ -0,0 +1,194 @@
+"""
+cause_list_rows.py
+Turn cause-list PDFs into structured rows using PyMuPDF word coordinates.
+
+Words are grouped into visual lines by their y position and split into cells at wide
+horizontal gaps. A line whose first cell is a bare number starts a new row; the lines
+that follow belong to that row until the next serial. Lines naming a court/judge that
+carry no case data are treated as section headers and stamped onto the rows below them.
+
+Each row: pdf, page, serial, case_type, case_number, case_year, cnr, parties, advocate,
+court, text. Rows are streamed to <pdf_stem>.rows.jsonl next to each PDF.
+
+Usage:
+  (venv) python cause_list_rows.py --pdf-folder "outputs/site_path/2025-10-19"
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from blob_store import list_pdfs, pdf_data, pdf_mtime
+
+try:
+    import fitz
+except Exception:
+    fitz = None
+
+ROWS_SUFFIX = ".rows.jsonl"
+
+SERIAL_RE = re.compile(r"^(\d{1,4})[.)]?$")
+CNR_RE = re.compile(r"\b([A-Z]{4}\d{12})\b")
+CASE_RE = re.compile(
+    r"\b((?:[A-Z][A-Za-z.()&]*\s+){0,3}?[A-Z][A-Za-z.()&]*)\.?\s+(?:No\.?\s*)?(\d{1,7})\s*(?:/|-|\bof\b)\s*((?:19|20)\d{2})\b"
+)
+PARTIES_RE = re.compile(r"\s(?:vs\.?|v/s\.?|versus)\s", re.IGNORECASE)
+ADVOCATE_RE = re.compile(r"\badv(?:ocate)?s?\b\.?\s*[:\-]?\s*", re.IGNORECASE)
+COURT_RE = re.compile(r"\b(court|judge|magistrate|bench|tribunal|ASJ|ACJ|CJM|MM|JMFC)\b", re.IGNORECASE)
+
+def group_lines(words, y_tol=0.5):
+    """Group PyMuPDF words (x0, y0, x1, y1, text, ...) into visual lines sorted top to bottom."""
+    lines = []
+    for w in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        yc = (w[1] + w[3]) / 2
+        h = max(w[3] - w[1], 1.0)
+        if lines and abs(lines[-1]["yc"] - yc) <= y_tol * h:
+            lines[-1]["words"].append(w)
+        else:
+            lines.append({"yc": yc, "words": [w]})
+    for ln in lines:
+        ln["words"].sort(key=lambda w: w[0])
+    return [ln["words"] for ln in lines]
+
+def split_cells(line_words, gap_factor=2.5):
+    """Split a line into cells wherever the gap between words is much wider than a character."""
+    cells = []
+    current = []
+    prev = None
+    for w in line_words:
+        if prev is not None:
+            char_w = (prev[2] - prev[0]) / max(len(prev[4]), 1)
+            if w[0] - prev[2] > gap_factor * char_w:
+                cells.append(" ".join(x[4] for x in current))
+                current = []
+        current.append(w)
+        prev = w
+    if current:
+        cells.append(" ".join(x[4] for x in current))
+    return cells
+
+def _is_header(text):
+    return bool(COURT_RE.search(text)) and not (
+        CASE_RE.search(text) or CNR_RE.search(text) or PARTIES_RE.search(f" {text} ")
+    )
+
+def parse_row(serial, cells, court):
+    """Fill the structured fields of one row from its cells (all lines of the row)."""
+    text = " ".join(cells)
+    row = {
+        "serial": serial,
+        "case_type": None,
+        "case_number": None,
+        "case_year": None,
+        "cnr": None,
+        "parties": None,
+        "advocate": None,
+        "court": court,
+        "text": text,
+    }
+    m = CNR_RE.search(text)
+    if m:
+        row["cnr"] = m.group(1)
+    m = CASE_RE.search(text)
+    if m:
+        row["case_type"] = m.group(1).strip(" .")
+        row["case_number"] = m.group(2)
+        row["case_year"] = m.group(3)
+    for c in cells:
+        if row["parties"] is None and PARTIES_RE.search(f" {c} "):
+            row["parties"] = c
+        m = ADVOCATE_RE.search(c)
+        if row["advocate"] is None and m:
+            row["advocate"] = c[m.end():].strip() or c
+    return row
+
+def iter_pdf_rows(pdf_path):
+    """Yield structured rows for one PDF, page by page."""
+    if fitz is None:
+        raise RuntimeError("PyMuPDF not installed. Run: pip install pymupdf")
+    data = pdf_data(pdf_path)
+    doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(pdf_path)
+    court = None
+    try:
+        for page_no, page in enumerate(doc, start=1):
+            serial = None
+            cells = []
+            for line in group_lines(page.get_text("words")):
+                line_cells = split_cells(line)
+                if not line_cells:
+                    continue
+                first = line_cells[0].split()[0]
+                m = SERIAL_RE.match(first)
+                if m:
+                    if serial is not None:
+                        yield dict(parse_row(serial, cells, court), pdf=str(pdf_path), page=page_no)
+                    serial = m.group(1)
+                    rest = line_cells[0][len(first):].strip()
+                    cells = ([rest] if rest else []) + line_cells[1:]
+                elif _is_header(" ".join(line_cells)):
+                    if serial is not None:
+                        yield dict(parse_row(serial, cells, court), pdf=str(pdf_path), page=page_no)
+                        serial, cells = None, []
+                    court = " ".join(line_cells)
+                elif serial is not None:
+                    cells.extend(line_cells)
+            if serial is not None:
+                yield dict(parse_row(serial, cells, court), pdf=str(pdf_path), page=page_no)
+    finally:
+        doc.close()
+
+def rows_path_for(pdf_path):
+    p = Path(pdf_path)
+    return str(p.with_name(p.stem + ROWS_SUFFIX))
+
+def write_rows_jsonl(pdf_path, out_path=None):
+    """Stream one PDF's rows to JSONL and return (out_path, row_count)."""
+    out_path = out_path or rows_path_for(pdf_path)
+    # Unique per writer: concurrent extractions of one PDF (e.g. lookup_server threads) must not share it.
+    tmp = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    n = 0
+    with open(tmp, "w", encoding="utf-8") as fh:
+        for row in iter_pdf_rows(pdf_path):
+            fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+            n += 1
+    os.replace(tmp, out_path)
+    return out_path, n
+
+def load_rows(pdf_path):
+    """Rows for a PDF, from its JSONL sidecar when that is newer than the PDF, else re-extracted."""
+    sidecar = rows_path_for(pdf_path)
+    if not (os.path.exists(sidecar) and os.path.getmtime(sidecar) >= pdf_mtime(pdf_path)):
+        write_rows_jsonl(pdf_path, sidecar)
+    with open(sidecar, "r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract structured rows from cause-list PDFs")
+    parser.add_argument("--pdf-folder", required=True, help="Folder containing downloaded PDFs")
+    parser.add_argument("--force", action="store_true", help="Re-extract even if the .rows.jsonl is up to date")
+    args = parser.parse_args()
+
+    folder = Path(args.pdf_folder)
+    assert folder.exists() and folder.is_dir(), f"{folder} not found"
+    total = 0
+    for pdf in list_pdfs(folder):
+        sidecar = rows_path_for(pdf)
+        if not args.force and os.path.exists(sidecar) and os.path.getmtime(sidecar) >= pdf_mtime(pdf):
+            print("Up to date:", pdf.name)
+            continue
+        try:
+            out_path, n = write_rows_jsonl(str(pdf), sidecar)
+        except Exception as e:
+            print("  ! failed to extract rows:", pdf.name, e)
+            continue
+        total += n
+        print(f"  -> {pdf.name}: {n} rows -> {out_path}")
+    print(f"Done. Rows written: {total}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+change_detect.py
+Change detection for re-polled cause-list pages.
+
+Each poll's view of a page is kept in <out_folder>/page_state.json: the PDF links with
+their anchor text, the sha256 of every downloaded PDF (from the download manifest), the
+HTML table rows and the structured rows of each PDF. A new poll whose links (by their
+fingerprint) and HTML rows match the last one is settled before any download
+(page_unchanged). Otherwise it is compared with the state after downloading to decide
+whether anything changed at all, and if so which judge PDFs are new, removed or replaced
+and which case rows appeared or disappeared. Deltas are written as compact
+delta_<date>_<HHMMSS>.json files next to result_<date>.json.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime
+
+from downloader import Manifest
+
+STATE_NAME = "page_state.json"
+
+def fingerprint(items):
+    h = hashlib.sha256()
+    for item in items:
+        h.update(json.dumps(item, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+def link_fingerprint(pdf_links):
+    """Order-independent fingerprint of the (url, anchor text) pairs on the page."""
+    return fingerprint(sorted((p["url"], p.get("text") or "") for p in pdf_links))
+
+def page_unchanged(state, pdf_links, html_rows, downloads=False):
+    """
+    True when the page lists the same links and HTML rows as the last poll, so its PDFs need
+    not be fetched again. With `downloads`, every link must also have been downloaded then.
+    A PDF replaced at an unchanged URL is only seen by revalidating it (ecourts_scraper --recheck).
+    """
+    if not state or state.get("fingerprint") != link_fingerprint(pdf_links):
+        return False
+    if list(state.get("html_rows", [])) != list(html_rows):
+        return False
+    return not downloads or all(p["url"] in state.get("pdf_hashes", {}) for p in pdf_links)
+
+def load_state(folder):
+    try:
+        with open(os.path.join(folder, STATE_NAME), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+def save_state(folder, state):
+    path = os.path.join(folder, STATE_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def pdf_hashes(folder, urls):
+    """url -> sha256 for every URL that has a completed entry in the folder's download manifest."""
+    manifest = Manifest(folder)
+    hashes = {}
+    for url in urls:
+        _, entry = manifest.lookup(url)
+        if entry.get("sha256") and not entry.get("partial"):
+            hashes[url] = entry["sha256"]
+    return hashes
+
+def _multiset_diff(old, new):
+    old_c, new_c = Counter(old), Counter(new)
+    return sorted((new_c - old_c).elements()), sorted((old_c - new_c).elements())
+
+def compute_delta(state, pdf_links, hashes, html_rows, pdf_rows):
+    """
+    Compare the current poll with the previous `state`.
+    `pdf_rows` maps url -> row texts for the PDFs that are new or replaced (others are reused).
+    Returns (delta, new_state); delta is None when nothing changed.
+    """
+    state = state or {}
+    old_links = {p["url"]: p for p in state.get("links", [])}
+    old_hashes = state.get("pdf_hashes", {})
+    new_links = {p["url"]: p for p in pdf_links}
+
+    new_pdfs = [u for u in new_links if u not in old_links]
+    removed_pdfs = [u for u in old_links if u not in new_links]
+    replaced_pdfs = [
+        u for u in new_links
+        if u in old_links and u in hashes and old_hashes.get(u) and hashes[u] != old_hashes[u]
+    ]
+    relabeled = [
+        u for u in new_links
+        if u in old_links and (new_links[u].get("text") or "") != (old_links[u].get("text") or "")
+    ]
+
+    old_pdf_rows = state.get("pdf_rows", {})
+    merged_pdf_rows = {u: rows for u, rows in old_pdf_rows.items() if u in new_links}
+    merged_pdf_rows.update(pdf_rows)
+    rows_added, rows_removed = _multiset_diff(
+        list(state.get("html_rows", [])) + [r for rows in old_pdf_rows.values() for r in rows],
+        list(html_rows) + [r for rows in merged_pdf_rows.values() for r in rows],
+    )
+
+    new_state = {
+        "checked_at": datetime.now().isoformat(timespec="seconds"),
+        "fingerprint": link_fingerprint(pdf_links),
+        "links": pdf_links,
+        "pdf_hashes": dict(old_hashes, **hashes),
+        "html_rows": list(html_rows),
+        "pdf_rows": merged_pdf_rows,
+        "search": state.get("search", {}),
+    }
+    for u in removed_pdfs:
+        new_state["pdf_hashes"].pop(u, None)
+    delta = {
+        "new_pdfs": new_pdfs,
+        "removed_pdfs": removed_pdfs,
+        "replaced_pdfs": replaced_pdfs,
+        "relabeled_pdfs": relabeled,
+        "rows_added": rows_added,
+        "rows_removed": rows_removed,
+    }
+    if not any(delta.values()):
+        return None, new_state
+    return delta, new_state
+
+def changed_urls(state, pdf_links, hashes):
+    """URLs whose PDFs must be (re)processed: new links, or content hash differs from last poll."""
+    if not state:
+        return [p["url"] for p in pdf_links]
+    old_urls = {p["url"] for p in state.get("links", [])}
+    old_hashes = state.get("pdf_hashes", {})
+    return [
+        p["url"] for p in pdf_links
+        if p["url"] not in old_urls or (p["url"] in hashes and hashes[p["url"]] != old_hashes.get(p["url"]))
+    ]
+
+def write_delta(folder, date_str, delta):
+    path = os.path.join(folder, f"delta_{date_str}_{datetime.now().strftime('%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(delta, fh, ensure_ascii=False, indent=2)
+    return path
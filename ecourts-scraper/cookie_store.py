@@ -0,0 +1,96 @@
+"""
+cookie_store.py
+On-disk store of browser cookies from interactive sessions, one JSON file per host.
+
+interactive_download_all_judges.py saves the cookies of the Chrome session the user set up
+(captcha solved, cause list shown), with their expiry and the browser's User-Agent. Later
+runs against the same host load the still-valid cookies into a plain requests.Session, so
+more dates or complexes can be fetched and downloaded without relaunching Chrome. The
+shared download sessions (downloader.get_session) pick them up too.
+
+Cookies without an expiry (browser-session cookies) are kept for SESSION_COOKIE_TTL seconds
+after saving, since the server-side session behind them times out as well. A host's file is
+dropped as soon as the server rejects the cookies.
+
+Location: $ECOURTS_COOKIE_DIR, or ~/.cache/ecourts-scraper/cookies/ by default.
+"""
+
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+import requests
+
+COOKIE_DIR = os.environ.get(
+    "ECOURTS_COOKIE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "ecourts-scraper", "cookies"),
+)
+SESSION_COOKIE_TTL = int(os.environ.get("ECOURTS_SESSION_COOKIE_TTL", "3600"))
+# Statuses eCourts sites answer with once a session has expired or was never valid.
+REJECT_STATUSES = (401, 403, 419, 440)
+
+def _path(url):
+    host = urlparse(url).netloc or url
+    return os.path.join(COOKIE_DIR, host.replace(":", "_") + ".json")
+
+def save_cookies(url, cookies, user_agent=None):
+    """Store Selenium-style cookie dicts (driver.get_cookies()) for the host of `url`."""
+    now = time.time()
+    entries = []
+    for c in cookies:
+        entries.append({
+            "name": c["name"],
+            "value": c["value"],
+            "domain": c.get("domain"),
+            "path": c.get("path", "/"),
+            "secure": bool(c.get("secure")),
+            "expiry": c.get("expiry") or int(now + SESSION_COOKIE_TTL),
+            "session": "expiry" not in c,
+        })
+    path = _path(url)
+    os.makedirs(COOKIE_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    # Cookies are credentials: keep them readable by the owner only.
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump({"saved_at": int(now), "user_agent": user_agent, "cookies": entries}, fh, indent=2)
+    os.replace(tmp, path)
+    return path
+
+def load_cookies(url):
+    """The saved record for the host of `url` with only unexpired cookies, or None if none are left."""
+    try:
+        with open(_path(url), "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    now = time.time()
+    data["cookies"] = [c for c in data.get("cookies", []) if c["expiry"] > now]
+    return data if data["cookies"] else None
+
+def apply_cookies(session, url):
+    """Load the host's valid cookies (and browser User-Agent) into `session`. Returns True if any were set."""
+    data = load_cookies(url)
+    if not data:
+        return False
+    for c in data["cookies"]:
+        session.cookies.set(c["name"], c["value"], domain=c["domain"] or "", path=c["path"],
+                            secure=c["secure"], expires=c["expiry"])
+    if data.get("user_agent"):
+        session.headers["User-Agent"] = data["user_agent"]
+    return True
+
+def load_session(url):
+    """A fresh requests.Session carrying the saved cookies for `url`'s host, or None."""
+    session = requests.Session()
+    return session if apply_cookies(session, url) else None
+
+def forget(url):
+    try:
+        os.remove(_path(url))
+    except OSError:
+        pass
+
+def is_rejected(response):
+    return response is not None and response.status_code in REJECT_STATUSES
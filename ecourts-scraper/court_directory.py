@@ -0,0 +1,333 @@
+"""
+court_directory.py
+On-disk directory of the eCourts portal hierarchy: state -> district -> court complex,
+with each complex's establishment codes and cause-list URL.
+
+The lists behind the portal's dropdowns are fetched with plain requests (the same AJAX
+endpoints the cause-list page calls), on first use and per level: resolving one complex
+fetches the state list, that state's districts and that district's complexes, nothing
+else. Every list is stored with the time it was fetched and re-fetched once older than
+DIRECTORY_TTL; if the portal cannot be reached a stale list is used with a warning.
+`discover` walks the whole tree up front.
+
+The scripts take --state/--district/--complex instead of --url and resolve them here.
+Names match case-insensitively, ignoring punctuation, and a unique prefix or substring
+is enough ("delhi" / "new delhi" / "patiala"); a code works too. A complex's cause-list
+URL is the portal's by default; `pin` records another one (e.g. the district website's
+daily board page), which survives refreshes. The portal URL opens the portal's cause-list
+form with the complex preselected, but the list itself is only shown after a captcha is
+solved and the form is POSTed, so plain scraping finds no PDF links there: pin the district
+website's board for ecourts_scraper.py / download_all_judges.py, or use the interactive
+downloader, where the captcha is solved in the browser.
+
+Location: $ECOURTS_DIRECTORY, or ~/.cache/ecourts-scraper/court_directory.json by default.
+Settings: ECOURTS_DIRECTORY_TTL (seconds, default 7 days), ECOURTS_PORTAL_URL.
+
+Usage:
+  (venv) python court_directory.py discover [--state "Delhi"]
+  (venv) python court_directory.py list --state "Delhi" [--district "New Delhi"]
+  (venv) python court_directory.py resolve --state "Delhi" --district "New Delhi" --complex "Patiala House"
+  (venv) python court_directory.py pin --state "Delhi" --district "New Delhi" --complex "Patiala House" "<cause_list_url>"
+  (venv) python ecourts_scraper.py --state "Delhi" --district "New Delhi" --complex "Patiala House" --today --download
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from bs4 import BeautifulSoup
+
+from ecourts.common import http_get, http_post
+from html_parse import PARSER
+
+DIRECTORY_PATH = os.environ.get(
+    "ECOURTS_DIRECTORY",
+    os.path.join(os.path.expanduser("~"), ".cache", "ecourts-scraper", "court_directory.json"),
+)
+DIRECTORY_TTL = int(os.environ.get("ECOURTS_DIRECTORY_TTL", str(7 * 24 * 3600)))
+PORTAL_URL = os.environ.get("ECOURTS_PORTAL_URL", "https://services.ecourts.gov.in/ecourtindia_v6/")
+
+# Portal pages/endpoints (the `p` parameter) and the JSON field holding each list's <option>s.
+STATES_PAGE = "cause_list/index"
+DISTRICTS_ENDPOINT = ("casestatus/fillDistrict", "dist_list")
+COMPLEXES_ENDPOINT = ("casestatus/fillcomplex", "complex_list")
+STATE_SELECT_ID = "sess_state_code"
+
+class DirectoryError(LookupError):
+    """A name that matches no entry, or more than one."""
+
+def normalize_name(name):
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name.lower()).split())
+
+def parse_options(html):
+    """[(value, label)] of the <option>s in `html`, without placeholders like 'Select state'."""
+    soup = BeautifulSoup(html, PARSER)
+    options = []
+    for opt in soup.find_all("option"):
+        value = (opt.get("value") or "").strip()
+        label = " ".join(opt.get_text(" ", strip=True).split())
+        if value and value not in ("0", "-1") and label:
+            options.append((value, label))
+    return options
+
+def _options_from_response(r, field):
+    """A list endpoint answers JSON ({field: "<option>...", "app_token": ...}) or bare HTML."""
+    try:
+        payload = r.json()
+    except ValueError:
+        return parse_options(r.text), None
+    html = payload.get(field)
+    if html is None:
+        html = next((v for v in payload.values() if isinstance(v, str) and "<option" in v), "")
+    return parse_options(html), payload.get("app_token")
+
+def _complex_entry(value, name):
+    """Complex option values look like "1070001@1,2,3@N": complex code, establishment codes, flag."""
+    code, _, rest = value.partition("@")
+    est_codes = [c for c in rest.partition("@")[0].split(",") if c]
+    return {"code": code, "name": name, "est_codes": est_codes}
+
+def pick(entries, query, what):
+    """The one entry whose code or name matches `query` (exact, then prefix, then substring)."""
+    q = normalize_name(query)
+    for stage in (lambda n: n == q, lambda n: n.startswith(q), lambda n: q in n):
+        found = [e for e in entries if e["code"] == query.strip() or stage(normalize_name(e["name"]))]
+        if len(found) == 1:
+            return found[0]
+        if found:
+            names = ", ".join(sorted(e["name"] for e in found))
+            raise DirectoryError(f"{what} '{query}' is ambiguous: {names}")
+    names = ", ".join(sorted(e["name"] for e in entries)) or "none known"
+    raise DirectoryError(f"no {what} matches '{query}' (known: {names})")
+
+class CourtDirectory:
+    def __init__(self, path=DIRECTORY_PATH, portal=PORTAL_URL, ttl=DIRECTORY_TTL):
+        self.path = path
+        self.portal = portal
+        self.ttl = ttl
+        self._token = None
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                self.data = json.load(fh)
+        except (OSError, ValueError):
+            self.data = {}
+        if self.data.get("portal") != portal:
+            self.data = {"portal": portal, "lists": {}, "pins": {}}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.data, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def _page_url(self, page):
+        return f"{self.portal}?p={page}"
+
+    def _fetch_states(self):
+        r = http_get(self._page_url(STATES_PAGE))
+        r.raise_for_status()
+        soup = BeautifulSoup(r.text, PARSER)
+        token = soup.find("input", attrs={"name": "app_token"})
+        m = re.search(r"app_token\s*[=:]\s*['\"]([0-9a-fA-F]+)['\"]", r.text)
+        self._token = token.get("value") if token else (m.group(1) if m else None)
+        select = soup.find("select", id=STATE_SELECT_ID) or soup
+        return [{"code": v, "name": n} for v, n in parse_options(str(select))]
+
+    def _post_list(self, endpoint, **params):
+        page, field = endpoint
+        if self._token is None:
+            # The portal expects its session cookie and token from the cause-list page first.
+            self._fetch_states()
+        data = dict(params, ajax_req="true", app_token=self._token or "")
+        r = http_post(self._page_url(page), data=data, headers={"X-Requested-With": "XMLHttpRequest"})
+        r.raise_for_status()
+        options, token = _options_from_response(r, field)
+        self._token = token or self._token
+        return options
+
+    def _list(self, key, fetch, refresh=False):
+        """The cached list under `key`, fetched when missing, expired or `refresh` is set."""
+        with self._lock:
+            cached = self.data["lists"].get(key)
+            if cached and not refresh and time.time() - cached["fetched_at"] < self.ttl:
+                return cached["items"]
+            try:
+                items = fetch()
+                if not items:
+                    raise ValueError("the portal returned an empty list")
+            except Exception as e:
+                if not cached:
+                    raise
+                age = (time.time() - cached["fetched_at"]) / 86400
+                print(f"  ! could not refresh the {key} list ({e}); using the one cached {age:.1f} days ago")
+                return cached["items"]
+            self.data["lists"][key] = {"fetched_at": time.time(), "items": items}
+            self._save()
+            return items
+
+    def states(self, refresh=False):
+        return self._list("states", self._fetch_states, refresh)
+
+    def districts(self, state_code, refresh=False):
+        return self._list(f"districts/{state_code}", lambda: [
+            {"code": v, "name": n} for v, n in self._post_list(DISTRICTS_ENDPOINT, state_code=state_code)
+        ], refresh)
+
+    def complexes(self, state_code, dist_code, refresh=False):
+        return self._list(f"complexes/{state_code}/{dist_code}", lambda: [
+            _complex_entry(v, n)
+            for v, n in self._post_list(COMPLEXES_ENDPOINT, state_code=state_code, dist_code=dist_code)
+        ], refresh)
+
+    def portal_cause_list_url(self, state_code, dist_code, cx):
+        """The portal's cause-list form for a complex (captcha-protected: it lists no PDFs by itself)."""
+        params = {"state_code": state_code, "dist_code": dist_code, "court_complex_code": cx["code"]}
+        if cx.get("est_codes"):
+            params["est_code"] = ",".join(cx["est_codes"])
+        return f"{self.portal}?p={STATES_PAGE}&{urlencode(params)}"
+
+    def resolve(self, state, district, complex_name):
+        """{state, district, complex names and codes, est_codes, url} for one court complex."""
+        st = pick(self.states(), state, "state")
+        dt = pick(self.districts(st["code"]), district, "district")
+        cx = pick(self.complexes(st["code"], dt["code"]), complex_name, "court complex")
+        key = f"{st['code']}/{dt['code']}/{cx['code']}"
+        return {
+            "state": st["name"], "state_code": st["code"],
+            "district": dt["name"], "dist_code": dt["code"],
+            "complex": cx["name"], "complex_code": cx["code"], "est_codes": cx.get("est_codes", []),
+            "url": self.data["pins"].get(key) or self.portal_cause_list_url(st["code"], dt["code"], cx),
+            "pinned": key in self.data["pins"],
+        }
+
+    def pin(self, state, district, complex_name, url):
+        """Use `url` as the cause-list URL of a complex (None removes the pin)."""
+        r = self.resolve(state, district, complex_name)
+        key = f"{r['state_code']}/{r['dist_code']}/{r['complex_code']}"
+        with self._lock:
+            if url:
+                self.data["pins"][key] = url
+            else:
+                self.data["pins"].pop(key, None)
+            self._save()
+        return self.resolve(state, district, complex_name)
+
+    def discover(self, state=None, refresh=False):
+        """Fetch every state's (or one state's) districts and complexes. Returns (districts, complexes)."""
+        states = self.states(refresh)
+        if state:
+            states = [pick(states, state, "state")]
+        n_dist = n_cx = 0
+        for st in states:
+            for dt in self.districts(st["code"], refresh):
+                n_dist += 1
+                try:
+                    n_cx += len(self.complexes(st["code"], dt["code"], refresh))
+                except Exception as e:
+                    print(f"  ! failed to list complexes of {st['name']} / {dt['name']}: {e}")
+            print(f"  -> {st['name']}: done")
+        return n_dist, n_cx
+
+_default = None
+
+def default_directory():
+    global _default
+    if _default is None:
+        _default = CourtDirectory()
+    return _default
+
+def add_location_args(parser):
+    """--state/--district/--complex, an alternative to --url resolved through the directory."""
+    parser.add_argument("--state", help="State name or code (with --district and --complex, instead of --url)")
+    parser.add_argument("--district", help="District name or code")
+    parser.add_argument("--complex", dest="court_complex", help="Court complex name or code")
+
+def resolve_location(args, parser):
+    """Fill `args.url` from --state/--district/--complex when no --url was given."""
+    names = (args.state, args.district, args.court_complex)
+    if args.url:
+        if any(names):
+            parser.error("give either --url or --state/--district/--complex, not both")
+        return args.url
+    if not all(names):
+        parser.error("--url, or all of --state, --district and --complex, is required")
+    try:
+        r = default_directory().resolve(*names)
+    except DirectoryError as e:
+        parser.error(str(e))
+    except requests.RequestException as e:
+        parser.error(f"could not fetch the court directory from the eCourts portal: {e}")
+    print(f"[+] {r['state']} / {r['district']} / {r['complex']} -> {r['url']}")
+    if not r["pinned"]:
+        print("  ! this is the portal's captcha-protected cause-list form, which lists no PDFs by itself; "
+              "pin the district website's board with: python court_directory.py pin --state ... "
+              "--district ... --complex ... \"<url>\"")
+    args.url = r["url"]
+    return args.url
+
+def parse_location(line):
+    """A batch line "State | District | Complex" as a 3-tuple, or None for a plain URL."""
+    parts = [p.strip() for p in line.split("|")]
+    return tuple(parts) if len(parts) == 3 and "://" not in line else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached state -> district -> court complex directory of the eCourts portal")
+    parser.add_argument("--directory", default=DIRECTORY_PATH, help="Directory file")
+    parser.add_argument("--portal", default=PORTAL_URL, help="eCourts portal base URL")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch lists even if they are still fresh")
+    sub = parser.add_subparsers(dest="command", required=True)
+    d = sub.add_parser("discover", help="Fetch and store the whole hierarchy (or one state's)")
+    d.add_argument("--state")
+    ls = sub.add_parser("list", help="List states, a state's districts or a district's complexes")
+    ls.add_argument("--state")
+    ls.add_argument("--district")
+    for name, help_text in (("resolve", "Print a complex's codes and cause-list URL"),
+                            ("pin", "Set the cause-list URL used for a complex")):
+        sp = sub.add_parser(name, help=help_text)
+        sp.add_argument("--state", required=True)
+        sp.add_argument("--district", required=True)
+        sp.add_argument("--complex", dest="court_complex", required=True)
+        if name == "pin":
+            sp.add_argument("url", nargs="?", help="Cause-list URL (omit to remove the pin)")
+    args = parser.parse_args()
+
+    directory = CourtDirectory(args.directory, portal=args.portal)
+    try:
+        if args.command == "discover":
+            t0 = time.perf_counter()
+            n_dist, n_cx = directory.discover(args.state, refresh=args.refresh)
+            print(f"[+] {n_dist} district(s), {n_cx} court complex(es) in {time.perf_counter() - t0:.1f}s "
+                  f"-> {args.directory}")
+        elif args.command == "list":
+            if args.district and not args.state:
+                parser.error("--district needs --state")
+            items = directory.states(args.refresh)
+            if args.state:
+                st = pick(items, args.state, "state")
+                items = directory.districts(st["code"], args.refresh)
+                if args.district:
+                    dt = pick(items, args.district, "district")
+                    items = directory.complexes(st["code"], dt["code"], args.refresh)
+            for e in items:
+                est = f"  (establishments {','.join(e['est_codes'])})" if e.get("est_codes") else ""
+                print(f"{e['code']:>10}  {e['name']}{est}")
+        else:
+            if args.command == "pin":
+                r = directory.pin(args.state, args.district, args.court_complex, args.url)
+            else:
+                r = directory.resolve(args.state, args.district, args.court_complex)
+            print(json.dumps(r, ensure_ascii=False, indent=2))
+    except DirectoryError as e:
+        raise SystemExit(f"ERROR: {e}")
+    except requests.RequestException as e:
+        raise SystemExit(f"ERROR: could not reach the eCourts portal: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -5,79 +5,103 @@ Saves PDFs and structured JSON with judge names and PDF paths.
 
 Usage:
 python download_all_judges.py --url "COURT_COMPLEX_URL" --date YYYY-MM-DD --use-selenium
+python -m ecourts judges --url "COURT_COMPLEX_URL" --date YYYY-MM-DD
 """
 
 import os
 import json
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
-import requests
-from bs4 import BeautifulSoup
-import time
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) eCourtsScraper/1.0"
-
-def ensure_dir(path):
-    os.makedirs(path, exist_ok=True)
-
-def http_get(url):
-    headers = {"User-Agent": USER_AGENT}
-    r = requests.get(url, headers=headers, timeout=30)
-    r.raise_for_status()
-    return r
-
-def fetch_soup(url, use_selenium=False, wait=4):
-    if use_selenium:
-        opts = Options()
-        opts.add_argument("--headless=new")
-        opts.add_argument("--disable-gpu")
-        opts.add_argument("--no-sandbox")
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
-        driver.get(url)
-        time.sleep(wait) 
-        html = driver.page_source
-        final_url = driver.current_url
-        driver.quit()
-        return BeautifulSoup(html, "html.parser"), final_url
-    else:
-        r = http_get(url)
-        return BeautifulSoup(r.text, "html.parser"), url
+
+from blob_store import open_store, packed_sha256
+from court_directory import add_location_args, resolve_location
+from downloader import DEFAULT_WORKERS, download_many
+from ecourts.common import ensure_dir, extract_pdf_links, http_get, output_folder
+from html_parse import make_soup
+from metrics import finish_run, profile, stage
+from ocr import add_ocr_args, apply_ocr_args
+from rate_control import print_host_stats
+
+def fetch_soup(url, use_selenium=False, wait=15):
+    with stage("page_fetch", item=url) as m:
+        if use_selenium:
+            from browser_pool import get_pool
+            html, final_url = get_pool().fetch(url, timeout=wait)
+            m.add(bytes=len(html.encode("utf-8")))
+            return make_soup(html), final_url
+        else:
+            r = http_get(url, record=m)
+            r.raise_for_status()
+            m.add(bytes=len(r.content))
+            return make_soup(r.text), r.url
 
 def extract_judge_pdf_links(soup, base_url):
     """
     Returns a list of dicts: [{'judge': 'Judge Name', 'pdf_url': 'https://...'}, ...]
     """
-    links = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        text = a.get_text(strip=True)
-        if href.lower().endswith(".pdf"):
-            links.append({"judge": text or "unknown", "pdf_url": urljoin(base_url, href)})
-    return links
-
-def download_file(url, dest_folder):
-    ensure_dir(dest_folder)
-    fname = os.path.basename(url.split("?")[0])
-    path = os.path.join(dest_folder, fname)
-    r = http_get(url)
-    with open(path, "wb") as f:
-        f.write(r.content)
-    return path
+    return [{"judge": p["text"] or "unknown", "pdf_url": p["url"]}
+            for p in extract_pdf_links(soup, base_url, iframe_text=None)]
+
+def download_judges(soup, final_url, date_str, out="outputs", workers=DEFAULT_WORKERS, watchlist=None, packed=False):
+    """
+    Download every judge PDF linked from an already-fetched page and write all_judges_<date>.json,
+    then check new/changed PDFs against the watchlist (default <out>/watchlist.sqlite, if present).
+    With `packed` the PDFs go into the blob store under <out>/blobs/ and each entry records its blob id.
+    Returns (out_folder, results).
+    """
+    judge_pdfs = extract_judge_pdf_links(soup, final_url)
+    print(f"[+] Found {len(judge_pdfs)} judge PDF links.")
+
+    out_folder = output_folder(out, final_url, date_str)
+
+    store = open_store(out) if packed else None
+    results = []
+    for j, pdf_path, err in download_many(judge_pdfs, out_folder, url_key="pdf_url", workers=workers, store=store):
+        if err is None:
+            results.append({"judge": j["judge"], "pdf_url": j["pdf_url"], "pdf_path": pdf_path})
+            if store is not None:
+                results[-1]["blob"] = packed_sha256(pdf_path)
+            print(f"  -> Downloaded: {j['judge']}")
+        else:
+            print(f"  ! Failed to download {j['judge']}: {err}")
+
+    out_json = os.path.join(out_folder, f"all_judges_{date_str}.json")
+    with open(out_json, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print("[+] Done. JSON saved at:", out_json)
+    watchlist = watchlist or os.path.join(out, "watchlist.sqlite")
+    if os.path.exists(watchlist):
+        # Imported only when a watchlist is set up, since checking it needs PyMuPDF.
+        from watchlist import check_downloads
+        check_downloads(out_folder, date_str,
+                        [{"url": r["pdf_url"], "path": r["pdf_path"], "court": r["judge"]} for r in results],
+                        watchlist)
+    return out_folder, results
 
 def main():
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("--url", required=True, help="Court complex page URL")
+    parser.add_argument("--url", help="Court complex page URL")
+    add_location_args(parser)
     parser.add_argument("--date", help="Date YYYY-MM-DD (default today)")
     parser.add_argument("--out", default="outputs", help="Output folder")
     parser.add_argument("--use-selenium", action="store_true", help="Use Selenium to fetch page dynamically")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent PDF downloads")
+    parser.add_argument("--packed", action="store_true", help="Store PDFs in the deduplicated pack store under <out>/blobs/")
+    parser.add_argument("--watchlist", help="Watchlist to check new/changed PDFs against (default: <out>/watchlist.sqlite, if present)")
+    add_ocr_args(parser)
+    parser.add_argument("--prom-file", help="Also write stage metrics as a Prometheus textfile to this path")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile; writes profile_<date>_<time>.prof/.txt to --out")
     args = parser.parse_args()
-
+    resolve_location(args, parser)
+    apply_ocr_args(args)
+    ensure_dir(args.out)
+    prefix = os.path.join(args.out, f"profile_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}")
+    with profile(prefix, enabled=args.profile):
+        run(args)
+    print_host_stats()
+
+def run(args):
     date_str = args.date or datetime.now().strftime("%Y-%m-%d")
     print(f"[+] Using date: {date_str}")
     print(f"[+] Fetching court complex page: {args.url}")
@@ -89,27 +113,10 @@ def main():
         return
 
     print("[+] Page fetched:", final_url)
-    judge_pdfs = extract_judge_pdf_links(soup, final_url)
-    print(f"[+] Found {len(judge_pdfs)} judge PDF links.")
-
-    out_folder = os.path.join(args.out, (urlparse(final_url).netloc + urlparse(final_url).path).replace("/", "_").strip("_"), date_str)
-    ensure_dir(out_folder)
-
-    results = []
-    for j in judge_pdfs:
-        try:
-            pdf_path = download_file(j["pdf_url"], out_folder)
-            results.append({"judge": j["judge"], "pdf_url": j["pdf_url"], "pdf_path": pdf_path})
-            print(f"  -> Downloaded: {j['judge']}")
-        except Exception as e:
-            print(f"  ! Failed to download {j['judge']}: {e}")
-
-    out_json = os.path.join(out_folder, f"all_judges_{date_str}.json")
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-
-    print("[+] Done. JSON saved at:", out_json)
+    out_folder, results = download_judges(soup, final_url, date_str, out=args.out, workers=args.workers,
+                                           watchlist=args.watchlist, packed=args.packed)
     print("[+] PDFs downloaded in folder:", out_folder)
+    finish_run(out_folder, date_str, args.prom_file)
 
 
 if __name__ == "__main__":
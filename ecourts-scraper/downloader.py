@@ -0,0 +1,379 @@
+"""
+downloader.py
+Shared concurrent download engine for cause-list PDFs.
+
+All downloader scripts (ecourts_scraper.py, download_all_judges.py,
+interactive_download_all_judges.py) go through this module. Files are fetched
+by a bounded thread pool over one pooled requests.Session per host;
+download_many() streams them straight to disk, so a PDF is never held whole
+in memory.
+
+Each output folder keeps a manifest.json recording url, ETag, Last-Modified,
+size and sha256 per file. A file is named after its URL's basename; a second
+URL with the same basename (/a/cause.pdf, /b/cause.pdf) gets a short hash of
+its URL appended (cause-1a2b3c4d.pdf), so every URL keeps its own file, entry
+and conditional-request state. Reruns send If-None-Match / If-Modified-Since and
+keep the local copy on 304; a transfer cut off mid-stream is left as
+<name>.part and resumed with a Range request on the next run. Per-host
+sessions start with any cookies saved by an interactive run (cookie_store.py).
+Every request goes through the host's rate controller (rate_control.py):
+rate limit, adaptive concurrency, retries with backoff and a circuit breaker.
+A transfer cut off mid-body is retried at once, resuming from its .part file.
+
+stream_many() is the pipelined variant: it keeps each PDF in memory and hands
+it to the caller the moment its download completes, so extraction and search
+overlap the downloads still in flight. Saving to disk is then optional.
+
+With `store` (a blob_store.BlobStore, the scripts' --packed flag) PDFs go into the
+content-addressed pack store instead of loose files: the manifest records each
+file's blob id, and the usual <folder>/<name>.pdf path stays its identity.
+
+Usage (from another script):
+  from downloader import download_many
+  results = download_many(pdf_links, out_folder, workers=8)
+  for item, data, path, err in stream_many(pdf_links, out_folder, workers=8): ...
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+import rate_control
+from cookie_store import apply_cookies
+from metrics import stage
+from rate_control import RETRIES, backoff_delay
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) eCourtsScraper/1.0"
+DEFAULT_WORKERS = 8
+CHUNK_SIZE = 64 * 1024
+MANIFEST_NAME = "manifest.json"
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def mount_pool(session, pool_size=DEFAULT_WORKERS):
+    """Give an existing session a connection pool large enough for `pool_size` workers."""
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_session(url, pool_size=DEFAULT_WORKERS):
+    """Return the shared pooled session for the host of `url` (created on first use)."""
+    host = urlparse(url).netloc
+    with _sessions_lock:
+        sess = _sessions.get(host)
+        if sess is None:
+            sess = requests.Session()
+            sess.headers.update({"User-Agent": USER_AGENT})
+            # Cookies saved by an earlier interactive run on this host, if still valid.
+            apply_cookies(sess, url)
+            mount_pool(sess, pool_size)
+            _sessions[host] = sess
+        return sess
+
+def local_filename(url):
+    fname = os.path.basename(urlparse(url).path) or "file.pdf"
+    fname = fname.split("?")[0]
+    return fname.replace("/", "_").replace("\\", "_")
+
+def _hashed_filename(fname, url):
+    stem, ext = os.path.splitext(fname)
+    return f"{stem}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}{ext}"
+
+class Manifest:
+    """
+    Thread-safe per-folder record of downloaded files, keyed by local filename.
+    Each URL owns one filename (name_for), so an entry always belongs to a single URL.
+    """
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                self.entries = json.load(fh)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._names = {e["url"]: fname for fname, e in self.entries.items() if e.get("url")}
+
+    def name_for(self, url):
+        """
+        Local filename of `url`: its basename, or the basename with a hash of the URL
+        appended when another URL already owns that name. Reserved at once, so concurrent
+        downloads of colliding URLs never share a file.
+        """
+        with self._lock:
+            fname = self._names.get(url)
+            if fname is None:
+                fname = local_filename(url)
+                # An entry without a url (a file packed before it had one) may be claimed.
+                if self.entries.get(fname, {}).get("url") not in (None, url):
+                    fname = _hashed_filename(fname, url)
+                self.entries.setdefault(fname, {})["url"] = url
+                self._names[url] = fname
+            return fname
+
+    def lookup(self, url):
+        """(fname, entry) recorded for `url`, or (None, {}) if it was never downloaded here."""
+        with self._lock:
+            fname = self._names.get(url)
+            return fname, dict(self.entries.get(fname) or {}) if fname else {}
+
+    def get(self, fname):
+        with self._lock:
+            return dict(self.entries.get(fname) or {})
+
+    def update(self, fname, **fields):
+        with self._lock:
+            entry = self.entries.setdefault(fname, {})
+            entry.update(fields)
+            self._save()
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.entries, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+def sha256_file(path, h=None):
+    h = h or hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h
+
+def _validators(r):
+    return {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+
+def _have_copy(entry, local_path, store=None):
+    """Whether the complete file recorded in `entry` is on disk (or in `store`)."""
+    if store is not None and entry.get("blob"):
+        return store.has(entry["blob"])
+    return os.path.exists(local_path) and os.path.getsize(local_path) == entry.get("size")
+
+def _conditional_headers(entry, known, local_path, store=None):
+    """If-None-Match / If-Modified-Since for a complete local copy recorded in the manifest."""
+    headers = {}
+    if known and not entry.get("partial") and _have_copy(entry, local_path, store):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def fetch_file(url, dest_folder, session=None, timeout=60, manifest=None):
+    """
+    Conditionally fetch one URL into `dest_folder`.
+    Returns (local_path, status) where status is "downloaded", "resumed" or "unchanged".
+    """
+    with stage("download", item=url) as m:
+        return _retry_transfer(lambda: _fetch_file(url, dest_folder, session, timeout, manifest, m), m)
+
+def _retry_transfer(fetch, m):
+    """Call `fetch` again after a backoff when the connection drops mid-body (rate_control retries the rest)."""
+    for attempt in range(RETRIES + 1):
+        try:
+            return fetch()
+        except requests.exceptions.ChunkedEncodingError:
+            if attempt == RETRIES:
+                raise
+            m.add(retries=1)
+            time.sleep(backoff_delay(attempt))
+
+def _fetch_file(url, dest_folder, session, timeout, manifest, m):
+    os.makedirs(dest_folder, exist_ok=True)
+    manifest = manifest or Manifest(dest_folder)
+    fname = manifest.name_for(url)
+    local_path = os.path.join(dest_folder, fname)
+    tmp_path = local_path + ".part"
+    entry = manifest.get(fname)
+    known = entry.get("url") == url
+    s = session or get_session(url)
+
+    headers = _conditional_headers(entry, known, local_path)
+    offset = 0
+    if known and entry.get("partial") and os.path.exists(tmp_path):
+        etag = entry.get("etag")
+        # If-Range only accepts a strong ETag; fall back to the date otherwise.
+        validator = etag if etag and not etag.startswith("W/") else entry.get("last_modified")
+        if validator:
+            offset = os.path.getsize(tmp_path)
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+
+    with rate_control.request(s, "GET", url, record=m, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 304:
+            return local_path, "unchanged"
+        if r.status_code == 416 and offset:
+            # Stale partial: drop it and start over.
+            os.remove(tmp_path)
+            manifest.update(fname, partial=False)
+            m.add(retries=1)
+            return _fetch_file(url, dest_folder, s, timeout, manifest, m)
+        r.raise_for_status()
+        resumed = bool(offset) and r.status_code == 206
+        h = sha256_file(tmp_path) if resumed else hashlib.sha256()
+        manifest.update(fname, url=url, partial=True, **_validators(r))
+        with open(tmp_path, "ab" if resumed else "wb") as fh:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    fh.write(chunk)
+                    h.update(chunk)
+                    m.add(bytes=len(chunk))
+    os.replace(tmp_path, local_path)
+    packed = {"blob": None} if entry.get("blob") else {}
+    manifest.update(fname, url=url, partial=False, size=os.path.getsize(local_path), sha256=h.hexdigest(), **packed)
+    return local_path, "resumed" if resumed else "downloaded"
+
+def fetch_bytes(url, dest_folder=None, session=None, timeout=60, manifest=None, store=None):
+    """
+    Fetch one URL into memory. Returns (data, local_path, status).
+    With `dest_folder` the file is also saved there and recorded in its manifest (local_path
+    is None otherwise); an unchanged file (304) is read back from the local copy. With
+    `store` as well, the content goes into the blob store and local_path has no loose file.
+    """
+    with stage("download", item=url) as m:
+        return _retry_transfer(lambda: _fetch_bytes(url, dest_folder, session, timeout, manifest, store, m), m)
+
+def _fetch_bytes(url, dest_folder, session, timeout, manifest, store, m):
+    s = session or get_session(url)
+    headers = {}
+    if dest_folder:
+        os.makedirs(dest_folder, exist_ok=True)
+        manifest = manifest or Manifest(dest_folder)
+        fname = manifest.name_for(url)
+        local_path = os.path.join(dest_folder, fname)
+        entry = manifest.get(fname)
+        headers = _conditional_headers(entry, entry.get("url") == url, local_path, store)
+    with rate_control.request(s, "GET", url, record=m, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 304:
+            if store is not None and entry.get("blob"):
+                return store.get(entry["blob"]), local_path, "unchanged"
+            with open(local_path, "rb") as fh:
+                return fh.read(), local_path, "unchanged"
+        r.raise_for_status()
+        buf = bytearray()
+        for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+            if chunk:
+                buf += chunk
+                m.add(bytes=len(chunk))
+    data = bytes(buf)
+    if not dest_folder:
+        return data, None, "downloaded"
+    if store is not None:
+        sha256, new = store.put(data)
+        manifest.update(fname, url=url, partial=False, size=len(data), sha256=sha256, blob=sha256,
+                        stored_at=time.time(), **_validators(r))
+        # A loose copy from an earlier unpacked run would shadow the blob.
+        if os.path.exists(local_path):
+            os.remove(local_path)
+        return data, local_path, "downloaded" if new else "deduplicated"
+    tmp_path = local_path + ".part"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, local_path)
+    manifest.update(fname, url=url, partial=False, size=len(data),
+                    sha256=hashlib.sha256(data).hexdigest(), **_validators(r))
+    return data, local_path, "downloaded"
+
+def download_file(url, dest_folder, session=None, timeout=60, manifest=None):
+    """Fetch one URL to `dest_folder` (skipping it if unchanged) and return the local path."""
+    return fetch_file(url, dest_folder, session=session, timeout=timeout, manifest=manifest)[0]
+
+def _allow_concurrency(items, url_key, workers):
+    """Let each host's rate controller run up to `workers` transfers at once."""
+    for host_url in {item[url_key] for item in items}:
+        rate_control.controller_for(host_url, workers)
+
+def download_many(items, dest_folder, url_key="url", session=None, workers=DEFAULT_WORKERS, desc="Downloading",
+                  store=None):
+    """
+    Download every item's `url_key` concurrently into `dest_folder` (or into the blob
+    `store`, keeping the manifest in `dest_folder`).
+    Returns a list of (item, local_path, error) tuples in the same order as `items`;
+    exactly one of local_path / error is None.
+    """
+    items = list(items)
+    workers = max(1, int(workers or 1))
+    if session is not None:
+        mount_pool(session, workers)
+    results = [None] * len(items)
+    if not items:
+        return results
+    _allow_concurrency(items, url_key, workers)
+    os.makedirs(dest_folder, exist_ok=True)
+    manifest = Manifest(dest_folder)
+    counts = {}
+
+    def _one(item):
+        url = item[url_key]
+        sess = session or get_session(url, workers)
+        if store is not None:
+            _, path, status = fetch_bytes(url, dest_folder, session=sess, manifest=manifest, store=store)
+            return path, status
+        return fetch_file(url, dest_folder, session=sess, manifest=manifest)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, tqdm(total=len(items), desc=desc, unit="pdf") as bar:
+        futures = {pool.submit(_one, item): i for i, item in enumerate(items)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            item = items[i]
+            try:
+                path, status = fut.result()
+                counts[status] = counts.get(status, 0) + 1
+                results[i] = (item, path, None)
+                bar.set_postfix_str(os.path.basename(path), refresh=False)
+            except Exception as e:
+                results[i] = (item, None, e)
+                tqdm.write(f"  ! download failed: {item[url_key]} {e}")
+            bar.update(1)
+    if counts:
+        print("[+] Downloads: " + ", ".join(f"{n} {k}" for k, n in sorted(counts.items())))
+    return results
+
+def stream_many(items, dest_folder=None, url_key="url", session=None, workers=DEFAULT_WORKERS, desc="Downloading",
+                store=None):
+    """
+    Download every item's `url_key` concurrently into memory and yield
+    (item, data, local_path, error) as each one completes, while the rest keep downloading.
+    Files are also saved to `dest_folder` (or `store`) when one is given (local_path is None otherwise).
+    """
+    items = list(items)
+    workers = max(1, int(workers or 1))
+    if session is not None:
+        mount_pool(session, workers)
+    if not items:
+        return
+    _allow_concurrency(items, url_key, workers)
+    manifest = Manifest(dest_folder) if dest_folder else None
+    counts = {}
+
+    def _one(item):
+        url = item[url_key]
+        return fetch_bytes(url, dest_folder, session=session or get_session(url, workers), manifest=manifest,
+                           store=store)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, tqdm(total=len(items), desc=desc, unit="pdf") as bar:
+        futures = {pool.submit(_one, item): item for item in items}
+        for fut in as_completed(futures):
+            item = futures[fut]
+            bar.update(1)
+            try:
+                data, path, status = fut.result()
+            except Exception as e:
+                tqdm.write(f"  ! download failed: {item[url_key]} {e}")
+                yield item, None, None, e
+                continue
+            counts[status] = counts.get(status, 0) + 1
+            yield item, data, path, None
+    if counts:
+        print("[+] Downloads: " + ", ".join(f"{n} {k}" for k, n in sorted(counts.items())))
@@ -0,0 +1,9 @@
+"""
+ecourts
+Single entry point for the eCourts cause-list tools: `python -m ecourts <command> ...`
+
+cli.py maps each subcommand to the module that implements it. A module, and its heavy
+backends such as Selenium or PyMuPDF, is only imported when its subcommand runs, so a
+one-off `search` does not pay for the browser stack. common.py holds the helpers the
+downloader scripts share: output folders, page fetches and PDF link extraction.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from ecourts.cli import main
+
+sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Command dispatcher for `python -m ecourts`.
+
+Usage (from the project folder):
+  python -m ecourts search --pdf-folder "outputs/site_path/2025-10-19" --query "CNR1234567890"
+  python -m ecourts download --url "<cause_list_url>" --today --download --cnr "CNR1234567890"
+  python -m ecourts --help
+"""
+
+import importlib
+import sys
+
+# command -> (implementing module, summary). Modules are imported only when their command runs.
+COMMANDS = {
+    "download": ("ecourts_scraper", "Fetch a cause-list page, download its PDFs and search them"),
+    "judges": ("download_all_judges", "Download every judge's cause-list PDF from a court complex page"),
+    "interactive": ("interactive_download_all_judges", "Open Chrome for the captcha, then download the cause lists"),
+    "batch": ("batch_crawl", "Download many court complexes over a date range, with a checkpoint"),
+    "search": ("pdf_search", "Search downloaded PDFs for a CNR / case text or a whole watchlist"),
+    "summarize": ("process_search_results", "Summarize search results (or structured rows) into a CSV"),
+    "rows": ("cause_list_rows", "Extract structured case rows from cause-list PDFs"),
+    "index": ("cause_list_index", "Build or query the full-text index over all downloads"),
+    "serve": ("lookup_server", "Run the local lookup HTTP service"),
+    "watch": ("watchlist", "Manage the case watchlist checked after every download, and its alerts"),
+    "courts": ("court_directory", "Cached state/district/court complex directory; resolve names to cause-list URLs"),
+    "store": ("blob_store", "Pack downloaded PDFs into the deduplicated blob store; stats, verify, export"),
+    "benchmark": ("benchmark", "Benchmark the pipeline offline against a synthetic site"),
+}
+
+def usage():
+    lines = ["usage: python -m ecourts <command> [options]", "", "commands:"]
+    lines += [f"  {name:12} {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", "Run 'python -m ecourts <command> --help' for the options of a command."]
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    name = argv[0]
+    if name not in COMMANDS:
+        print(f"ecourts: unknown command '{name}'\n\n{usage()}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(COMMANDS[name][0])
+    # Each command module parses sys.argv with its own argparse parser.
+    sys.argv = [f"ecourts {name}"] + argv[1:]
+    return module.main()
@@ -0,0 +1,47 @@
+"""
+Helpers shared by the downloader scripts (ecourts_scraper.py, download_all_judges.py,
+interactive_download_all_judges.py, batch_crawl.py) so they fetch pages, pick PDF links
+and lay out outputs/ the same way.
+"""
+
+import os
+from urllib.parse import urlparse
+
+import rate_control
+from downloader import USER_AGENT, get_session  # noqa: F401  (USER_AGENT re-exported)
+from html_parse import CauseListPage, make_soup
+from metrics import timed_stage
+
+def ensure_dir(path):
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def site_folder_name(page_url):
+    """outputs/ sub-folder for a cause-list page: host + path with '/' turned into '_'."""
+    u = urlparse(page_url)
+    return (u.netloc + u.path).replace("/", "_").strip("_")
+
+def output_folder(out, page_url, date_str):
+    """<out>/<site>/<date>/ for `page_url`, created if missing."""
+    return ensure_dir(os.path.join(out, site_folder_name(page_url), date_str))
+
+def http_get(url, session=None, timeout=30, **kwargs):
+    """
+    GET `url` through `session` or the pooled session of its host, under the host's rate
+    controller (rate limit, retries with backoff, circuit breaker); the caller checks the status.
+    """
+    s = session or get_session(url)
+    with rate_control.request(s, "GET", url, timeout=timeout, **kwargs) as r:
+        return r
+
+def http_post(url, data=None, session=None, timeout=30, **kwargs):
+    """POST form `data` to `url`, like http_get()."""
+    s = session or get_session(url)
+    with rate_control.request(s, "POST", url, data=data, timeout=timeout, **kwargs) as r:
+        return r
+
+@timed_stage("link_extraction", item_arg=1)
+def extract_pdf_links(html_or_soup, base_url, iframe_text="iframe_pdf"):
+    """[{url, text}] of every PDF linked (or embedded, unless `iframe_text` is None) on a page."""
+    soup = make_soup(html_or_soup) if isinstance(html_or_soup, (str, bytes)) else html_or_soup
+    return CauseListPage(soup, base_url, iframe_text=iframe_text).pdf_links
@@ -5,158 +5,151 @@ Download cause-list PDFs from a cause-list page and search them for a CNR/case t
 Usage examples (from project folder with venv activated):
   python ecourts_scraper.py --url "https://newdelhi.dcourts.gov.in/cause-list-%e2%81%84-daily-board/" --today --download --cnr "CNR1234567890"
   python ecourts_scraper.py --url "https://services.ecourts.gov.in/ecourtindia_v6/?p=cause_list/" --date 2025-10-19 --use-selenium --download
+  python ecourts_scraper.py --url "<cause_list_url>" --today --stream --cnr "CNR1234567890"
+  python -m ecourts download --url "<cause_list_url>" --today --download --cnr "CNR1234567890"
 """
 
 import argparse
+import importlib.util
 import json
 import os
-import time
 from datetime import datetime, timedelta
-from urllib.parse import urljoin, urlparse
 
-import requests
-from bs4 import BeautifulSoup
 from dateutil import parser as dateparser
 from tqdm import tqdm
 
-try:
-    import fitz  
-    _HAS_PYMUPDF = True
-except Exception:
-    _HAS_PYMUPDF = False
+from blob_store import BLOB_DIR, open_store, packed_sha256
+from court_directory import add_location_args, resolve_location
+from change_detect import (changed_urls, compute_delta, load_state, page_unchanged, pdf_hashes, save_state,
+                           write_delta)
+from downloader import DEFAULT_WORKERS, download_many, stream_many
+from case_keys import QueryMatcher
+from cause_list_rows import iter_pdf_rows
+from ecourts.common import ensure_dir, http_get, output_folder
+from html_parse import CauseListPage, make_soup
+from metrics import finish_run, profile, stage, timed_stage
+from ocr import add_ocr_args, apply_ocr_args
+from pdf_pool import map_pdfs
+from rate_control import print_host_stats
+from text_cache import fitz, iter_keyed_page_texts, iter_page_texts
+from watchlist import WATCHLIST_NAME, check_downloads
 
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    _HAS_SELENIUM = True
-except Exception:
-    _HAS_SELENIUM = False
-
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) eCourtsScraper/1.0"
-
-def ensure_dir(path):
-    os.makedirs(path, exist_ok=True)
-
-def http_get(url, session=None, **kwargs):
-    s = session or requests
-    headers = kwargs.pop("headers", {})
-    headers.setdefault("User-Agent", USER_AGENT)
-    return s.get(url, headers=headers, timeout=30, **kwargs)
+_HAS_PYMUPDF = fitz is not None
+# Selenium is imported only when a page is actually rendered (see fetch_soup_selenium).
+_HAS_SELENIUM = importlib.util.find_spec("selenium") is not None
 
 def fetch_soup_requests(url):
-    r = http_get(url)
-    r.raise_for_status()
-    return BeautifulSoup(r.text, "html.parser"), r.url
+    with stage("page_fetch", item=url) as m:
+        r = http_get(url, record=m)
+        r.raise_for_status()
+        m.add(bytes=len(r.content))
+        return make_soup(r.text), r.url
 
 def fetch_soup_selenium(url, wait=4):
+    """Render with a pooled headless Chrome; `wait` is the maximum seconds to wait for the cause list."""
     if not _HAS_SELENIUM:
         raise RuntimeError("Selenium not available in environment (install selenium & webdriver-manager).")
-    opts = Options()
-    opts.add_argument("--headless=new")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--no-sandbox")
-    prefs = {"profile.managed_default_content_settings.images": 2}
-    opts.add_experimental_option("prefs", prefs)
-    driver = webdriver.Chrome(ChromeDriverManager().install(), options=opts)
-    try:
-        driver.get(url)
-        time.sleep(wait)
-        html = driver.page_source
-        final = driver.current_url
-    finally:
-        driver.quit()
-    return BeautifulSoup(html, "html.parser"), final
-
-def extract_pdf_links(soup, base_url):
-    links = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if href.lower().endswith(".pdf"):
-            links.append({"url": urljoin(base_url, href), "text": a.get_text(strip=True)})
-    for iframe in soup.find_all("iframe", src=True):
-        src = iframe["src"]
-        if src.lower().endswith(".pdf"):
-            links.append({"url": urljoin(base_url, src), "text": "iframe_pdf"})
-    seen = set()
-    dedup = []
-    for p in links:
-        if p["url"] not in seen:
-            dedup.append(p)
-            seen.add(p["url"])
-    return dedup
-
-def download_file(url, dest_folder, session=None):
-    ensure_dir(dest_folder)
-    parsed = urlparse(url)
-    fname = os.path.basename(parsed.path) or "file.pdf"
-    fname = fname.split("?")[0]
-    local_path = os.path.join(dest_folder, fname)
-    s = session or requests
-    headers = {"User-Agent": USER_AGENT}
-    with s.get(url, headers=headers, stream=True, timeout=60) as r:
-        r.raise_for_status()
-        total = int(r.headers.get("content-length", 0))
-        with open(local_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-    return local_path
-
-def search_pdf_text(pdf_path, query):
-    """Search plain text in a PDF using PyMuPDF. Returns list of matches."""
+    from browser_pool import get_pool
+    with stage("page_fetch", item=url) as m:
+        html, final = get_pool().fetch(url, timeout=wait)
+        m.add(bytes=len(html.encode("utf-8")))
+        return make_soup(html), final
+
+@timed_stage("search")
+def search_pdf_text(pdf_path, query, use_cache=True, data=None):
+    """
+    Search plain text in a PDF using PyMuPDF (via the text cache). Returns list of matches.
+    Case numbers and CNRs also match by canonical key, so any spelling finds them.
+    `data` is the PDF's bytes when it was downloaded to memory (see stream_search).
+    """
     results = []
     if not _HAS_PYMUPDF:
         raise RuntimeError("PyMuPDF not installed. Install pymupdf to search PDFs.")
-    q = query.lower()
-    doc = fitz.open(pdf_path)
-    for i, page in enumerate(doc):
-        try:
-            text = page.get_text("text") or ""
-        except Exception:
-            text = ""
-        if q in text.lower():
-            idx = text.lower().find(q)
+    matcher = QueryMatcher(query)
+    if matcher.key:
+        pages = iter_keyed_page_texts(pdf_path, use_cache=use_cache, data=data)
+    else:
+        pages = ((text, None) for text in iter_page_texts(pdf_path, use_cache=use_cache, data=data))
+    for i, (text, key_map) in enumerate(pages):
+        spans = matcher.spans(text, key_map)
+        if spans:
+            idx, qlen = spans[0][0], spans[0][1] - spans[0][0]
             start = max(0, idx - 80)
-            end = idx + len(q) + 80
+            end = idx + qlen + 80
             snippet = text[start:end].replace("\n", " ").strip()
             results.append({"page": i + 1, "snippet": snippet})
-    doc.close()
     return results
 
+def stream_search(pdf_links, out_folder, query, workers=DEFAULT_WORKERS, store=None):
+    """
+    Download PDFs into memory and search each one as soon as it arrives, while the rest are
+    still downloading. PDFs are also saved to `out_folder` (or the blob `store`) unless it is None.
+    Returns (downloaded, searched): the downloaded entries in page order and
+    {pdf: matches} keyed by local path, or by URL for PDFs kept only in memory.
+    """
+    order = {p["url"]: i for i, p in enumerate(pdf_links)}
+    downloaded = []
+    searched = {}
+    for p, data, path, err in stream_many(pdf_links, out_folder, workers=workers, store=store):
+        if err:
+            continue
+        downloaded.append({"url": p["url"], "path": path, "text": p.get("text")})
+        pdf = path or p["url"]
+        try:
+            searched[pdf] = search_pdf_text(pdf, query, data=data)
+        except Exception as e:
+            tqdm.write(f"  ! search failed for {pdf} {e}")
+            continue
+        if searched[pdf]:
+            # Reported while other PDFs are still downloading (tqdm.write keeps the progress bar intact).
+            tqdm.write(f"  -> Found in {pdf}: {len(searched[pdf])} match(es)")
+    downloaded.sort(key=lambda d: order[d["url"]])
+    return downloaded, searched
+
 def find_case_in_html(soup, query):
     """Naive search across table rows in HTML page for given query text."""
-    q = query.lower()
-    hits = []
-    for tr in soup.find_all("tr"):
-        text = tr.get_text(" ", strip=True).lower()
-        if q in text:
-            cells = [c.get_text(" ", strip=True) for c in tr.find_all(["td", "th"])]
-            serial = next((c for c in cells if c.isdigit()), None)
-            court = None
-            for c in reversed(cells):
-                if "court" in c.lower() or "judge" in c.lower() or "bench" in c.lower():
-                    court = c
-                    break
-            hits.append({"row_text": text, "serial": serial, "court": court, "cells": cells})
-    return hits
+    return CauseListPage(soup, "").find(query)
 
 def parse_args():
     p = argparse.ArgumentParser(description="eCourts cause-list scraper & PDF downloader")
-    p.add_argument("--url", required=True, help="Cause-list page URL (direct page)")
+    p.add_argument("--url", help="Cause-list page URL (direct page)")
+    add_location_args(p)
     p.add_argument("--date", help="Date YYYY-MM-DD (default: today)")
     p.add_argument("--today", action="store_true")
     p.add_argument("--tomorrow", action="store_true")
     p.add_argument("--cnr", help="CNR or text to search inside cause-lists")
     p.add_argument("--download", action="store_true", help="Download all discovered PDFs")
+    p.add_argument("--stream", action="store_true",
+                   help="With --cnr: search each PDF from memory as soon as it is downloaded "
+                        "(PDFs are saved only with --download)")
     p.add_argument("--use-selenium", action="store_true", help="Render page with Selenium (for JS-heavy pages)")
     p.add_argument("--out", default="outputs", help="Output folder")
-    p.add_argument("--wait", type=int, default=4, help="Selenium page wait seconds")
-    return p.parse_args()
+    p.add_argument("--wait", type=int, default=15, help="Max seconds to wait for the Selenium-rendered cause list")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent PDF downloads")
+    p.add_argument("--packed", action="store_true", help=f"Store PDFs in the deduplicated pack store under <out>/{BLOB_DIR}/")
+    p.add_argument("--search-workers", type=int, default=1, help="Search downloaded PDFs in N parallel processes")
+    p.add_argument("--force", action="store_true", help="Ignore the previous poll's state and reprocess everything")
+    p.add_argument("--recheck", action="store_true",
+                   help="Revalidate the PDFs even when the page lists the same links as the last poll "
+                        "(finds PDFs replaced under an unchanged URL)")
+    p.add_argument("--watchlist", help=f"Watchlist to check new/changed PDFs against (default: <out>/{WATCHLIST_NAME}, if present)")
+    add_ocr_args(p)
+    p.add_argument("--prom-file", help="Also write stage metrics as a Prometheus textfile to this path")
+    p.add_argument("--profile", action="store_true", help="Run under cProfile; writes profile_<date>_<time>.prof/.txt to --out")
+    args = p.parse_args()
+    resolve_location(args, p)
+    apply_ocr_args(args)
+    return args
 
 def main():
     args = parse_args()
+    ensure_dir(args.out)
+    prefix = os.path.join(args.out, f"profile_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}")
+    with profile(prefix, enabled=args.profile):
+        run(args)
+    print_host_stats()
 
+def run(args):
     if args.tomorrow:
         dt = datetime.now() + timedelta(days=1)
     elif args.today:
@@ -180,24 +173,63 @@ def main():
         return
 
     print("[+] Page fetched:", final_url)
-    pdf_links = extract_pdf_links(soup, final_url)
+    with stage("link_extraction", item=final_url):
+        page = CauseListPage(soup, final_url)
+    pdf_links = page.pdf_links
     print(f"[+] Found {len(pdf_links)} PDF links on page.")
 
-    out_base = os.path.join(args.out, (urlparse(final_url).netloc + urlparse(final_url).path).replace("/", "_").strip("_"))
-    out_folder = os.path.join(out_base, date_str)
-    ensure_dir(out_folder)
+    out_folder = output_folder(args.out, final_url, date_str)
+    state = None if args.force else load_state(out_folder)
+    html_rows = [text for text, _ in page.rows]
+    searched_before = not args.cnr or (state or {}).get("search", {}).get("query") == args.cnr
+    if not args.recheck and searched_before and page_unchanged(state, pdf_links, html_rows, downloads=args.download):
+        save_state(out_folder, dict(state, checked_at=datetime.now().isoformat(timespec="seconds")))
+        print(f"[=] Page unchanged since last poll ({state.get('checked_at')}); skipping downloads.")
+        finish_run(out_folder, date_str, args.prom_file)
+        return
 
     downloaded = []
-    if args.download and pdf_links:
+    streamed = None
+    store = open_store(args.out) if args.packed else None
+    if args.stream and args.cnr and pdf_links and _HAS_PYMUPDF:
+        print(f"[*] Downloading PDFs and searching each for '{args.cnr}' as it arrives...")
+        downloaded, streamed = stream_search(pdf_links, out_folder if args.download else None, args.cnr,
+                                             workers=args.workers, store=store)
+    elif args.download and pdf_links:
         print("[*] Downloading PDFs...")
-        for p in tqdm(pdf_links, desc="Downloading"):
-            try:
-                path = download_file(p["url"], out_folder)
+        for p, path, err in download_many(pdf_links, out_folder, workers=args.workers, store=store):
+            if path:
                 downloaded.append({"url": p["url"], "path": path, "text": p.get("text")})
-            except Exception as e:
-                print("  ! download failed:", p["url"], e)
     else:
         downloaded = [{"url": p["url"], "path": None, "text": p.get("text")} for p in pdf_links]
+    if store is not None:
+        for d in downloaded:
+            if d["path"]:
+                d["blob"] = packed_sha256(d["path"])
+
+    hashes = pdf_hashes(out_folder, [d["url"] for d in downloaded if d.get("path")])
+    changed = set(changed_urls(state, pdf_links, hashes))
+    check_downloads(out_folder, date_str, [dict(d, court=d.get("text")) for d in downloaded],
+                    args.watchlist or os.path.join(args.out, WATCHLIST_NAME))
+    pdf_rows = {}
+    for d in downloaded:
+        if d.get("path") and d["url"] in changed:
+            try:
+                pdf_rows[d["url"]] = [r["text"] for r in iter_pdf_rows(d["path"])]
+            except Exception as e:
+                print("  ! row extraction failed for", d["path"], e)
+    delta, new_state = compute_delta(state, pdf_links, hashes, html_rows, pdf_rows)
+    prev_search = new_state["search"] if new_state["search"].get("query") == args.cnr else {}
+    if state and delta is None and (not args.cnr or prev_search):
+        save_state(out_folder, new_state)
+        print(f"[=] No changes since last poll ({state.get('checked_at')}); nothing to do.")
+        finish_run(out_folder, date_str, args.prom_file)
+        return
+    if state and delta:
+        delta_path = write_delta(out_folder, date_str, delta)
+        print(f"[+] Changes: {len(delta['new_pdfs'])} new, {len(delta['removed_pdfs'])} removed, "
+              f"{len(delta['replaced_pdfs'])} replaced PDF(s); {len(delta['rows_added'])} row(s) added, "
+              f"{len(delta['rows_removed'])} removed. Delta: {delta_path}")
 
     results = {
         "source_url": final_url,
@@ -210,7 +242,7 @@ def main():
 
     if args.cnr:
         print(f"[*] Searching in HTML for '{args.cnr}' ...")
-        html_hits = find_case_in_html(soup, args.cnr)
+        html_hits = page.find(args.cnr)
         results["html_search_hits"] = html_hits
         if html_hits:
             print(f"[+] Found {len(html_hits)} hit(s) in HTML.")
@@ -219,27 +251,43 @@ def main():
         else:
             print("[*] Not found in HTML. Will search inside downloaded PDFs (if any).")
 
-    if args.cnr and any(d.get("path") for d in downloaded):
+    if args.cnr and streamed is not None:
+        for d in downloaded:
+            pdf = d["path"] or d["url"]
+            if streamed.get(pdf):
+                results["search_results"].append({"pdf": pdf, "matches": streamed[pdf]})
+        new_state["search"] = {"query": args.cnr, "results": {d["path"]: streamed[d["path"]] for d in downloaded
+                                                              if d["path"] in streamed}}
+    elif args.cnr and any(d.get("path") for d in downloaded):
         if not _HAS_PYMUPDF:
             print("WARNING: PyMuPDF (pymupdf) not installed — cannot search inside PDFs.")
         else:
             print("[*] Searching inside downloaded PDFs for:", args.cnr)
-            for d in downloaded:
-                path = d.get("path")
-                if not path:
-                    continue
-                try:
-                    matches = search_pdf_text(path, args.cnr)
-                    if matches:
-                        results["search_results"].append({"pdf": path, "matches": matches})
-                        print(f"  -> Found in {path}: {len(matches)} match(es)")
-                except Exception as e:
-                    print("  ! search failed for", path, e)
+            known = prev_search.get("results", {})
+            paths = [d["path"] for d in downloaded if d.get("path")]
+            todo = [d["path"] for d in downloaded if d.get("path") and (d["url"] in changed or d["path"] not in known)]
+            if len(todo) < len(paths):
+                print(f"[*] {len(paths) - len(todo)} unchanged PDF(s) reuse their previous search results.")
+            searched = {}
+            for path, matches, err in map_pdfs(search_pdf_text, todo, args.cnr, workers=args.search_workers):
+                if err:
+                    print("  ! search failed for", path, err)
+                else:
+                    searched[path] = matches
+            for path in paths:
+                matches = searched.get(path, known.get(path) if path not in todo else None)
+                if matches:
+                    results["search_results"].append({"pdf": path, "matches": matches})
+                    print(f"  -> Found in {path}: {len(matches)} match(es)")
+            new_state["search"] = {"query": args.cnr, "results": {p: searched.get(p, known.get(p)) for p in paths
+                                                                  if p in searched or (p in known and p not in todo)}}
 
     out_json = os.path.join(out_folder, f"result_{date_str}.json")
     with open(out_json, "w", encoding="utf-8") as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
     print("[+] Results saved to:", out_json)
+    save_state(out_folder, new_state)
+    finish_run(out_folder, date_str, args.prom_file)
     print("[+] Done.")
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+"""
+html_parse.py
+Fast, targeted parsing of rendered cause-list pages.
+
+Only <a>, <iframe> and <tr> elements (with their contents) are built, using the lxml
+backend when it is installed. One pass over those elements yields both the PDF links and
+the normalized text of every table row, so any number of case queries can then be
+answered against the row text without re-walking the tree.
+
+Usage (from another script):
+  from html_parse import make_soup, CauseListPage
+  page = CauseListPage(make_soup(html), final_url)
+  page.pdf_links, page.find("CNR1234567890")
+"""
+
+from urllib.parse import parse_qsl, urljoin, urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from case_keys import QueryMatcher
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except Exception:
+    PARSER = "html.parser"
+
+CAUSE_LIST_TAGS = SoupStrainer(["a", "iframe", "tr"])
+_COURT_WORDS = ("court", "judge", "bench")
+
+def make_soup(html, full=False):
+    """Parse `html` keeping only links, iframes and table rows (or the whole tree if `full`)."""
+    if full:
+        return BeautifulSoup(html, PARSER)
+    return BeautifulSoup(html, PARSER, parse_only=CAUSE_LIST_TAGS)
+
+def is_pdf_ref(ref):
+    """
+    True when the URL path ends in .pdf (query string ignored: a.pdf?v=2) or a query
+    parameter names a .pdf file (display.php?file=a.pdf).
+    """
+    parts = urlsplit(ref.strip().lower())
+    if parts.path.endswith(".pdf"):
+        return True
+    return any(v.endswith(".pdf") for _, v in parse_qsl(parts.query))
+
+class CauseListPage:
+    """
+    PDF links and table rows of a cause-list page, collected in a single pass.
+    PDF iframes are listed with `iframe_text` as their text, or skipped if it is None.
+    """
+
+    def __init__(self, soup, base_url, iframe_text="iframe_pdf"):
+        self.pdf_links = []
+        self.rows = []
+        seen = set()
+        for el in soup.find_all(["a", "iframe", "tr"]):
+            if el.name == "tr":
+                cells = [c.get_text(" ", strip=True) for c in el.find_all(["td", "th"])]
+                self.rows.append((el.get_text(" ", strip=True).lower(), cells))
+                continue
+            if el.name == "iframe" and iframe_text is None:
+                continue
+            ref = el.get("href") if el.name == "a" else el.get("src")
+            if not ref or not is_pdf_ref(ref):
+                continue
+            url = urljoin(base_url, ref.strip())
+            if url in seen:
+                continue
+            seen.add(url)
+            text = el.get_text(strip=True) if el.name == "a" else iframe_text
+            self.pdf_links.append({"url": url, "text": text})
+
+    def find(self, query):
+        """
+        Rows matching `query` like a PDF search does (case-insensitive text, or a case number /
+        CNR in any spelling), with probable serial and court.
+        """
+        matcher = QueryMatcher(query)
+        hits = []
+        for text, cells in self.rows:
+            if not matcher.matches(text):
+                continue
+            serial = next((c for c in cells if c.isdigit()), None)
+            court = None
+            for c in reversed(cells):
+                low = c.lower()
+                if any(w in low for w in _COURT_WORDS):
+                    court = c
+                    break
+            hits.append({"row_text": text, "serial": serial, "court": court, "cells": cells})
+        return hits
@@ -5,32 +5,31 @@ Interactive Selenium flow:
 - Opens a Chrome window for you to navigate/select/dropdowns and solve captcha.
 - After you press ENTER, script scrapes all PDF links rendered on the page,
   exports browser cookies to a requests session, downloads every PDF, and saves a JSON.
+- The browser cookies are saved per host (cookie_store.py). Later runs on the same host
+  first try the page with plain requests and those cookies, and only open Chrome when
+  they have expired or the server rejects them.
 
 Save as:
 C:/Users/Hp/Desktop/ecourts-scraper/interactive_download_all_judges.py
+
+Also available as: python -m ecourts interactive --url "<url>" --date YYYY-MM-DD
 """
 
 import argparse
 import os
 import json
 import time
-from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) eCourtsInteractive/1.0"
+from court_directory import add_location_args, resolve_location
+from cookie_store import forget, is_rejected, load_session, save_cookies
+from downloader import DEFAULT_WORKERS, download_many
+from ecourts.common import USER_AGENT, extract_pdf_links, http_get, output_folder
+from rate_control import print_host_stats
 
-def ensure_dir(p): os.makedirs(p, exist_ok=True)
-
-def save_json(data, base_url, date):
-    out_dir = os.path.join("outputs", base_url.replace("https://", "").replace("http://", "").replace("/", "_"), date)
-    ensure_dir(out_dir)
+def save_json(data, page_url, date, out="outputs"):
+    out_dir = output_folder(out, page_url, date)
     out_path = os.path.join(out_dir, f"all_judges_{date}.json")
     with open(out_path, "w", encoding="utf-8") as fh:
         json.dump(data, fh, ensure_ascii=False, indent=2)
@@ -39,54 +38,81 @@ def save_json(data, base_url, date):
 
 def fetch_rendered_page(url, headless=False):
     """Launch chrome, let user interact, then return page_source and driver (for cookies)."""
+    # Imported here so a run that reuses saved cookies never loads Selenium.
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from browser_pool import chromedriver_path
+
     opts = webdriver.ChromeOptions()
     if headless:
         opts.add_argument("--headless=new")
     opts.add_argument("--disable-blink-features=AutomationControlled")
     opts.add_argument("--disable-gpu")
-    service = Service(ChromeDriverManager().install())
+    service = Service(chromedriver_path())
     driver = webdriver.Chrome(service=service, options=opts)
     driver.get(url)
     return driver
 
-def extract_pdf_links_from_html(html, base_url):
-    soup = BeautifulSoup(html, "html.parser")
-    links = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        if href and ".pdf" in href.lower():
-            links.append({"text": a.get_text(strip=True), "url": urljoin(base_url, href)})
-    for iframe in soup.find_all("iframe", src=True):
-        src = iframe["src"].strip()
-        if src and ".pdf" in src.lower():
-            links.append({"text": "iframe", "url": urljoin(base_url, src)})
-    seen = set(); out=[]
-    for l in links:
-        if l["url"] not in seen:
-            out.append(l); seen.add(l["url"])
-    return out
-
-def transfer_cookies_to_session(driver):
+def transfer_cookies_to_session(driver, user_agent=None):
     sess = requests.Session()
-    sess.headers.update({"User-Agent": USER_AGENT})
+    sess.headers.update({"User-Agent": user_agent or USER_AGENT})
     for c in driver.get_cookies():
         sess.cookies.set(c['name'], c['value'], domain=c.get('domain'))
     return sess
 
-def download_file_with_session(session, url, dest_folder, timeout=60):
-    ensure_dir(dest_folder)
-    fname = os.path.basename(url.split("?")[0]) or "file.pdf"
-    fname = fname.replace("/", "_").replace("\\", "_")
-    local_path = os.path.join(dest_folder, fname)
-    with session.get(url, stream=True, timeout=timeout) as r:
-        r.raise_for_status()
-        with open(local_path, "wb") as fh:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    fh.write(chunk)
-    return local_path
-
-def interactive_scrape_and_download(url, date, headless=False, wait_after_press=1):
+def fetch_with_saved_session(url):
+    """
+    Try the cause-list page with the cookies saved by an earlier browser session.
+    Returns (session, final_url, pdf_links), or None when there are no usable cookies.
+    """
+    session = load_session(url)
+    if session is None:
+        return None
+    try:
+        r = http_get(url, session=session)
+    except requests.RequestException as e:
+        print("[*] Saved session request failed:", e)
+        return None
+    if is_rejected(r) or not r.ok:
+        print(f"[*] Server rejected the saved session (HTTP {r.status_code}).")
+        forget(url)
+        return None
+    pdf_links = extract_pdf_links(r.text, r.url)
+    if not pdf_links:
+        print("[*] No PDF links with the saved session (it may have expired).")
+        return None
+    return session, r.url, pdf_links
+
+def download_links(session, pdf_links, final_url, date, workers=DEFAULT_WORKERS, out="outputs"):
+    """Download `pdf_links` with `session`; returns (downloaded, out_dir, rejected) where rejected counts 401/403s."""
+    out_dir, json_path = save_json(pdf_links, final_url, date, out=out)
+    downloaded = []
+    rejected = 0
+    for item, local_path, err in download_many(pdf_links, out_dir, session=session, workers=workers):
+        if err is None:
+            downloaded.append({"text": item.get("text"), "url": item["url"], "path": local_path})
+        else:
+            rejected += is_rejected(getattr(err, "response", None))
+            downloaded.append({"text": item.get("text"), "url": item["url"], "path": None, "error": str(err)})
+
+    with open(json_path, "w", encoding="utf-8") as fh:
+        json.dump(downloaded, fh, ensure_ascii=False, indent=2)
+    return downloaded, out_dir, rejected
+
+def interactive_scrape_and_download(url, date, headless=False, wait_after_press=1, workers=DEFAULT_WORKERS,
+                                    reuse_session=True, out="outputs"):
+    if reuse_session:
+        reused = fetch_with_saved_session(url)
+        if reused:
+            session, final_url, pdf_links = reused
+            print(f"[+] Reusing saved browser session: found {len(pdf_links)} PDF link(s) without opening Chrome.")
+            downloaded, out_dir, rejected = download_links(session, pdf_links, final_url, date, workers=workers, out=out)
+            if not rejected:
+                print(f"[+] Completed downloads. Files & JSON saved in: {out_dir}")
+                return downloaded, out_dir
+            forget(url)
+            print(f"[!] Server rejected the saved session for {rejected} download(s); falling back to the browser.")
+
     print("[*] Starting browser. Please interact with the page (select dropdowns/date and solve CAPTCHA).")
     driver = fetch_rendered_page(url, headless=headless)
 
@@ -105,7 +131,7 @@ INSTRUCTIONS (manual):
 
     page_html = driver.page_source
     final_url = driver.current_url
-    pdf_links = extract_pdf_links_from_html(page_html, final_url)
+    pdf_links = extract_pdf_links(page_html, final_url)
     print(f"[*] Found {len(pdf_links)} PDF link(s) on the rendered page.")
 
     if not pdf_links:
@@ -113,42 +139,40 @@ INSTRUCTIONS (manual):
         driver.quit()
         return [], None
 
-    session = transfer_cookies_to_session(driver)
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent")
+    except Exception:
+        user_agent = None
+    session = transfer_cookies_to_session(driver, user_agent)
+    save_cookies(final_url, driver.get_cookies(), user_agent=user_agent)
     driver.quit()
 
-    out_dir, json_path = save_json(pdf_links, final_url, date)
-    downloaded = []
-    for idx, item in enumerate(pdf_links, start=1):
-        url_pdf = item["url"]
-        print(f"Downloading {idx}/{len(pdf_links)}: {url_pdf}")
-        try:
-            local_path = download_file_with_session(session, url_pdf, out_dir)
-            print("  -> saved to:", local_path)
-            downloaded.append({"text": item.get("text"), "url": url_pdf, "path": local_path})
-        except Exception as e:
-            print("  ! failed to download:", url_pdf, "error:", e)
-            downloaded.append({"text": item.get("text"), "url": url_pdf, "path": None, "error": str(e)})
-
-    with open(json_path, "w", encoding="utf-8") as fh:
-        json.dump(downloaded, fh, ensure_ascii=False, indent=2)
-
+    downloaded, out_dir, _ = download_links(session, pdf_links, final_url, date, workers=workers, out=out)
     print(f"[+] Completed downloads. Files & JSON saved in: {out_dir}")
     return downloaded, out_dir
 
 def main():
     parser = argparse.ArgumentParser(description="Interactive eCourts downloader (with automatic PDF download).")
-    parser.add_argument("--url", required=True, help="Cause-list page URL")
+    parser.add_argument("--url", help="Cause-list page URL")
+    add_location_args(parser)
     parser.add_argument("--date", required=True, help="Date YYYY-MM-DD")
     parser.add_argument("--headless", action="store_true", help="Run Chrome headless (not recommended if CAPTCHA needs solving)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent PDF downloads")
+    parser.add_argument("--out", default="outputs", help="Output folder")
+    parser.add_argument("--new-session", action="store_true",
+                        help="Ignore saved cookies for this host and always open the browser")
     args = parser.parse_args()
+    resolve_location(args, parser)
 
-    downloaded, out_dir = interactive_scrape_and_download(args.url, args.date, headless=args.headless)
+    downloaded, out_dir = interactive_scrape_and_download(args.url, args.date, headless=args.headless, workers=args.workers,
+                                                          reuse_session=not args.new_session, out=args.out)
     if downloaded is None:
         print("[!] No downloads performed.")
     elif len(downloaded) == 0:
         print("[!] No PDF links were found on the page.")
     else:
         print(f"[+] {len(downloaded)} entries saved. See folder: {out_dir}")
+    print_host_stats()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,171 @@
+"""
+lookup_server.py
+Small local HTTP lookup service over the outputs/ tree.
+
+At startup the FTS5 index (cause_list_index.py) is brought up to date once; after that a
+background thread re-runs the incremental index build every --refresh seconds so new
+downloads show up without a restart. Answers are enriched with serial and court from the
+structured rows (cause_list_rows.py): each PDF's rows are loaded once, by one request
+thread while others asking for the same PDF wait for it, and kept in an LRU of
+--rows-cache PDFs. Recent queries are served from an LRU cache; both are invalidated
+whenever the index changes. The index schema is set up once, by the startup build.
+
+Usage:
+  (venv) python lookup_server.py --out outputs --port 5000
+  GET /search?q=MHAU019999992015&date=2025-10-19&site=newdelhi
+  GET /healthz
+"""
+
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Flask, jsonify, request
+
+from case_keys import QueryMatcher
+from cause_list_index import INDEX_NAME, build_index, query_index
+from cause_list_rows import load_rows
+from ocr import add_ocr_args, apply_ocr_args
+from pdf_search import heuristics_parse
+
+class LookupService:
+    def __init__(self, out_root, index_path=None, cache_size=1024, rows_cache_size=256):
+        self.out_root = out_root
+        self.index_path = index_path or os.path.join(out_root, INDEX_NAME)
+        self.cache_size = cache_size
+        self.rows_cache_size = rows_cache_size
+        self._cache = OrderedDict()
+        self._rows = OrderedDict()
+        # One lock per PDF whose rows are being loaded, so concurrent requests load them once.
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.last_refresh = None
+        self.refresh()
+
+    def refresh(self):
+        """Incrementally re-index; drop cached answers if anything was added, changed or removed."""
+        stats = build_index(self.out_root, self.index_path)
+        changed = stats["added"] + stats["updated"] + stats["removed"]
+        with self._lock:
+            if changed:
+                self.generation += 1
+                self._cache.clear()
+                self._rows.clear()
+            self.last_refresh = time.time()
+        return stats
+
+    def _cached_rows(self, pdf):
+        with self._lock:
+            rows = self._rows.get(pdf)
+            if rows is not None:
+                self._rows.move_to_end(pdf)
+            return rows
+
+    def _rows_for(self, pdf):
+        rows = self._cached_rows(pdf)
+        if rows is not None:
+            return rows
+        with self._lock:
+            loading = self._loading.setdefault(pdf, threading.Lock())
+        with loading:
+            rows = self._cached_rows(pdf)
+            if rows is None:
+                generation = self.generation
+                try:
+                    rows = list(load_rows(pdf))
+                except Exception:
+                    rows = []
+                with self._lock:
+                    # Rows loaded across a refresh may be stale; use them once, don't keep them.
+                    if generation == self.generation:
+                        self._rows[pdf] = rows
+                        while len(self._rows) > self.rows_cache_size:
+                            self._rows.popitem(last=False)
+        with self._lock:
+            if self._loading.get(pdf) is loading:
+                del self._loading[pdf]
+        return rows
+
+    def _enrich(self, hit, query):
+        matcher = QueryMatcher(query)
+        row = next((r for r in self._rows_for(hit["pdf"]) if r["page"] == hit["page"] and matcher.matches(r["text"])),
+                   None)
+        if row:
+            return dict(hit, serial=row["serial"], court=row["court"] or hit["judge"])
+        heur = heuristics_parse(hit["snippet"])
+        return dict(hit, serial=heur["serial"], court=heur["court"] or hit["judge"])
+
+    def search(self, query, date=None, site=None, limit=50):
+        """Returns (hits, served_from_cache)."""
+        # Not keyed by case key: other spellings of a case number share its key hits but not its literal ones.
+        key = (query.strip().lower(), date, site, limit)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key], True
+        hits = [self._enrich(h, query) for h in query_index(self.index_path, query, site=site, date=date, limit=limit)]
+        with self._lock:
+            self._cache[key] = hits
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return hits, False
+
+def start_refresher(service, interval):
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                service.refresh()
+            except Exception as e:
+                print("  ! index refresh failed:", e)
+    t = threading.Thread(target=loop, name="index-refresh", daemon=True)
+    t.start()
+    return t
+
+def create_app(service):
+    app = Flask(__name__)
+
+    @app.get("/search")
+    def search():
+        q = (request.args.get("q") or "").strip()
+        if not q:
+            return jsonify({"error": "missing q"}), 400
+        t0 = time.perf_counter()
+        hits, cached = service.search(
+            q, date=request.args.get("date"), site=request.args.get("site"),
+            limit=request.args.get("limit", 50, type=int),
+        )
+        return jsonify({"query": q, "hits": hits, "cached": cached,
+                        "ms": round((time.perf_counter() - t0) * 1000, 2)})
+
+    @app.get("/healthz")
+    def healthz():
+        return jsonify({"ok": True, "generation": service.generation, "last_refresh": service.last_refresh,
+                        "cached_queries": len(service._cache)})
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local cause-list lookup service")
+    parser.add_argument("--out", default="outputs", help="Outputs folder containing <site>/<date>/ PDFs")
+    parser.add_argument("--index", help=f"Index file (default: <out>/{INDEX_NAME})")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--refresh", type=int, default=300, help="Seconds between incremental re-index runs (0 = never)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Number of recent queries kept in memory")
+    parser.add_argument("--rows-cache", type=int, default=256, help="Number of PDFs whose structured rows are kept in memory")
+    add_ocr_args(parser)
+    args = parser.parse_args()
+    apply_ocr_args(args)
+
+    service = LookupService(args.out, index_path=args.index, cache_size=args.cache_size,
+                            rows_cache_size=args.rows_cache)
+    if args.refresh > 0:
+        start_refresher(service, args.refresh)
+    create_app(service).run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
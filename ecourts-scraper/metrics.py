@@ -0,0 +1,191 @@
+"""
+metrics.py
+Lightweight per-stage timing and throughput instrumentation for the scraper pipeline.
+
+Code under measurement opens a stage (`with stage("download", item=url) as m: m.add(bytes=n)`)
+or is wrapped with @timed_stage. For every stage we keep call count, wall time, bytes,
+pages, retries and failures, plus one record per item (usually a PDF). Stages may nest,
+e.g. "search" time includes the "extract_text" it triggers.
+
+Worker processes (pdf_pool.map_pdfs) ship their metrics back to the parent, so a run
+report covers parallel work too. Reports are JSON (run_report_<date>.json) with an
+optional Prometheus textfile; profile() wraps a block in cProfile for --profile runs.
+Other modules can add a section to the report (add_section), e.g. per-host HTTP stats.
+"""
+
+import functools
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+COUNTERS = ("bytes", "pages", "retries", "failures")
+
+class StageRecord:
+    def __init__(self, stage, item):
+        self.stage = stage
+        self.item = item
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.error = None
+
+    def add(self, **counts):
+        for k, v in counts.items():
+            self.counts[k] = self.counts.get(k, 0) + v
+
+class RunMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections = {}
+        self.reset()
+
+    def add_section(self, name, fn):
+        """Include `fn()` under `name` in every report."""
+        self.sections[name] = fn
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.stages = {}
+            self.items = []
+
+    def record(self, name, seconds, item=None, error=None, **counts):
+        """Add one finished measurement (for code that cannot use a with-block, e.g. generators)."""
+        with self._lock:
+            s = self.stages.setdefault(name, dict(calls=0, seconds=0.0, **dict.fromkeys(COUNTERS, 0)))
+            s["calls"] += 1
+            s["seconds"] += seconds
+            for k, v in counts.items():
+                s[k] = s.get(k, 0) + v
+            if item is not None:
+                entry = {"stage": name, "item": item, "seconds": round(seconds, 6)}
+                entry.update({k: v for k, v in counts.items() if v})
+                if error:
+                    entry["error"] = error
+                self.items.append(entry)
+
+    @contextmanager
+    def stage(self, name, item=None):
+        rec = StageRecord(name, item)
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                rec.add(failures=1)
+                rec.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.record(rec.stage, time.perf_counter() - t0, item=rec.item, error=rec.error, **rec.counts)
+
+    def snapshot_and_reset(self):
+        """Hand this process's metrics to a parent process (see merge)."""
+        with self._lock:
+            snap = {"stages": self.stages, "items": self.items}
+        self.reset()
+        return snap
+
+    def merge(self, snap):
+        with self._lock:
+            for name, s in snap["stages"].items():
+                mine = self.stages.setdefault(name, dict.fromkeys(s, 0))
+                for k, v in s.items():
+                    mine[k] = mine.get(k, 0) + v
+            self.items.extend(snap["items"])
+
+    def report(self):
+        with self._lock:
+            stages = {}
+            for name, s in self.stages.items():
+                s = dict(s, seconds=round(s["seconds"], 6))
+                if s["seconds"] and s["bytes"]:
+                    s["mb_per_s"] = round(s["bytes"] / 1e6 / s["seconds"], 3)
+                if s["seconds"] and s["pages"]:
+                    s["pages_per_s"] = round(s["pages"] / s["seconds"], 2)
+                stages[name] = s
+            rep = {
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "wall_seconds": round(time.time() - self.started, 3),
+                "stages": stages,
+                "items": list(self.items),
+            }
+        for name, fn in self.sections.items():
+            rep[name] = fn()
+        return rep
+
+    def write_report(self, folder, date_str):
+        path = os.path.join(folder, f"run_report_{date_str}.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, ensure_ascii=False, indent=2)
+        return path
+
+    def write_prometheus(self, path):
+        """Write stage totals in the node_exporter textfile format."""
+        rep = self.report()
+        lines = []
+        for metric, key, help_text in (
+            ("ecourts_stage_seconds_total", "seconds", "Wall time spent in the stage"),
+            ("ecourts_stage_calls_total", "calls", "Number of stage invocations"),
+            ("ecourts_stage_bytes_total", "bytes", "Bytes transferred in the stage"),
+            ("ecourts_stage_pages_total", "pages", "PDF pages processed in the stage"),
+            ("ecourts_stage_retries_total", "retries", "Retries in the stage"),
+            ("ecourts_stage_failures_total", "failures", "Failures in the stage"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, s in sorted(rep["stages"].items()):
+                lines.append(f'{metric}{{stage="{name}"}} {s.get(key, 0)}')
+        lines.append("# HELP ecourts_run_wall_seconds Wall time of the whole run")
+        lines.append("# TYPE ecourts_run_wall_seconds gauge")
+        lines.append(f"ecourts_run_wall_seconds {rep['wall_seconds']}")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+        return path
+
+METRICS = RunMetrics()
+stage = METRICS.stage
+
+def finish_run(folder, date_str, prom_file=None):
+    """Write run_report_<date>.json into `folder` (and the Prometheus textfile if asked)."""
+    path = METRICS.write_report(folder, date_str)
+    print("[+] Run report saved to:", path)
+    if prom_file:
+        METRICS.write_prometheus(prom_file)
+        print("[+] Prometheus metrics written to:", prom_file)
+    return path
+
+def timed_stage(name, item_arg=0):
+    """Decorator: run the function inside stage `name`, using positional arg `item_arg` as the item."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            item = args[item_arg] if item_arg is not None and len(args) > item_arg else None
+            with stage(name, item=str(item) if item is not None else None):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+@contextmanager
+def profile(out_prefix, enabled=True, top=40):
+    """cProfile the block; writes <out_prefix>.prof and a cumulative-time summary <out_prefix>.txt."""
+    if not enabled:
+        yield
+        return
+    import cProfile
+    import pstats
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        prof.dump_stats(out_prefix + ".prof")
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+        with open(out_prefix + ".txt", "w", encoding="utf-8") as fh:
+            fh.write(buf.getvalue())
+        print("[+] Profile saved to", out_prefix + ".prof")
@@ -0,0 +1,64 @@
+"""
+multi_match.py
+Aho-Corasick automaton for matching many query strings in one pass over a text.
+
+Used by pdf_search.py --queries-file so a watchlist of thousands of CNRs costs one scan per
+PDF instead of one scan per CNR. Matching is case-insensitive (patterns and text are
+lowercased).
+"""
+
+from collections import deque
+
+class AhoCorasick:
+    def __init__(self, patterns):
+        self.patterns = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        seen = {}
+        for p in patterns:
+            key = p.lower()
+            if not key or key in seen:
+                continue
+            seen[key] = len(self.patterns)
+            self.patterns.append(p)
+            self._add(key, seen[key])
+        self._build()
+
+    def _add(self, key, pid):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(pid)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text):
+        """Yield (start_index, pattern_id) for every match of every pattern in `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        lens = [len(p) for p in self.patterns]
+        node = 0
+        for i, ch in enumerate(text.lower()):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                yield i - lens[pid] + 1, pid
@@ -0,0 +1,117 @@
+"""
+ocr.py
+Tesseract OCR fallback for scanned (image-only) cause-list pages.
+
+Pages whose text layer is empty are rasterised with PyMuPDF at OCR_DPI and run through
+Tesseract in a process pool. Results are cached by the sha256 of the rendered page image
+(in the text cache database), so a scanned board is OCR'd only once. Pages that have a
+real text layer never reach this module.
+
+OCR is on automatically when pytesseract and the tesseract binary are available; it can
+be forced off with ECOURTS_OCR=0 or configure(enabled=False). Workers of a pdf_pool.py
+process pool OCR in-process (workers=1), so pools are never nested.
+"""
+
+import hashlib
+import importlib.util
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import stage
+
+# pytesseract (and Pillow) are imported on first use so searches over text PDFs don't load them.
+_HAS_PYTESSERACT = importlib.util.find_spec("pytesseract") is not None
+
+OCR_DPI = int(os.environ.get("ECOURTS_OCR_DPI", "300"))
+OCR_LANG = os.environ.get("ECOURTS_OCR_LANG", "eng")
+MIN_TEXT_CHARS = 1
+
+settings = {
+    "enabled": os.environ.get("ECOURTS_OCR", "auto").lower() not in ("0", "false", "no", "off"),
+    "dpi": OCR_DPI,
+    "lang": OCR_LANG,
+    "workers": os.cpu_count() or 1,
+}
+
+_available = None
+_tesseract_version = None
+
+def configure(enabled=None, dpi=None, lang=None, workers=None):
+    for key, value in (("enabled", enabled), ("dpi", dpi), ("lang", lang), ("workers", workers)):
+        if value is not None:
+            settings[key] = value
+
+def add_ocr_args(parser):
+    """--no-ocr/--ocr-dpi/--ocr-lang for the scripts that extract text from PDFs."""
+    parser.add_argument("--no-ocr", action="store_true", help="Never OCR pages that have no text layer")
+    parser.add_argument("--ocr-dpi", type=int, help=f"Rasterisation DPI for OCR (default {OCR_DPI})")
+    parser.add_argument("--ocr-lang", help=f"Tesseract language(s), e.g. eng+hin (default {OCR_LANG})")
+
+def apply_ocr_args(args):
+    """configure() from the options added by add_ocr_args()."""
+    configure(enabled=False if args.no_ocr else None, dpi=args.ocr_dpi, lang=args.ocr_lang)
+
+def ocr_available():
+    """True when OCR is enabled and Tesseract can actually be run."""
+    global _available, _tesseract_version
+    if not settings["enabled"] or not _HAS_PYTESSERACT:
+        return False
+    if _available is None:
+        try:
+            import pytesseract
+            _tesseract_version = str(pytesseract.get_tesseract_version())
+            _available = True
+        except Exception:
+            _available = False
+    return _available
+
+def ocr_version():
+    """Part of the text-cache extractor key, so OCR'd and non-OCR'd text never mix."""
+    if not ocr_available():
+        return None
+    return f"tesseract-{_tesseract_version}-{settings['lang']}-{settings['dpi']}dpi"
+
+def is_text_less(text):
+    return len(text.strip()) < MIN_TEXT_CHARS
+
+def render_page(page, dpi=None):
+    """PNG bytes of one PyMuPDF page rendered at `dpi`."""
+    return page.get_pixmap(dpi=dpi or settings["dpi"]).tobytes("png")
+
+def _tesseract(png, lang):
+    import pytesseract
+    from PIL import Image
+    return pytesseract.image_to_string(Image.open(io.BytesIO(png)), lang=lang)
+
+def ocr_pages(doc, page_indices, cache=None):
+    """
+    OCR the given pages of an open PyMuPDF document. Returns {page_index: text}.
+    Cached page images are not re-OCR'd; misses run in a process pool.
+    """
+    lang = settings["lang"]
+    found = {}
+    todo = []
+    for i in page_indices:
+        png = render_page(doc[i])
+        digest = hashlib.sha256(png).hexdigest()
+        text = cache.get_ocr(digest, lang) if cache is not None else None
+        if text is None:
+            todo.append((i, digest, png))
+        else:
+            found[i] = text
+    if not todo:
+        return found
+    workers = min(settings["workers"], len(todo))
+    with stage("ocr") as m:
+        m.add(pages=len(todo))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                texts = list(pool.map(_tesseract, [png for _, _, png in todo], [lang] * len(todo)))
+        else:
+            texts = [_tesseract(png, lang) for _, _, png in todo]
+    for (i, digest, _), text in zip(todo, texts):
+        found[i] = text
+        if cache is not None:
+            cache.put_ocr(digest, lang, text)
+    return found
@@ -0,0 +1,86 @@
+"""
+pdf_pool.py
+Run a per-PDF function (text extraction + matching) across a process pool.
+
+Results come back in sorted path order regardless of completion order. Exceptions raised
+for one PDF are returned as that PDF's error; if a broken PDF crashes its worker process,
+the PDFs that were still pending are retried one by one in fresh processes so only the
+culprit is reported as failed. Stage metrics (metrics.py) recorded in the workers are
+merged into the parent process's run metrics.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import METRICS
+
+def _reset_worker_state():
+    # A forked child must not reuse the parent's SQLite connection or count the parent's metrics.
+    import blob_store
+    import ocr
+    import text_cache
+    text_cache.reset_default_cache()
+    blob_store.reset_stores()
+    METRICS.reset()
+    # The pool already spreads PDFs over the CPUs: OCR in a worker must not start a pool of its own.
+    ocr.configure(workers=1)
+
+def _call(func, path, args):
+    try:
+        return func(path, *args), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def _call_in_worker(func, path, args):
+    """_call, plus this PDF's stage metrics for the parent to merge."""
+    result, err = _call(func, path, args)
+    return result, err, METRICS.snapshot_and_reset()
+
+def _collect(outcome):
+    result, err, snap = outcome
+    METRICS.merge(snap)
+    return result, err
+
+def _run_isolated(func, path, args):
+    with ProcessPoolExecutor(max_workers=1, initializer=_reset_worker_state) as pool:
+        try:
+            return _collect(pool.submit(_call_in_worker, func, path, args).result())
+        except BrokenProcessPool:
+            return None, "worker process crashed"
+
+def map_pdfs(func, pdf_paths, *args, workers=1):
+    """
+    Apply `func(pdf_path, *args)` to every path and yield (path, result, error) in sorted order.
+    `func` must be a module-level function so it can be sent to worker processes.
+    """
+    paths = sorted(str(p) for p in pdf_paths)
+    if workers <= 1 or len(paths) <= 1:
+        for p in paths:
+            result, err = _call(func, p, args)
+            yield p, result, err
+        return
+
+    done = {}
+    ctx = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_reset_worker_state)
+    try:
+        futures = {p: pool.submit(_call_in_worker, func, p, args) for p in paths}
+        for p in paths:
+            try:
+                done[p] = _collect(futures[p].result())
+            except BrokenProcessPool:
+                break
+            yield (p,) + done[p]
+    finally:
+        # Also runs when the caller stops iterating early: drop queued PDFs.
+        pool.shutdown(wait=True, cancel_futures=True)
+    for p in paths:
+        if p not in done:
+            fut = futures[p]
+            if fut.done() and fut.exception() is None:
+                result, err = _collect(fut.result())
+            else:
+                result, err = _run_isolated(func, p, args)
+            done[p] = (result, err)
+            yield p, result, err
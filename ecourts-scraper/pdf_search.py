@@ -6,30 +6,36 @@ for serial number and court name.
 Usage:
   (venv) python pdf_search.py --pdf-folder "outputs/site_path/2025-10-19" --query "CNR1234567890"
   (venv) python pdf_search.py --pdf-folder "outputs/site_path/2025-10-19" --query "CIVIL 1234 2025"
+  (venv) python pdf_search.py --pdf-folder "outputs/site_path/2025-10-19" --queries-file watchlist.txt
+  (venv) python pdf_search.py --pdf-folder "outputs/site_path/2025-10-19" --queries-file watchlist.txt --jsonl
+  (venv) python pdf_search.py --pdf-folder "outputs/site_path/2025-10-19" --query "CNR1234567890" --exists
+  (venv) python -m ecourts search --pdf-folder "outputs/site_path/2025-10-19" --query "CNR1234567890"
 """
 
 import os
+import re
+import sys
 import json
 import csv
 import argparse
 from pathlib import Path
 
-try:
-    import fitz
-except Exception as e:
-    raise RuntimeError("PyMuPDF not installed. Run: pip install pymupdf") from e
-
-def extract_text_from_pdf(pdf_path):
-    text = []
-    doc = fitz.open(pdf_path)
-    for page in doc:
-        try:
-            page_text = page.get_text("text")
-        except Exception:
-            page_text = ""
-        text.append(page_text)
-    doc.close()
-    return "\n".join(text)
+import ocr
+from blob_store import list_pdfs
+from case_keys import QueryMatcher, merge_spans
+from cause_list_rows import load_rows
+from metrics import timed_stage
+from multi_match import AhoCorasick
+from pdf_pool import map_pdfs
+from text_cache import fitz, iter_keyed_page_texts, iter_page_texts, page_texts
+
+def extract_text_from_pdf(pdf_path, use_cache=True):
+    return "\n".join(page_texts(pdf_path, use_cache=use_cache))
+
+def _snippet(text, i, qlen):
+    start = max(0, i - 120)
+    end = min(len(text), i + qlen + 120)
+    return text[start:end].replace("\n", " ").strip()
 
 def find_occurrences(text, query):
     q = query.lower()
@@ -40,13 +46,40 @@ def find_occurrences(text, query):
         i = lowered.find(q, idx)
         if i == -1:
             break
-        start = max(0, i - 120)
-        end = min(len(text), i + len(q) + 120)
-        snippet = text[start:end].replace("\n", " ").strip()
-        hits.append({"index": i, "snippet": snippet})
+        hits.append({"index": i, "snippet": _snippet(text, i, len(q))})
         idx = i + len(q)
     return hits
 
+def find_matches(text, matcher, key_map=None):
+    """
+    Hits for a case_keys.QueryMatcher: literal occurrences plus other spellings of a case number / CNR
+    (looked up in `key_map`, the page's stored case-key map, when given).
+    """
+    return [{"index": a, "snippet": _snippet(text, a, b - a)} for a, b in matcher.spans(text, key_map)]
+
+def find_occurrences_multi(text, automaton):
+    """
+    One pass over `text` for every pattern in `automaton`.
+    Returns {query: hits} with the same non-overlapping hits find_occurrences gives per query.
+    """
+    found = {}
+    next_ok = {}
+    for i, pid in automaton.finditer(text):
+        if i < next_ok.get(pid, 0):
+            continue
+        q = automaton.patterns[pid]
+        next_ok[pid] = i + len(q)
+        found.setdefault(q, []).append({"index": i, "snippet": _snippet(text, i, len(q))})
+    return found
+
+def load_queries(path):
+    """One query per line; blank lines and lines starting with '#' are ignored."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return [ln.strip() for ln in fh if ln.strip() and not ln.lstrip().startswith("#")]
+
+_SERIAL_NUM_RE = re.compile(r"\b(\d{1,4})\b")
+_LEADING_NUM_RE = re.compile(r"^\s*(\d{1,4})\b")
+
 def heuristics_parse(snippet):
     """
     Try to extract probable serial number and court name from a snippet of text.
@@ -59,14 +92,12 @@ def heuristics_parse(snippet):
     for ln in lines:
         low = ln.lower()
         if any(x in low for x in ("sl no", "sr no", "sl.", "sr.", "serial", "s.no", "s no")):
-            import re
-            m = re.search(r"\b(\d{1,4})\b", ln)
+            m = _SERIAL_NUM_RE.search(ln)
             if m:
                 serial = m.group(1)
                 break
     if not serial:
-        import re
-        m = re.search(r"^\s*(\d{1,4})\b", snippet)
+        m = _LEADING_NUM_RE.search(snippet)
         if m:
             serial = m.group(1)
     for ln in lines:
@@ -80,54 +111,261 @@ def heuristics_parse(snippet):
                 break
     return {"serial": serial, "court": court}
 
-def search_folder(folder, query, out_json=None, out_csv=None):
+def iter_page_hits(pdf_path, query, use_cache=True):
+    """
+    Yield (page_no, hit) for every occurrence of `query`, reading one page at a time.
+    Case numbers and CNRs also match in any other spelling (CS 1234/2025 = C.S. No. 1234 of 2025).
+    Stop iterating early and the rest of the PDF is never extracted.
+    """
+    matcher = QueryMatcher(query)
+    # Only a case number / CNR needs the pages' key maps (read from the text cache).
+    if matcher.key:
+        pages = iter_keyed_page_texts(pdf_path, use_cache=use_cache)
+    else:
+        pages = ((text, None) for text in iter_page_texts(pdf_path, use_cache=use_cache))
+    try:
+        for page_no, (text, key_map) in enumerate(pages, start=1):
+            for h in find_matches(text, matcher, key_map):
+                yield page_no, h
+    finally:
+        pages.close()
+
+@timed_stage("search")
+def search_pdf(pdf_path, query, use_cache=True, max_hits=None):
+    """Search one PDF page by page and return its search_folder result entry (at most `max_hits` hits)."""
+    parsed_hits = []
+    for page_no, h in iter_page_hits(pdf_path, query, use_cache=use_cache):
+        heur = heuristics_parse(h["snippet"])
+        parsed_hits.append({"page": page_no, "snippet": h["snippet"], "heuristics": heur})
+        if max_hits and len(parsed_hits) >= max_hits:
+            break
+    return {
+        "pdf": pdf_path,
+        "num_hits": len(parsed_hits),
+        "hits": parsed_hits
+    }
+
+@timed_stage("search")
+def search_pdf_rows(pdf_path, query, use_cache=True, max_hits=None):
+    """
+    Search one PDF's structured rows (see cause_list_rows.py) instead of raw text.
+    Serial and court come from the row itself rather than snippet heuristics.
+    """
+    matcher = QueryMatcher(query)
+    hits = []
+    for row in load_rows(pdf_path):
+        if matcher.matches(row["text"]):
+            hits.append({
+                "page": row["page"],
+                "snippet": row["text"],
+                "heuristics": {"serial": row["serial"], "court": row["court"]},
+                "row": row,
+            })
+            if max_hits and len(hits) >= max_hits:
+                break
+    return {"pdf": pdf_path, "num_hits": len(hits), "hits": hits}
+
+CSV_COLUMNS = ["pdf", "num_hits", "sample_serial", "sample_court"]
+
+def _csv_row(r):
+    heur = r["hits"][0]["heuristics"] if r["hits"] else {"serial": "", "court": ""}
+    return [r["pdf"], r["num_hits"], heur["serial"], heur["court"]]
+
+class ResultSink:
+    """
+    Write search results as they are produced: one JSON line per result (out_jsonl) and one
+    CSV summary row per result (out_csv). out_json is the classic indented list, written at
+    close() from the results the caller kept.
+    """
+    def __init__(self, out_json=None, out_jsonl=None, out_csv=None, columns=CSV_COLUMNS):
+        self.out_json, self.out_jsonl, self.out_csv = out_json, out_jsonl, out_csv
+        self.jsonl = open(out_jsonl, "w", encoding="utf-8") if out_jsonl else None
+        self.csv_fh = open(out_csv, "w", newline='', encoding='utf-8') if out_csv else None
+        if self.csv_fh:
+            self.csv = csv.writer(self.csv_fh)
+            self.csv.writerow(columns)
+
+    def write(self, result, csv_row):
+        if self.jsonl:
+            self.jsonl.write(json.dumps(result, ensure_ascii=False) + "\n")
+            self.jsonl.flush()
+        if self.csv_fh:
+            self.csv.writerow(csv_row)
+
+    def keep(self, result):
+        """What the caller should hold on to: everything for out_json, else just the first hit."""
+        if self.out_json or not self.jsonl:
+            return result
+        return dict(result, hits=result["hits"][:1])
+
+    def close(self, results):
+        if self.jsonl:
+            self.jsonl.close()
+            print("[+] JSONL saved to", self.out_jsonl)
+        if self.out_json:
+            with open(self.out_json, "w", encoding="utf-8") as fh:
+                json.dump(results, fh, ensure_ascii=False, indent=2)
+            print("[+] JSON saved to", self.out_json)
+        if self.csv_fh:
+            self.csv_fh.close()
+            print("[+] CSV saved to", self.out_csv)
+
+def search_folder(folder, query, out_json=None, out_csv=None, use_cache=True, workers=1,
+                  max_hits=None, stop_on_first=False, rows=False, out_jsonl=None):
+    """
+    Search every PDF in `folder`. `max_hits` caps hits per PDF (1 = first hit only);
+    `stop_on_first` stops the whole folder scan as soon as any PDF has a hit;
+    `rows` searches structured cause-list rows instead of raw page text.
+    With `out_jsonl` each PDF's result is written as soon as it is ready, and (unless
+    `out_json` is also requested) the returned entries keep only their first hit.
+    """
     folder = Path(folder)
     assert folder.exists() and folder.is_dir(), f"{folder} not found"
-    pdf_files = sorted([p for p in folder.glob("*.pdf")])
+    pdf_files = list_pdfs(folder)
     results = []
-    for pdf in pdf_files:
-        print("Searching in:", pdf.name)
-        try:
-            text = extract_text_from_pdf(str(pdf))
-        except Exception as e:
-            print("  ! failed to extract text:", e)
-            continue
-        hits = find_occurrences(text, query)
-        parsed_hits = []
-        for h in hits:
-            heur = heuristics_parse(h["snippet"])
-            parsed_hits.append({"snippet": h["snippet"], "heuristics": heur})
-        results.append({
-            "pdf": str(pdf),
-            "num_hits": len(hits),
-            "hits": parsed_hits
-        })
-    if out_json:
-        with open(out_json, "w", encoding="utf-8") as fh:
-            json.dump(results, fh, ensure_ascii=False, indent=2)
-        print("[+] JSON saved to", out_json)
-    if out_csv:
-        with open(out_csv, "w", newline='', encoding='utf-8') as fh:
-            writer = csv.writer(fh)
-            writer.writerow(["pdf", "num_hits", "sample_serial", "sample_court"])
-            for r in results:
-                sample_serial = r["hits"][0]["heuristics"]["serial"] if r["hits"] else ""
-                sample_court = r["hits"][0]["heuristics"]["court"] if r["hits"] else ""
-                writer.writerow([r["pdf"], r["num_hits"], sample_serial, sample_court])
-        print("[+] CSV saved to", out_csv)
+    search_one = search_pdf_rows if rows else search_pdf
+    sink = ResultSink(out_json, out_jsonl, out_csv)
+    try:
+        pdf_results = map_pdfs(search_one, pdf_files, query, use_cache, max_hits, workers=workers)
+        for pdf, result, err in pdf_results:
+            print("Searching in:", Path(pdf).name)
+            if err:
+                print("  ! failed to extract text:", err)
+                continue
+            sink.write(result, _csv_row(result))
+            results.append(sink.keep(result))
+            if stop_on_first and result["num_hits"]:
+                pdf_results.close()
+                break
+    finally:
+        sink.close(results)
+    return results
+
+@timed_stage("search")
+def search_pdf_multi(pdf_path, automaton, use_cache=True, key_queries=None):
+    """
+    Scan one PDF page by page and return its search_folder_multi entries (one per matched query).
+    Every query matches literally through `automaton`; `key_queries` maps canonical case keys
+    to the queries naming them, whose other spellings are found through each page's key map
+    (stored in the text cache, so every keyed query is a dictionary lookup).
+    """
+    found = {}
+    if key_queries:
+        pages = iter_keyed_page_texts(pdf_path, use_cache=use_cache)
+    else:
+        pages = ((text, None) for text in iter_page_texts(pdf_path, use_cache=use_cache))
+    for page_no, (text, key_map) in enumerate(pages, start=1):
+        page_spans = {}
+        for i, pid in automaton.finditer(text):
+            q = automaton.patterns[pid]
+            page_spans.setdefault(q, []).append((i, i + len(q)))
+        if key_queries:
+            for key, spans in key_map.items():
+                for q in key_queries.get(key, ()):
+                    page_spans.setdefault(q, []).extend(spans)
+        for q, spans in page_spans.items():
+            found.setdefault(q, []).extend(
+                {"page": page_no, "snippet": snip, "heuristics": heuristics_parse(snip)}
+                for snip in (_snippet(text, a, b - a) for a, b in merge_spans(spans))
+            )
+    return [
+        {"query": q, "pdf": pdf_path, "num_hits": len(hits), "hits": hits}
+        for q, hits in sorted(found.items())
+    ]
+
+def key_queries_for(queries):
+    """{canonical case key: [queries naming it]} for the case numbers / CNRs among `queries`."""
+    key_queries = {}
+    for q in queries:
+        key = QueryMatcher(q).key
+        if key:
+            key_queries.setdefault(key, []).append(q)
+    return key_queries
+
+def search_folder_multi(folder, queries, out_json=None, out_csv=None, use_cache=True, workers=1, out_jsonl=None):
+    """
+    Search every PDF in `folder` for all `queries` at once, scanning each PDF's text a single time.
+    Returns one entry per (query, pdf) pair with at least one hit (first hit only when
+    streaming to `out_jsonl` without `out_json`, see search_folder).
+    """
+    folder = Path(folder)
+    assert folder.exists() and folder.is_dir(), f"{folder} not found"
+    # Every query matches literally through the automaton; case numbers / CNRs also through the
+    # per-page key map, so their other spellings are found too.
+    automaton = AhoCorasick(queries)
+    key_queries = key_queries_for(automaton.patterns)
+    print(f"[*] {len(automaton.patterns)} distinct queries loaded "
+          f"({sum(len(qs) for qs in key_queries.values())} case numbers/CNRs).")
+    pdf_files = list_pdfs(folder)
+    results = []
+    sink = ResultSink(out_json, out_jsonl, out_csv, columns=["query"] + CSV_COLUMNS)
+    try:
+        for pdf, entries, err in map_pdfs(search_pdf_multi, pdf_files, automaton, use_cache, key_queries,
+                                          workers=workers):
+            print("Searching in:", Path(pdf).name)
+            if err:
+                print("  ! failed to extract text:", err)
+                continue
+            for r in entries:
+                sink.write(r, [r["query"]] + _csv_row(r))
+                results.append(sink.keep(r))
+    finally:
+        sink.close(results)
     return results
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--pdf-folder", required=True, help="Folder containing downloaded PDFs")
-    parser.add_argument("--query", required=True, help="CNR or text to search (case-insensitive)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--query", help="CNR or text to search (case-insensitive)")
+    group.add_argument("--queries-file", help="File with one CNR/case text per line, all searched in one pass")
     parser.add_argument("--out-json", help="Save detailed JSON output")
     parser.add_argument("--out-csv", help="Save summary CSV")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Write detailed results as JSON Lines (one result per line, written as each PDF finishes) "
+                             "instead of one indented JSON file; --out-json then names the .jsonl file")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-extract text instead of using the text cache")
+    parser.add_argument("--workers", type=int, default=1, help="Search PDFs in N parallel processes")
+    ocr.add_ocr_args(parser)
+    parser.add_argument("--rows", action="store_true",
+                        help="Search structured cause-list rows (serial/court taken from the row, not guessed)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--first-hit", action="store_true", help="Stop reading each PDF at its first hit")
+    mode.add_argument("--exists", action="store_true",
+                      help="Only report whether the query appears anywhere; stops at the first hit (exit code 1 if absent)")
     args = parser.parse_args()
+    ocr.apply_ocr_args(args)
+    if fitz is None:
+        sys.exit("PyMuPDF not installed. Run: pip install pymupdf")
+    ext, json_arg = ("jsonl", "out_jsonl") if args.jsonl else ("json", "out_json")
+
+    if args.queries_file:
+        stem = Path(args.queries_file).stem
+        out_json = args.out_json or os.path.join(args.pdf_folder, f"search_results_batch_{stem}.{ext}")
+        out_csv = args.out_csv or os.path.join(args.pdf_folder, f"search_summary_batch_{stem}.csv")
+        results = search_folder_multi(args.pdf_folder, load_queries(args.queries_file),
+                                      out_csv=out_csv, use_cache=not args.no_cache, workers=args.workers,
+                                      **{json_arg: out_json})
+        matched = len({r["query"] for r in results})
+        print(f"Done. Queries matched: {matched}. Total hits: {sum(r['num_hits'] for r in results)}")
+        return
+
+    if args.exists:
+        results = search_folder(args.pdf_folder, args.query, out_csv=args.out_csv,
+                                use_cache=not args.no_cache, workers=args.workers, max_hits=1, stop_on_first=True,
+                                rows=args.rows, **{json_arg: args.out_json})
+        hit = next((r for r in results if r["num_hits"]), None)
+        if hit:
+            print(f"FOUND: {hit['pdf']} (page {hit['hits'][0]['page']})")
+        else:
+            print("NOT FOUND")
+        sys.exit(0 if hit else 1)
 
-    out_json = args.out_json or os.path.join(args.pdf_folder, f"search_results_{args.query.replace(' ','_')}.json")
+    out_json = args.out_json or os.path.join(args.pdf_folder, f"search_results_{args.query.replace(' ','_')}.{ext}")
     out_csv = args.out_csv or os.path.join(args.pdf_folder, f"search_summary_{args.query.replace(' ','_')}.csv")
-    results = search_folder(args.pdf_folder, args.query, out_json=out_json, out_csv=out_csv)
+    results = search_folder(args.pdf_folder, args.query, out_csv=out_csv,
+                            use_cache=not args.no_cache, workers=args.workers,
+                            max_hits=1 if args.first_hit else None, rows=args.rows, **{json_arg: out_json})
     total_hits = sum(r["num_hits"] for r in results)
     print(f"Done. PDFs searched: {len(results)}. Total hits: {total_hits}")
 
@@ -1,21 +1,6 @@
-import argparse, json, csv, os
+import argparse, json, csv, os, re
 
-def summarize(json_path, out_csv):
-    with open(json_path, "r", encoding="utf-8") as fh:
-        data = json.load(fh)
-    rows = []
-    for entry in data:
-        pdf = entry.get("pdf","")
-        num_hits = entry.get("num_hits", 0)
-        if num_hits == 0:
-            rows.append([pdf, 0, "", ""])
-            continue
-        first = entry.get("hits", [])[0]
-        heur = first.get("heuristics", {}) if first else {}
-        serial = heur.get("serial","")
-        court = heur.get("court","")
-        snippet = first.get("snippet","") if first else ""
-        rows.append([pdf, num_hits, serial, court, snippet])
+def write_summary_csv(rows, out_csv):
     os.makedirs(os.path.dirname(out_csv) or ".", exist_ok=True)
     with open(out_csv, "w", newline="", encoding="utf-8") as fh:
         writer = csv.writer(fh)
@@ -23,9 +8,83 @@ def summarize(json_path, out_csv):
         writer.writerows(rows)
     print(f"[+] Wrote summary CSV: {out_csv}")
 
-if __name__ == "__main__":
+# Top-level separators between entries: list brackets, commas and whitespace.
+_SEPARATORS = re.compile(r"[\s,\[\]]*")
+
+def iter_records(path, chunk_size=1 << 20):
+    """
+    Yield result entries one at a time from either a JSON list (search_results_*.json) or
+    JSON Lines (search_results_*.jsonl). Only one entry is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as fh:
+        buf, idx, eof = "", 0, False
+        while True:
+            idx = _SEPARATORS.match(buf, idx).end()
+            if idx < len(buf):
+                try:
+                    entry, idx = decoder.raw_decode(buf, idx)
+                except ValueError:
+                    if eof:
+                        raise
+                else:
+                    yield entry
+                    continue
+            elif eof:
+                return
+            # Drop what was consumed once per chunk, not once per entry.
+            chunk = fh.read(chunk_size)
+            eof = not chunk
+            buf = buf[idx:] + chunk
+            idx = 0
+
+def summary_row(entry):
+    pdf = entry.get("pdf","")
+    num_hits = entry.get("num_hits", 0)
+    if num_hits == 0:
+        return [pdf, 0, "", ""]
+    first = entry.get("hits", [])[0]
+    heur = first.get("heuristics", {}) if first else {}
+    serial = heur.get("serial","")
+    court = heur.get("court","")
+    snippet = first.get("snippet","") if first else ""
+    return [pdf, num_hits, serial, court, snippet]
+
+def summarize(json_path, out_csv):
+    """Stream a search results file (.json or .jsonl) into the summary CSV, one entry at a time."""
+    write_summary_csv((summary_row(entry) for entry in iter_records(json_path)), out_csv)
+
+def summarize_rows(pdf_folder, query, out_csv):
+    """
+    Same CSV as summarize(), built from structured cause-list rows instead of a search JSON.
+    Rows are matched exactly as pdf_search.py --rows matches them (literal text or case key).
+    """
+    from blob_store import list_pdfs
+    from pdf_search import search_pdf_rows
+    rows = []
+    for pdf in list_pdfs(pdf_folder):
+        result = search_pdf_rows(str(pdf), query)
+        if not result["hits"]:
+            rows.append([str(pdf), 0, "", ""])
+            continue
+        first = result["hits"][0]["row"]
+        rows.append([str(pdf), result["num_hits"], first["serial"] or "", first["court"] or "", first["text"]])
+    write_summary_csv(rows, out_csv)
+
+def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--json", required=True)
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--json", help="search_results_<query>.json or .jsonl from pdf_search.py")
+    src.add_argument("--rows-folder", help="Summarize structured rows of the PDFs in this folder (needs --query)")
+    p.add_argument("--query", help="CNR or case text to look for in --rows-folder")
     p.add_argument("--out", required=True)
     args = p.parse_args()
-    summarize(args.json, args.out)
+    if args.json:
+        summarize(args.json, args.out)
+    else:
+        if not args.query:
+            p.error("--rows-folder requires --query")
+        summarize_rows(args.rows_folder, args.query, args.out)
+
+if __name__ == "__main__":
+    main()
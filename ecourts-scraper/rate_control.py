@@ -0,0 +1,263 @@
+"""
+rate_control.py
+Per-host request controller shared by every HTTP fetch: ecourts.common.http_get and the
+downloader's fetch_file / fetch_bytes (and so download_many / stream_many).
+
+For each host it keeps
+  * a token bucket on the request rate, halved on HTTP 429 and recovering step by step;
+  * an AIMD concurrency limit: it grows by one per `limit` good responses, is halved on
+    errors and cut by a quarter when header latency climbs far above the host's best;
+  * retries with jittered exponential backoff on 408/429/5xx, timeouts and dropped
+    connections (a longer Retry-After is honoured);
+  * a circuit breaker: after CIRCUIT_THRESHOLD failures in a row requests to the host fail
+    fast for a cool-down, then one probe request decides whether it closes again.
+
+Per-host counters go into the run report (metrics.py, "hosts") and print_host_stats()
+prints them at the end of a run.
+
+Settings (environment): ECOURTS_HOST_RATE (requests/s per host, default 8),
+ECOURTS_RETRIES (retries per request, default 4), ECOURTS_CIRCUIT_THRESHOLD (default 6)
+and ECOURTS_CIRCUIT_COOLDOWN (seconds, default 30).
+"""
+
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+from metrics import METRICS
+
+HOST_RATE = float(os.environ.get("ECOURTS_HOST_RATE", "8"))
+RETRIES = int(os.environ.get("ECOURTS_RETRIES", "4"))
+CIRCUIT_THRESHOLD = int(os.environ.get("ECOURTS_CIRCUIT_THRESHOLD", "6"))
+CIRCUIT_COOLDOWN = float(os.environ.get("ECOURTS_CIRCUIT_COOLDOWN", "30"))
+MAX_COOLDOWN = 300.0
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+MIN_RATE = 0.5
+# Same as downloader.DEFAULT_WORKERS; download_many raises it to its worker count.
+DEFAULT_CONCURRENCY = 8
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+# Header latency above this multiple of the best seen on the host counts as congestion.
+LATENCY_FACTOR = 3.0
+
+STAT_KEYS = ("requests", "ok", "retries", "throttled", "server_errors", "timeouts",
+             "connection_errors", "errors", "circuit_opened", "fast_failed")
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without contacting a host whose circuit breaker is open."""
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff before retry number `attempt` (0-based)."""
+    return max(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)), retry_after or 0)
+
+def _retry_after(r):
+    try:
+        return min(float(r.headers.get("Retry-After")), MAX_COOLDOWN)
+    except (TypeError, ValueError):
+        return None
+
+class HostController:
+    def __init__(self, host, max_concurrency=DEFAULT_CONCURRENCY, rate=HOST_RATE):
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.max_rate = self.rate = rate
+        self.tokens = max(rate, 1.0)
+        self.last_fill = time.monotonic()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.best_latency = None
+        self.latency_total = 0.0
+        self.last_cut = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self.cooldown = CIRCUIT_COOLDOWN
+        self.probing = False
+        self.stats = dict.fromkeys(STAT_KEYS, 0)
+        self.cond = threading.Condition()
+
+    def raise_max(self, max_concurrency):
+        with self.cond:
+            if max_concurrency > self.max_concurrency:
+                self.limit += max_concurrency - self.max_concurrency
+                self.max_concurrency = max_concurrency
+                self.cond.notify_all()
+
+    def _take_token(self):
+        """0 if a token was taken, else the seconds until the next one."""
+        now = time.monotonic()
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.last_fill) * self.rate)
+        self.last_fill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def _acquire(self):
+        """
+        Wait for a concurrency slot and a rate token. Returns True for the half-open probe;
+        while the probe is out other requests wait for its outcome, and fail fast while open.
+        """
+        with self.cond:
+            probe = False
+            while True:
+                if self.open_until and not probe:
+                    if time.monotonic() < self.open_until:
+                        self.stats["fast_failed"] += 1
+                        raise CircuitOpenError(f"{self.host}: circuit open after {self.failures} consecutive failures")
+                    if self.probing:
+                        self.cond.wait()
+                        continue
+                    self.probing = probe = True
+                wait = None
+                if self.in_flight < max(1, int(self.limit)):
+                    wait = self._take_token()
+                    if not wait:
+                        self.in_flight += 1
+                        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                        return probe
+                self.cond.wait(wait)
+
+    def _cut(self, factor, now):
+        # At most one decrease per second: a burst of failures from one episode counts once.
+        if now - self.last_cut >= 1.0:
+            self.limit = max(1.0, self.limit * factor)
+            self.last_cut = now
+
+    def _release(self, outcome, probe, latency=None):
+        with self.cond:
+            self.in_flight -= 1
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if outcome == "ok":
+                self.stats["ok"] += 1
+                self.failures = 0
+                if probe or self.open_until:
+                    self.open_until, self.probing, self.cooldown = 0.0, False, CIRCUIT_COOLDOWN
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+                if latency is not None:
+                    self.latency_total += latency
+                    if self.best_latency and latency > LATENCY_FACTOR * self.best_latency:
+                        self._cut(0.75, now)
+                    else:
+                        self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                    self.best_latency = min(self.best_latency or latency, latency)
+            elif outcome == "errors":
+                self.stats["errors"] += 1
+                if probe:
+                    self.probing = False
+            else:
+                self.stats[outcome] += 1
+                self.failures += 1
+                self._cut(0.5, now)
+                if outcome == "throttled":
+                    self.rate = max(MIN_RATE, self.rate / 2)
+                if probe or (not self.open_until and self.failures >= CIRCUIT_THRESHOLD):
+                    if probe:
+                        self.cooldown = min(MAX_COOLDOWN, self.cooldown * 2)
+                    self.open_until, self.probing = now + self.cooldown, False
+                    self.stats["circuit_opened"] += 1
+                    print(f"  ! {self.host} looks down ({self.failures} failures in a row); "
+                          f"pausing requests for {self.cooldown:.0f}s")
+            self.cond.notify_all()
+
+    def _backoff(self, attempt, record, retry_after=None):
+        with self.cond:
+            self.stats["retries"] += 1
+        if record is not None:
+            record.add(retries=1)
+        time.sleep(backoff_delay(attempt, retry_after))
+
+    @contextmanager
+    def request(self, session, method, url, record=None, **kwargs):
+        """
+        Send `method url` through `session` with rate limiting and retries, and yield the final
+        response. The host's concurrency slot is held until the with-block ends, so a streamed
+        body counts as in flight while it is read. `record` (a metrics StageRecord) counts retries.
+        After the last retry an error status is yielded like any response; the caller checks it.
+        """
+        for attempt in range(RETRIES + 1):
+            probe = self._acquire()
+            # Anything not classified below (an invalid URL, a redirect loop, Ctrl-C) is not held
+            # against the host, but still gives back the slot and the probe.
+            outcome, latency, retry_after = "errors", None, None
+            try:
+                try:
+                    r = session.request(method, url, **kwargs)
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    outcome = "timeouts" if isinstance(e, requests.Timeout) else "connection_errors"
+                    if attempt == RETRIES:
+                        raise
+                else:
+                    try:
+                        outcome = "ok"
+                        if r.status_code in RETRY_STATUSES:
+                            outcome = "throttled" if r.status_code == 429 else "server_errors"
+                        if outcome != "ok" and attempt < RETRIES:
+                            retry_after = _retry_after(r)
+                        else:
+                            latency = r.elapsed.total_seconds() if outcome == "ok" else None
+                            try:
+                                yield r
+                            except requests.RequestException:
+                                # The body transfer failed part-way.
+                                outcome, latency = "connection_errors", None
+                                raise
+                            return
+                    finally:
+                        r.close()
+            finally:
+                self._release(outcome, probe, latency)
+            self._backoff(attempt, record, retry_after)
+
+    def report(self):
+        with self.cond:
+            ok = self.stats["ok"]
+            return dict(
+                self.stats,
+                avg_latency_s=round(self.latency_total / ok, 3) if ok else None,
+                concurrency_limit=round(self.limit, 2),
+                peak_in_flight=self.peak_in_flight,
+                rate_per_s=round(self.rate, 2),
+                circuit="open" if self.open_until else "closed",
+            )
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+def controller_for(url, max_concurrency=None):
+    """The controller of `url`'s host; `max_concurrency` raises its concurrency ceiling."""
+    host = urlparse(url).netloc
+    with _controllers_lock:
+        ctl = _controllers.get(host)
+        if ctl is None:
+            ctl = _controllers[host] = HostController(host, max_concurrency or DEFAULT_CONCURRENCY)
+            return ctl
+    if max_concurrency:
+        ctl.raise_max(max_concurrency)
+    return ctl
+
+def request(session, method, url, record=None, **kwargs):
+    """controller_for(url).request(...): a with-block yielding the response."""
+    return controller_for(url).request(session, method, url, record=record, **kwargs)
+
+def host_stats():
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    return {c.host: c.report() for c in controllers}
+
+def print_host_stats():
+    for host, s in sorted(host_stats().items()):
+        latency = f"{s['avg_latency_s']}s" if s["avg_latency_s"] is not None else "-"
+        print(f"[+] {host}: {s['ok']}/{s['requests']} requests ok, {s['retries']} retries "
+              f"({s['throttled']} throttled, {s['server_errors']} 5xx, {s['timeouts']} timeouts, "
+              f"{s['connection_errors']} connection errors, {s['errors']} other errors), avg latency {latency}, "
+              f"concurrency {s['concurrency_limit']} (peak {s['peak_in_flight']}), {s['rate_per_s']} req/s"
+              + (f", circuit opened {s['circuit_opened']}x" if s["circuit_opened"] else ""))
+
+METRICS.add_section("hosts", host_stats)
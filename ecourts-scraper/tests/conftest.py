@@ -0,0 +1,88 @@
+"""Shared fixtures: the scraper modules live one level up; caches and cookies go to a throwaway folder."""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Read by the modules at import time: keep the tests away from ~/.cache and off the rate limit.
+_TMP = tempfile.mkdtemp(prefix="ecourts-tests-")
+os.environ["ECOURTS_TEXT_CACHE"] = os.path.join(_TMP, "text_cache.sqlite")
+os.environ["ECOURTS_COOKIE_DIR"] = os.path.join(_TMP, "cookies")
+os.environ["ECOURTS_HOST_RATE"] = "1000"
+os.environ["ECOURTS_RETRIES"] = "0"
+
+import hashlib  # noqa: E402
+import threading  # noqa: E402
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: E402
+
+import pytest  # noqa: E402
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        self.server.headers.append(dict(self.headers))
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        rng = self.headers.get("Range", "")
+        if rng.startswith("bytes=") and self.headers.get("If-Range") in (None, etag):
+            start = int(rng[len("bytes="):].split("-")[0])
+            if start >= len(body):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            body = body[start:]
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def http_files():
+    """
+    A local HTTP server on a free port: set server.files[path] = bytes, build URLs with
+    server.url(path). Serves ETags, answers If-None-Match with 304 and Range (+ If-Range) with 206;
+    server.hits lists the paths requested.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.files, server.hits, server.headers = {}, [], []
+    server.url = lambda path: f"http://127.0.0.1:{server.server_address[1]}{path}"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def make_pdf():
+    """make_pdf(path, ["page 1 text", ...]) writes a small text PDF with PyMuPDF."""
+    fitz = pytest.importorskip("fitz")
+
+    def _make(path, pages):
+        doc = fitz.open()
+        for text in pages:
+            page = doc.new_page()
+            y = 72
+            for line in text.split("\n"):
+                page.insert_text((72, y), line, fontsize=10)
+                y += 14
+        os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+        doc.save(str(path))
+        doc.close()
+        return str(path)
+
+    return _make
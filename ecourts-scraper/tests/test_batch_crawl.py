@@ -0,0 +1,75 @@
+import threading
+import time
+import weakref
+from types import SimpleNamespace
+
+import pytest
+
+import batch_crawl
+from batch_crawl import date_range, plan_jobs, run_batch
+
+DATES = ["2025-10-18", "2025-10-19"]
+
+def test_date_range():
+    assert list(date_range("2025-10-30", "2025-11-02")) == ["2025-10-30", "2025-10-31", "2025-11-01", "2025-11-02"]
+
+def test_live_urls_are_crawled_for_today_only(capsys):
+    jobs = plan_jobs(["http://h/live", "http://h/board?d={date}"], DATES, today="2025-10-19")
+    assert jobs == [("http://h/live", "2025-10-19"),
+                    ("http://h/board?d={date}", "2025-10-18"), ("http://h/board?d={date}", "2025-10-19")]
+    assert "today only" in capsys.readouterr().out
+    assert plan_jobs(["http://h/live"], DATES, today="2025-10-20") == []
+    assert "skipped" in capsys.readouterr().out
+
+def test_run_batch_checkpoints_and_retries_failed_jobs(tmp_path, monkeypatch):
+    fetched, downloaded = [], []
+    monkeypatch.setattr(batch_crawl, "fetch_soup", lambda url, use_selenium=False: fetched.append(url) or ("soup", url))
+    def fake_download(soup, final_url, date_str, out, workers, packed):
+        downloaded.append((final_url, date_str))
+        if date_str == "2025-10-18":
+            raise RuntimeError("portal down")
+        return f"{out}/{date_str}", [1, 2]
+    monkeypatch.setattr(batch_crawl, "download_judges", fake_download)
+    urls = ["http://h/board?d={date}"]
+    report = run_batch(urls, DATES, out=str(tmp_path))
+    assert [r["status"] for r in report] == ["failed", "done"]
+    assert fetched == ["http://h/board?d=2025-10-18", "http://h/board?d=2025-10-19"]
+    # A rerun skips the finished job and retries the failed one.
+    report = run_batch(urls, DATES, out=str(tmp_path))
+    assert [(r["date"], r["skipped"]) for r in report] == [("2025-10-18", False), ("2025-10-19", True)]
+    assert len(downloaded) == 3
+
+def test_only_the_current_page_is_held(tmp_path, monkeypatch):
+    class Soup:
+        pass
+
+    held = []
+    monkeypatch.setattr(batch_crawl, "fetch_soup", lambda url, use_selenium=False: (Soup(), url))
+    def fake_download(soup, final_url, date_str, out, workers, packed):
+        held.append(weakref.ref(soup))
+        assert sum(1 for ref in held if ref() is not None) == 1
+        return f"{out}/{date_str}", []
+    monkeypatch.setattr(batch_crawl, "download_judges", fake_download)
+    dates = list(date_range("2025-10-01", "2025-10-10"))
+    report = run_batch(["http://h/board?d={date}"], dates, out=str(tmp_path))
+    assert len(report) == 10 and all(r["status"] == "done" for r in report)
+
+def test_pages_render_ahead_on_the_browser_pool(tmp_path, monkeypatch):
+    browser_pool = pytest.importorskip("browser_pool")
+    monkeypatch.setattr(browser_pool, "get_pool", lambda size=None: SimpleNamespace(size=size))
+    lock = threading.Lock()
+    running, peak = [0], [0]
+    def fetch(url, use_selenium=False):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return "soup", url
+    monkeypatch.setattr(batch_crawl, "fetch_soup", fetch)
+    monkeypatch.setattr(batch_crawl, "download_judges", lambda soup, url, d, out, workers, packed: (out, []))
+    dates = list(date_range("2025-10-01", "2025-10-08"))
+    report = run_batch(["http://h/board?d={date}"], dates, out=str(tmp_path), use_selenium=True, browsers=3)
+    assert [r["date"] for r in report] == dates and all(r["status"] == "done" for r in report)
+    assert 1 < peak[0] <= 3
@@ -0,0 +1,52 @@
+import hashlib
+import os
+
+import blob_store
+from blob_store import BlobStore, list_pdfs, open_store, pack_folder, pdf_data
+from downloader import Manifest, download_many
+
+def test_put_dedupes_and_reads_back(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    text = b"%PDF " + b"compressible " * 200
+    sha, new = store.put(text)
+    assert new and sha == hashlib.sha256(text).hexdigest()
+    assert store.put(text) == (sha, False)
+    assert bytes(store.get(sha)) == text
+    raw = os.urandom(4096)
+    raw_sha, _ = store.put(raw)
+    assert isinstance(store.get(raw_sha), memoryview) and bytes(store.get(raw_sha)) == raw
+    assert {row[4] for row in store.iter_blobs()} == {"zlib", "raw"}
+    assert store.verify() == []
+
+def test_segments_roll_over(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"), segment_size=5000, compress=False)
+    shas = [store.put(os.urandom(3000))[0] for _ in range(3)]
+    assert len({row[1] for row in store.iter_blobs()}) == 3
+    assert all(len(store.get(s)) == 3000 for s in shas)
+
+def test_pack_folder_keeps_paths_readable(tmp_path):
+    folder = tmp_path / "outputs" / "site" / "2025-10-19"
+    folder.mkdir(parents=True)
+    (folder / "a.pdf").write_bytes(b"%PDF same")
+    (folder / "b.pdf").write_bytes(b"%PDF same")
+    store = open_store(str(tmp_path / "outputs"))
+    assert pack_folder(store, folder) == (2, len(b"%PDF same"))
+    assert not os.path.exists(folder / "a.pdf")
+    assert [p.name for p in list_pdfs(folder)] == ["a.pdf", "b.pdf"]
+    assert bytes(pdf_data(str(folder / "b.pdf"))) == b"%PDF same"
+    assert len(list(store.iter_blobs())) == 1
+
+def test_packed_downloads_with_colliding_basenames(http_files, tmp_path):
+    http_files.files["/a/cause.pdf"] = b"%PDF judge A"
+    http_files.files["/b/cause.pdf"] = b"%PDF judge B"
+    out = tmp_path / "outputs"
+    folder = out / "site" / "2025-10-19"
+    links = [{"url": http_files.url(p)} for p in ("/a/cause.pdf", "/b/cause.pdf")]
+    store = open_store(str(out))
+    results = download_many(links, str(folder), workers=2, store=store)
+    paths = [path for _, path, _ in results]
+    assert len(set(paths)) == 2 and not any(os.path.exists(p) for p in paths)
+    assert [bytes(pdf_data(p)) for p in paths] == [b"%PDF judge A", b"%PDF judge B"]
+    manifest = Manifest(str(folder))
+    assert [manifest.lookup(l["url"])[1]["blob"] for l in links] == [blob_store.packed_sha256(p) for p in paths]
+    assert len(list_pdfs(folder)) == 2
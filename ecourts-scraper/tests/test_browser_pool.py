@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+browser_pool = pytest.importorskip("browser_pool")
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+@pytest.fixture
+def started(monkeypatch):
+    drivers = []
+    def make_driver(headless=True):
+        time.sleep(0.01)  # widen the window between the size check and the start
+        drivers.append(FakeDriver())
+        return drivers[-1]
+    monkeypatch.setattr(browser_pool, "make_driver", make_driver)
+    monkeypatch.setattr(browser_pool, "_pool", None)
+    return drivers
+
+def test_pool_is_warmed_on_create(started):
+    pool = browser_pool.DriverPool(size=3)
+    assert len(started) == 3 and pool._idle.qsize() == 3
+
+def test_concurrent_borrowers_never_exceed_size(started):
+    pool = browser_pool.DriverPool(size=2, warm=False)
+    barrier = threading.Barrier(8)
+
+    def borrow():
+        barrier.wait()
+        with pool.driver():
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=borrow) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(started) == 2
+
+def test_failed_driver_is_replaced(started):
+    pool = browser_pool.DriverPool(size=1)
+    with pytest.raises(RuntimeError):
+        with pool.driver():
+            raise RuntimeError("wedged")
+    assert started[0].quit_called
+    with pool.driver() as d:
+        assert d is started[1]
+
+def test_get_pool_grows_and_checks_mode(started):
+    pool = browser_pool.get_pool(size=1)
+    assert len(started) == 1
+    assert browser_pool.get_pool(size=3) is pool and pool.size == 3
+    with pytest.raises(ValueError):
+        browser_pool.get_pool(headless=False)
+    pool.close()
+
+def test_failed_warm_up_quits_the_started_drivers(started, monkeypatch):
+    make = browser_pool.make_driver
+    def flaky(headless=True):
+        d = make(headless)
+        if len(started) == 2:
+            raise RuntimeError("chrome crashed")
+        return d
+    monkeypatch.setattr(browser_pool, "make_driver", flaky)
+    with pytest.raises(RuntimeError):
+        browser_pool.DriverPool(size=3)
+    ok = [d for i, d in enumerate(started) if i != 1]
+    assert len(ok) == 2 and all(d.quit_called for d in ok)
+
+def test_waiting_borrower_gets_the_slot_of_a_discarded_driver(started, monkeypatch):
+    monkeypatch.setattr(browser_pool, "BORROW_POLL", 0.01)
+    pool = browser_pool.DriverPool(size=1)
+    got = []
+    with pytest.raises(RuntimeError):
+        with pool.driver():
+            waiter = threading.Thread(target=lambda: got.append(pool._borrow()))
+            waiter.start()
+            time.sleep(0.05)
+            raise RuntimeError("wedged")
+    waiter.join(2)
+    assert got == [started[1]]
+
+class PageDriver:
+    def __init__(self, links, rows):
+        self.links, self.rows = links, rows
+
+    def find_elements(self, by, selector):
+        return self.links
+
+    def execute_script(self, script):
+        return self.rows
+
+def test_ready_only_once_the_cause_list_is_there():
+    assert not browser_pool.cause_list_ready(PageDriver([], "Home | Cause List | Contact\nSelect court"))
+    assert browser_pool.cause_list_ready(PageDriver([], "1 CS 1234/2025 Ram Lal vs State"))
+    assert browser_pool.cause_list_ready(PageDriver([object()], ""))
+
+def test_get_pool_size_defaults_to_the_setting(started, monkeypatch):
+    monkeypatch.setattr(browser_pool, "DEFAULT_SIZE", 2)
+    pool = browser_pool.get_pool()
+    assert pool.size == 2 and len(started) == 2
+    pool.close()
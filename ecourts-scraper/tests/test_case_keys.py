@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+import case_keys
+import text_cache
+from case_keys import QueryMatcher, merge_spans, page_key_map, query_key
+from cause_list_index import build_index, query_index
+from pdf_search import search_pdf
+from text_cache import TextCache
+from watchlist import Matcher, WatchStore
+
+BOARD = "Court of Judge 1\n1. CIVIL 1234 2025 A vs B\n2. CS/1234/2025 C vs D\n3. Dated 12.10.2025 notice"
+
+def test_spellings_fold_to_one_key():
+    for q in ("CS 1234/2025", "CS/1234/2025", "CS-1234-2025", "C.S. No. 1234 of 2025",
+              "CIVIL SUIT 1234-2025", "civil 1234 2025"):
+        assert query_key(q) == "CS/1234/2025", q
+
+def test_slash_and_dash_forms_are_keyed_in_text():
+    assert list(page_key_map("1. CS/1234/2025 A vs B")) == ["CS/1234/2025"]
+    assert list(page_key_map("1. CS-1234-2025 A vs B")) == ["CS/1234/2025"]
+
+def test_unknown_types_are_not_keyed():
+    assert page_key_map("FIR/123/2024 and DATED/12/2024") == {}
+    assert query_key("FIR 123/2024") is None
+
+def test_cnr_glued_to_label():
+    text = "CNRDLND010000012024 listed"
+    assert page_key_map(text) == {"DLND010000012024": [(3, 19)]}
+    assert query_key("dlnd 01 000001 2024") == "DLND010000012024"
+
+def test_cnr_not_cut_out_of_longer_number():
+    assert page_key_map("DLND0100000120245") == {}
+
+def test_matcher_keeps_literal_hits_of_a_keyed_query():
+    m = QueryMatcher("CIVIL 1234 2025")
+    assert m.key == "CS/1234/2025"
+    text = "x CIVIL 1234 2025 y CS/1234/2025"
+    assert m.spans(text) == [(2, 17), (20, 32)]
+
+def test_matcher_dedupes_literal_and_key_hit_at_same_offset():
+    assert QueryMatcher("CS 1234/2025").spans("1. CS 1234/2025") == [(3, 15)]
+
+def test_matcher_free_text():
+    m = QueryMatcher("court")
+    assert m.key is None
+    assert m.spans("Court of ... court") == [(0, 5), (13, 18)]
+
+def test_merge_spans_drops_overlaps_and_prefers_longer():
+    assert merge_spans([(5, 8), (0, 3), (0, 4), (2, 6)]) == [(0, 4), (5, 8)]
+
+def test_long_free_text_query_fails_fast():
+    start = time.perf_counter()
+    assert query_key("Petitioner" + "a" * 14 + " 12 x") is None
+    assert query_key("Suresh Chandra vs Municipal Corporation 2024 x") is None
+    assert query_key("Suresh Chandra vs Municipal Corporation of Delhi and Others 1234 2024") is None
+    assert query_key("Adv. B. Gupta C.S. 1234/2025") == "CS/1234/2025"
+    assert time.perf_counter() - start < 1
+
+def test_key_scan_is_linear_in_long_words():
+    start = time.perf_counter()
+    assert page_key_map(("Petitioner" + "a" * 5000 + " 12 x ") * 20) == {}
+    assert time.perf_counter() - start < 1
+
+def test_keyed_search_still_finds_its_literal_text(make_pdf, tmp_path):
+    pdf = make_pdf(tmp_path / "b.pdf", [BOARD])
+    r = search_pdf(pdf, "CIVIL 1234 2025", use_cache=False)
+    # The literal "CIVIL 1234 2025" plus the other spelling "CS/1234/2025".
+    assert r["num_hits"] == 2
+
+def test_other_spelling_finds_both_rows(make_pdf, tmp_path):
+    pdf = make_pdf(tmp_path / "b.pdf", [BOARD])
+    assert search_pdf(pdf, "C.S. No. 1234 of 2025", use_cache=False)["num_hits"] == 1
+    assert search_pdf(pdf, "CS 1234/2025", use_cache=False)["num_hits"] == 1
+
+def test_keyed_search_reads_stored_key_maps(make_pdf, tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path / "keys.pdf", [BOARD])
+    assert search_pdf(pdf, "CIVIL 1234 2025")["num_hits"] == 2
+    no_scan = lambda text: pytest.fail("key scan at query time")
+    monkeypatch.setattr(case_keys, "page_key_map", no_scan)
+    monkeypatch.setattr(text_cache, "page_key_map", no_scan)
+    assert search_pdf(pdf, "CIVIL 1234 2025")["num_hits"] == 2
+    assert search_pdf(pdf, "C.S. No. 1234 of 2025")["num_hits"] == 1
+    assert search_pdf(pdf, "Court of Judge")["num_hits"] == 1
+
+def test_key_maps_are_stored_with_the_pages(make_pdf, tmp_path, monkeypatch):
+    cache = TextCache(str(tmp_path / "cache.sqlite"))
+    pdf = make_pdf(tmp_path / "a.pdf", [BOARD, "no cases here"])
+    first = list(cache.iter_keyed_pages(pdf))
+    assert sorted(first[0][1]) == ["CS/1234/2025"] and first[1][1] == {}
+    monkeypatch.setattr(text_cache, "page_key_map", lambda text: pytest.fail("key scan on a cache hit"))
+    assert list(cache.iter_keyed_pages(pdf)) == first
+    assert [t for t, _ in first] == list(cache.iter_page_texts(pdf))
+    cache.close()
+
+def test_key_maps_are_built_once_for_pages_cached_without_them(make_pdf, tmp_path, monkeypatch):
+    cache = TextCache(str(tmp_path / "cache.sqlite"))
+    pdf = make_pdf(tmp_path / "a.pdf", [BOARD])
+    digest = cache.file_sha256(pdf)
+    cache.put_compressed(digest, [text_cache._compress(BOARD)])
+    assert cache.page_key_maps(digest) is None
+    assert list(cache.iter_keyed_pages(pdf))[0][1]["CS/1234/2025"]
+    assert cache.page_key_maps(digest) is not None
+    monkeypatch.setattr(text_cache, "KEYS_VERSION", "other")
+    assert cache.page_key_maps(digest) is None
+    cache.close()
+
+def _index(make_pdf, tmp_path):
+    make_pdf(tmp_path / "outputs" / "site" / "2025-10-19" / "j1.pdf", [BOARD])
+    index = str(tmp_path / "index.sqlite")
+    build_index(str(tmp_path / "outputs"), index)
+    return index
+
+def test_keyed_index_query_returns_literal_and_key_hits(make_pdf, tmp_path):
+    hits = query_index(_index(make_pdf, tmp_path), "CIVIL 1234 2025")
+    assert len(hits) == 2
+    assert all(h["page"] == 1 and h["site"] == "site" for h in hits)
+
+def test_key_index_query_without_literal_text(make_pdf, tmp_path):
+    assert len(query_index(_index(make_pdf, tmp_path), "civil suit 1234 of 2025")) == 1
+
+def test_keyed_watch_matches_literal_and_other_spellings(tmp_path):
+    store = WatchStore(str(tmp_path / "watchlist.sqlite"))
+    store.add("CIVIL 1234 2025", label="client")
+    store.add("court of judge 2")
+    m = Matcher(store.watches())
+    text = "CIVIL 1234 2025 ... C.S. No. 1234 of 2025 ... Court of Judge 2"
+    found = [(w["query"], a) for w, a, b in m.matches(text)]
+    assert sorted(found) == [("CIVIL 1234 2025", 0), ("CIVIL 1234 2025", 20), ("court of judge 2", 46)]
+
+def test_same_case_is_watched_once(tmp_path):
+    store = WatchStore(str(tmp_path / "watchlist.sqlite"))
+    assert store.add("CS 1234/2025")
+    assert not store.add("C.S. No. 1234 of 2025")
+    assert store.remove("civil suit 1234-2025") == 1
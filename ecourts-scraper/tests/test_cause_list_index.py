@@ -0,0 +1,48 @@
+import json
+import os
+
+from cause_list_index import build_index, query_index
+
+BOARD = "Court of Judge 1\n1. CIVIL 1234 2025 A vs B\n2. CS/1234/2025 C vs D\n3. Dated 12.10.2025 notice"
+
+def _build(make_pdf, tmp_path):
+    out = tmp_path / "outputs"
+    make_pdf(out / "site" / "2025-10-19" / "j1.pdf", [BOARD])
+    index = str(tmp_path / "index.sqlite")
+    build_index(str(out), index)
+    return out, index
+
+def test_free_text_goes_through_fts(make_pdf, tmp_path):
+    _, index = _build(make_pdf, tmp_path)
+    assert len(query_index(index, "notice")) == 1
+    assert query_index(index, "no such words") == []
+
+def test_filters(make_pdf, tmp_path):
+    _, index = _build(make_pdf, tmp_path)
+    assert query_index(index, "notice", date="2025-10-20") == []
+    assert len(query_index(index, "notice", site="sit", date="2025-10-19")) == 1
+
+def test_incremental_build(make_pdf, tmp_path):
+    out, index = _build(make_pdf, tmp_path)
+    assert build_index(str(out), index)["unchanged"] == 1
+    make_pdf(out / "site" / "2025-10-19" / "j1.pdf", ["replaced board"])
+    assert build_index(str(out), index)["updated"] == 1
+    os.remove(out / "site" / "2025-10-19" / "j1.pdf")
+    assert build_index(str(out), index)["removed"] == 1
+    assert query_index(index, "replaced") == []
+
+def test_judge_names_come_from_the_downloader_json(make_pdf, tmp_path):
+    out = tmp_path / "outputs"
+    folder = out / "site" / "2025-10-19"
+    make_pdf(folder / "j1.pdf", [BOARD])
+    entries = {"downloaded": [{"judge": "Court of Ms. A. Sharma", "pdf_path": str(folder / "j1.pdf")}]}
+    (folder / "all_judges_2025-10-19.json").write_text(json.dumps(entries), encoding="utf-8")
+    index = str(tmp_path / "index.sqlite")
+    build_index(str(out), index)
+    [hit] = query_index(index, "Sharma")
+    assert hit["judge"] == "Court of Ms. A. Sharma" and hit["page"] == 1
+
+def test_punctuation_is_searched_literally(make_pdf, tmp_path):
+    _, index = _build(make_pdf, tmp_path)
+    assert len(query_index(index, "12.10.2025")) == 1
+    assert query_index(index, 'notice" OR "court') == []
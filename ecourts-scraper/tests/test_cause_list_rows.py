@@ -0,0 +1,71 @@
+import os
+import threading
+
+import pytest
+
+from cause_list_rows import iter_pdf_rows, load_rows, parse_row, rows_path_for, write_rows_jsonl
+from pdf_search import search_folder
+
+fitz = pytest.importorskip("fitz")
+
+def _table_pdf(path, lines):
+    """Each line is a list of (x, text) cells."""
+    doc = fitz.open()
+    page = doc.new_page()
+    for n, cells in enumerate(lines):
+        for x, text in cells:
+            page.insert_text((x, 72 + 16 * n), text, fontsize=9)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+LINES = [
+    [(72, "IN THE COURT OF SH. A. KUMAR, CIVIL JUDGE")],
+    [(72, "1."), (110, "CS 1234/2025"), (260, "Ram vs Shyam"), (420, "Adv. P. Rao")],
+    [(110, "CNR DLND010000012025")],
+    [(72, "2."), (110, "Crl. Rev. No. 56 of 2024"), (260, "State versus Mohan")],
+]
+
+def test_rows_take_serial_court_and_fields_from_the_layout(tmp_path):
+    rows = list(iter_pdf_rows(_table_pdf(tmp_path / "b.pdf", LINES)))
+    assert [r["serial"] for r in rows] == ["1", "2"]
+    first, second = rows
+    assert first["court"] == second["court"] == "IN THE COURT OF SH. A. KUMAR, CIVIL JUDGE"
+    assert (first["case_type"], first["case_number"], first["case_year"]) == ("CS", "1234", "2025")
+    assert first["parties"] == "Ram vs Shyam" and first["advocate"] == "P. Rao"
+    assert "DLND010000012025" in first["text"]
+    assert (second["case_number"], second["case_year"], second["page"]) == ("56", "2024", 1)
+
+def test_parse_row_finds_cnr():
+    row = parse_row("3", ["DLHC010000012025", "A vs B"], None)
+    assert row["cnr"] == "DLHC010000012025" and row["parties"] == "A vs B"
+
+def test_load_rows_writes_and_reuses_sidecar(tmp_path):
+    pdf = _table_pdf(tmp_path / "b.pdf", LINES)
+    assert len(list(load_rows(pdf))) == 2
+    sidecar = rows_path_for(pdf)
+    assert os.path.exists(sidecar)
+    with open(sidecar, "a", encoding="utf-8") as fh:
+        fh.write('{"serial": "99", "text": "from sidecar"}\n')
+    assert [r["serial"] for r in load_rows(pdf)][-1] == "99"
+
+def test_concurrent_sidecar_writes_do_not_collide(make_pdf, tmp_path):
+    pdf = make_pdf(tmp_path / "b.pdf", ["Court of Judge 1\n1 CS 12/2024 A vs B\n2 CS 13/2024 C vs D"])
+    errors = []
+    def write():
+        try:
+            write_rows_jsonl(pdf)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=write) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and len(list(load_rows(pdf))) == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_rows_search_agrees_with_text_search(make_pdf, tmp_path):
+    make_pdf(tmp_path / "b.pdf", ["Court of Judge 1\n1. CIVIL 1234 2025 A vs B\n2. CS/1234/2025 C vs D"])
+    rows = search_folder(str(tmp_path), "CS 1234/2025", rows=True, use_cache=False)
+    assert rows[0]["num_hits"] == 1
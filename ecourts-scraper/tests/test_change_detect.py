@@ -0,0 +1,48 @@
+import sys
+
+import ecourts_scraper
+from change_detect import changed_urls, compute_delta, load_state, page_unchanged
+
+LINKS = [{"url": "http://h/a.pdf", "text": "Judge A"}, {"url": "http://h/b.pdf", "text": "Judge B"}]
+
+def test_delta_reports_new_removed_and_replaced():
+    _, state = compute_delta(None, LINKS, {"http://h/a.pdf": "1", "http://h/b.pdf": "2"}, ["row"], {})
+    links = [LINKS[0], {"url": "http://h/c.pdf", "text": "Judge C"}]
+    hashes = {"http://h/a.pdf": "9", "http://h/c.pdf": "3"}
+    delta, _ = compute_delta(state, links, hashes, ["row"], {})
+    assert delta["new_pdfs"] == ["http://h/c.pdf"]
+    assert delta["removed_pdfs"] == ["http://h/b.pdf"]
+    assert delta["replaced_pdfs"] == ["http://h/a.pdf"]
+    assert sorted(changed_urls(state, links, hashes)) == ["http://h/a.pdf", "http://h/c.pdf"]
+    assert compute_delta(state, LINKS, {"http://h/a.pdf": "1"}, ["row"], {})[0] is None
+
+def test_page_unchanged_uses_the_link_fingerprint():
+    _, state = compute_delta(None, LINKS, {"http://h/a.pdf": "1"}, ["row"], {})
+    assert page_unchanged(state, list(reversed(LINKS)), ["row"])
+    assert not page_unchanged(state, LINKS, ["row", "new row"])
+    assert not page_unchanged(state, [LINKS[0], dict(LINKS[1], text="Judge B (vacation)")], ["row"])
+    # b.pdf was never downloaded: a --download run still has work to do.
+    assert not page_unchanged(state, LINKS, ["row"], downloads=True)
+    assert not page_unchanged(None, LINKS, ["row"])
+
+def _run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["ecourts_scraper.py", *argv])
+    ecourts_scraper.run(ecourts_scraper.parse_args())
+
+def test_unchanged_page_skips_downloads(http_files, tmp_path, monkeypatch):
+    http_files.files["/board"] = (b'<html><body><a href="/a.pdf">Judge A</a>'
+                                  b'<a href="/b.pdf">Judge B</a></body></html>')
+    http_files.files["/a.pdf"] = b"%PDF a"
+    http_files.files["/b.pdf"] = b"%PDF b"
+    argv = ["--url", http_files.url("/board"), "--date", "2025-10-19", "--download", "--out", str(tmp_path),
+            "--watchlist", str(tmp_path / "none.sqlite")]
+    _run(monkeypatch, *argv)
+    assert sorted(h for h in http_files.hits if h.endswith(".pdf")) == ["/a.pdf", "/b.pdf"]
+    http_files.hits.clear()
+    _run(monkeypatch, *argv)
+    assert http_files.hits == ["/board"]
+    # --recheck revalidates them anyway (conditional requests, answered with 304).
+    _run(monkeypatch, *argv, "--recheck")
+    assert sorted(h for h in http_files.hits if h.endswith(".pdf")) == ["/a.pdf", "/b.pdf"]
+    folders = [p.parent for p in tmp_path.rglob("page_state.json")]
+    assert len(folders) == 1 and load_state(str(folders[0]))["fingerprint"]
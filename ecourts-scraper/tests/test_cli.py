@@ -0,0 +1,37 @@
+import importlib.util
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import ROOT
+from ecourts import cli
+
+def test_every_command_names_an_existing_module():
+    for name, (module, _) in cli.COMMANDS.items():
+        assert importlib.util.find_spec(module) is not None, name
+
+def test_usage_and_unknown_command(capsys):
+    assert cli.main([]) == 0
+    assert "search" in capsys.readouterr().out
+    assert cli.main(["nope"]) == 2
+    assert "unknown command 'nope'" in capsys.readouterr().err
+
+def test_dispatch_passes_the_remaining_arguments(monkeypatch):
+    seen = {}
+    fake = lambda name: SimpleNamespace(main=lambda: seen.update(module=name, argv=list(sys.argv)))  # noqa: E731
+    monkeypatch.setattr(cli.importlib, "import_module", fake)
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+    cli.main(["index", "query", "CS 1/2025"])
+    assert seen == {"module": "cause_list_index", "argv": ["ecourts index", "query", "CS 1/2025"]}
+
+def test_help_does_not_import_heavy_modules():
+    code = "import sys; from ecourts import cli; cli.main(['--help']); print(sorted(m for m in ('fitz', 'requests', 'flask', 'selenium') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == "[]"
+
+@pytest.mark.parametrize("command", ["search", "index", "courts"])
+def test_command_help_runs(command):
+    r = subprocess.run([sys.executable, "-m", "ecourts", command, "--help"], cwd=ROOT, capture_output=True, text=True)
+    assert r.returncode == 0 and "usage: ecourts " + command in r.stdout
@@ -0,0 +1,37 @@
+import os
+import time
+
+import pytest
+
+import cookie_store
+
+@pytest.fixture(autouse=True)
+def cookie_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cookie_store, "COOKIE_DIR", str(tmp_path / "cookies"))
+
+URL = "https://services.ecourts.gov.in/ecourtindia_v6/"
+
+def test_saved_cookies_load_into_a_session():
+    path = cookie_store.save_cookies(URL, [
+        {"name": "JSESSION", "value": "abc", "domain": "services.ecourts.gov.in", "path": "/"},
+        {"name": "pref", "value": "1", "expiry": int(time.time()) + 60},
+    ], user_agent="Chrome/120")
+    assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+    session = cookie_store.load_session(URL)
+    assert session.cookies.get("JSESSION") == "abc" and session.headers["User-Agent"] == "Chrome/120"
+    saved = cookie_store.load_cookies(URL)["cookies"]
+    assert [c["session"] for c in saved] == [True, False]
+
+def test_expired_cookies_are_dropped():
+    cookie_store.save_cookies(URL, [{"name": "old", "value": "x", "expiry": int(time.time()) - 1}])
+    assert cookie_store.load_cookies(URL) is None
+    assert cookie_store.load_session(URL) is None
+
+def test_forget_and_rejection():
+    cookie_store.save_cookies(URL, [{"name": "a", "value": "b"}])
+    cookie_store.forget(URL)
+    assert cookie_store.load_cookies(URL) is None
+
+    class R:
+        status_code = 403
+    assert cookie_store.is_rejected(R()) and not cookie_store.is_rejected(None)
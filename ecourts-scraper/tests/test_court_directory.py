@@ -0,0 +1,112 @@
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import court_directory
+from court_directory import (CourtDirectory, DirectoryError, add_location_args, normalize_name, parse_location, pick,
+                             resolve_location)
+
+STATES_HTML = """<html><body><input name="app_token" value="abc123">
+<select id="sess_state_code"><option value="0">Select state</option>
+<option value="26">Delhi</option><option value="1">Maharashtra</option></select></body></html>"""
+DISTRICTS = {"26": '<option value="">Select</option><option value="8">New Delhi</option><option value="9">North Delhi</option>'}
+COMPLEXES = {("26", "8"): '<option value="1070001@1,2@N">Patiala House Court Complex</option>'
+                          '<option value="1070002@3@N">New Delhi Family Courts</option>'}
+
+class _Portal(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.calls.append(("GET", parse_qs(urlsplit(self.path).query)["p"][0]))
+        self._send("text/html", STATES_HTML)
+
+    def do_POST(self):
+        page = parse_qs(urlsplit(self.path).query)["p"][0]
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode()).items()}
+        self.server.calls.append(("POST", page))
+        assert form["app_token"] == "abc123"
+        if page.endswith("fillDistrict"):
+            body = {"dist_list": DISTRICTS.get(form["state_code"], ""), "app_token": "abc123"}
+        else:
+            body = {"complex_list": COMPLEXES.get((form["state_code"], form["dist_code"]), ""), "app_token": "abc123"}
+        self._send("application/json", json.dumps(body))
+
+    def _send(self, ctype, text):
+        data = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def portal():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Portal)
+    server.calls = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/ecourtindia_v6/"
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_names_match_loosely():
+    entries = [{"code": "1", "name": "New Delhi"}, {"code": "2", "name": "North Delhi"}]
+    assert normalize_name(" New-Delhi ") == "new delhi"
+    assert pick(entries, "new", "district")["code"] == "1"
+    assert pick(entries, "2", "district")["name"] == "North Delhi"
+    with pytest.raises(DirectoryError, match="ambiguous"):
+        pick(entries, "delhi", "district")
+    with pytest.raises(DirectoryError, match="no district"):
+        pick(entries, "south", "district")
+
+def test_parse_location():
+    assert parse_location("Delhi | New Delhi | Patiala House") == ("Delhi", "New Delhi", "Patiala House")
+    assert parse_location("https://x.in/list?a=1|2|3") is None
+
+def test_resolve_fetches_only_the_lists_it_needs_and_caches_them(portal, tmp_path):
+    path = str(tmp_path / "dir.json")
+    d = CourtDirectory(path=path, portal=portal.url)
+    r = d.resolve("delhi", "new delhi", "patiala")
+    assert (r["state_code"], r["dist_code"], r["complex_code"], r["est_codes"]) == ("26", "8", "1070001", ["1", "2"])
+    assert "court_complex_code=1070001" in r["url"] and "est_code=1%2C2" in r["url"]
+    assert [c[1] for c in portal.calls] == ["cause_list/index", "casestatus/fillDistrict", "casestatus/fillcomplex"]
+    portal.calls.clear()
+    assert CourtDirectory(path=path, portal=portal.url).resolve("Delhi", "New Delhi", "Patiala")["url"] == r["url"]
+    assert portal.calls == []
+
+def test_pin_overrides_the_portal_url(portal, tmp_path):
+    d = CourtDirectory(path=str(tmp_path / "dir.json"), portal=portal.url)
+    assert d.pin("delhi", "new delhi", "family", "https://district.example/board")["pinned"]
+    assert d.resolve("delhi", "new delhi", "family")["url"] == "https://district.example/board"
+
+def test_stale_list_is_used_when_the_portal_is_down(portal, tmp_path):
+    path = str(tmp_path / "dir.json")
+    CourtDirectory(path=path, portal=portal.url).states()
+    d = CourtDirectory(path=path, portal=portal.url, ttl=0)
+    d._fetch_states = lambda: (_ for _ in ()).throw(OSError("portal down"))
+    assert [s["name"] for s in d.states()] == ["Delhi", "Maharashtra"]
+
+def test_unreachable_portal_is_a_usage_error(tmp_path, monkeypatch, capsys):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url")
+    add_location_args(parser)
+    args = parser.parse_args(["--state", "Delhi", "--district", "New Delhi", "--complex", "Patiala"])
+    monkeypatch.setattr(court_directory, "_default",
+                        CourtDirectory(path=str(tmp_path / "dir.json"), portal="http://127.0.0.1:9/"))
+    with pytest.raises(SystemExit):
+        resolve_location(args, parser)
+    assert "could not fetch the court directory" in capsys.readouterr().err
+
+def test_unpinned_portal_url_warns(portal, tmp_path, monkeypatch, capsys):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url")
+    add_location_args(parser)
+    args = parser.parse_args(["--state", "Delhi", "--district", "New Delhi", "--complex", "Patiala"])
+    monkeypatch.setattr(court_directory, "_default", CourtDirectory(path=str(tmp_path / "dir.json"), portal=portal.url))
+    assert "court_complex_code=1070001" in resolve_location(args, parser)
+    assert "captcha-protected" in capsys.readouterr().out
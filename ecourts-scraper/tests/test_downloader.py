@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+
+from downloader import Manifest, download_many, fetch_file, local_filename, stream_many
+
+def _links(server, paths):
+    return [{"url": server.url(p)} for p in paths]
+
+def test_local_filename():
+    assert local_filename("https://x.in/a/b/cause%20list.pdf?x=1") == "cause%20list.pdf"
+    assert local_filename("https://x.in/") == "file.pdf"
+
+def test_download_and_conditional_rerun(http_files, tmp_path):
+    http_files.files["/a/one.pdf"] = b"%PDF one"
+    links = _links(http_files, ["/a/one.pdf"])
+    [(_, path, err)] = download_many(links, str(tmp_path), workers=2)
+    assert err is None and open(path, "rb").read() == b"%PDF one"
+    entry = Manifest(str(tmp_path)).get("one.pdf")
+    assert entry["url"] == links[0]["url"] and not entry["partial"]
+    assert entry["etag"] and entry["size"] == 8
+    assert fetch_file(links[0]["url"], str(tmp_path)) == (path, "unchanged")
+
+def test_same_basename_from_two_urls_gets_two_files(http_files, tmp_path):
+    http_files.files["/a/cause.pdf"] = b"%PDF judge A"
+    http_files.files["/b/cause.pdf"] = b"%PDF judge B"
+    links = _links(http_files, ["/a/cause.pdf", "/b/cause.pdf"])
+    results = download_many(links, str(tmp_path), workers=2)
+    paths = [path for _, path, err in results]
+    assert all(err is None for _, _, err in results)
+    assert len(set(paths)) == 2
+    assert [open(p, "rb").read() for p in paths] == [b"%PDF judge A", b"%PDF judge B"]
+
+    manifest = Manifest(str(tmp_path))
+    for link, path in zip(links, paths):
+        fname, entry = manifest.lookup(link["url"])
+        assert fname == os.path.basename(path) and entry["url"] == link["url"]
+    # A rerun maps each URL back to the same file and revalidates it against its own ETag.
+    assert [fetch_file(l["url"], str(tmp_path)) for l in links] == [(p, "unchanged") for p in paths]
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".part")]
+
+def test_name_for_is_stable_across_reloads(tmp_path):
+    manifest = Manifest(str(tmp_path))
+    a = manifest.name_for("http://h/a/cause.pdf")
+    b = manifest.name_for("http://h/b/cause.pdf")
+    assert a == "cause.pdf" and b != a and b.startswith("cause-") and b.endswith(".pdf")
+    manifest.update(a, size=1)
+    again = Manifest(str(tmp_path))
+    assert again.name_for("http://h/b/cause.pdf") == b
+    assert again.name_for("http://h/a/cause.pdf") == a
+
+def test_stream_many_yields_data_and_saves(http_files, tmp_path):
+    http_files.files["/x.pdf"] = b"%PDF x"
+    http_files.files["/missing.pdf"] = None
+    got = {item["url"]: (data, path, err) for item, data, path, err in
+           stream_many(_links(http_files, ["/x.pdf", "/missing.pdf"]), str(tmp_path), workers=2)}
+    data, path, err = got[http_files.url("/x.pdf")]
+    assert data == b"%PDF x" and open(path, "rb").read() == data and err is None
+    assert got[http_files.url("/missing.pdf")][2] is not None
+    with open(tmp_path / "manifest.json", encoding="utf-8") as fh:
+        assert json.load(fh)["x.pdf"]["sha256"]
+
+def test_partial_download_is_resumed_with_range(http_files, tmp_path):
+    body = b"%PDF " + bytes(range(256)) * 40
+    http_files.files["/big.pdf"] = body
+    url = http_files.url("/big.pdf")
+    path, status = fetch_file(url, str(tmp_path))
+    etag = Manifest(str(tmp_path)).get("big.pdf")["etag"]
+    # Simulate a transfer cut off after 1000 bytes.
+    os.replace(path, path + ".part")
+    with open(path + ".part", "r+b") as fh:
+        fh.truncate(1000)
+    Manifest(str(tmp_path)).update("big.pdf", partial=True)
+    assert fetch_file(url, str(tmp_path)) == (path, "resumed")
+    assert http_files.headers[-1]["Range"] == "bytes=1000-" and http_files.headers[-1]["If-Range"] == etag
+    assert open(path, "rb").read() == body
+    entry = Manifest(str(tmp_path)).get("big.pdf")
+    assert not entry["partial"] and entry["sha256"] == hashlib.sha256(body).hexdigest()
+
+def test_changed_file_is_downloaded_again(http_files, tmp_path):
+    http_files.files["/a.pdf"] = b"%PDF v1"
+    url = http_files.url("/a.pdf")
+    path, _ = fetch_file(url, str(tmp_path))
+    http_files.files["/a.pdf"] = b"%PDF v2"
+    assert fetch_file(url, str(tmp_path)) == (path, "downloaded")
+    assert open(path, "rb").read() == b"%PDF v2"
@@ -0,0 +1,46 @@
+from html_parse import CauseListPage, is_pdf_ref, make_soup
+
+HTML = """
+<html><body>
+<a href="/lists/j1.pdf">Judge One</a>
+<a href="display.php?file=j2.pdf"> Judge Two </a>
+<a href="/lists/j1.pdf">duplicate</a>
+<a href="/about.html">About</a>
+<iframe src="/lists/frame.PDF?v=2"></iframe>
+<table>
+  <tr><th>Sr</th><th>Case</th><th>Court</th></tr>
+  <tr><td>1</td><td>CS 1234/2025 Ram vs Shyam</td><td>Court of Civil Judge</td></tr>
+  <tr><td>2</td><td>DLND010000012024 A vs B</td><td>Bench II</td></tr>
+</table>
+</body></html>
+"""
+
+def test_is_pdf_ref():
+    assert is_pdf_ref("a.PDF?v=2")
+    assert is_pdf_ref("show.php?id=3&file=x.pdf")
+    assert not is_pdf_ref("index.html?next=pdf")
+
+def test_links_and_rows_in_one_pass():
+    page = CauseListPage(make_soup(HTML), "http://h/court/")
+    assert page.pdf_links == [
+        {"url": "http://h/lists/j1.pdf", "text": "Judge One"},
+        {"url": "http://h/court/display.php?file=j2.pdf", "text": "Judge Two"},
+        {"url": "http://h/lists/frame.PDF?v=2", "text": "iframe_pdf"},
+    ]
+    assert len(page.rows) == 3
+    assert len(CauseListPage(make_soup(HTML), "http://h/", iframe_text=None).pdf_links) == 2
+
+def test_find_returns_serial_and_court():
+    page = CauseListPage(make_soup(HTML), "http://h/")
+    [hit] = page.find("dlnd010000012024")
+    assert hit["serial"] == "2" and hit["court"] == "Bench II"
+    assert page.find("not listed") == []
+
+def test_full_tree_parse_keeps_other_elements():
+    assert make_soup(HTML, full=True).find("body") is not None
+    assert make_soup(HTML).find("body") is None
+
+def test_find_matches_case_numbers_in_any_spelling():
+    page = CauseListPage(make_soup(HTML), "http://h/")
+    for query in ("CS 1234/2025", "civil suit 1234 of 2025", "ram vs shyam"):
+        assert [h["serial"] for h in page.find(query)] == ["1"]
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+
+import cause_list_index  # noqa: E402
+import lookup_server  # noqa: E402
+from lookup_server import LookupService, create_app  # noqa: E402
+
+BOARD = "Court of Judge 1\n1. CS/1234/2025 A vs B\n2. Crl 5/2024 C vs D"
+
+@pytest.fixture
+def outputs(make_pdf, tmp_path):
+    out = tmp_path / "outputs"
+    make_pdf(out / "site" / "2025-10-19" / "j1.pdf", [BOARD])
+    return out
+
+def test_search_endpoint_and_cache(outputs):
+    service = LookupService(str(outputs))
+    client = create_app(service).test_client()
+    r = client.get("/search", query_string={"q": "civil suit 1234 of 2025"}).get_json()
+    assert not r["cached"] and len(r["hits"]) == 1
+    assert r["hits"][0]["date"] == "2025-10-19" and r["hits"][0]["serial"] == "1"
+    assert client.get("/search", query_string={"q": "Civil Suit 1234 of 2025 "}).get_json()["cached"]
+    assert client.get("/search").status_code == 400
+    assert client.get("/healthz").get_json()["cached_queries"] == 1
+
+def test_refresh_invalidates_cache(outputs, make_pdf):
+    service = LookupService(str(outputs))
+    hits, cached = service.search("Crl 5/2024")
+    assert len(hits) == 1 and not cached
+    assert service.search("Crl 5/2024") == (hits, True)
+    generation = service.generation
+    make_pdf(outputs / "site" / "2025-10-20" / "j1.pdf", [BOARD])
+    assert service.refresh()["added"] == 1
+    hits, cached = service.search("Crl 5/2024")
+    assert not cached and len(hits) == 2 and service.generation == generation + 1
+    assert service.refresh()["added"] == 0 and service.generation == generation + 1
+
+def test_concurrent_requests_load_a_pdfs_rows_once(outputs, monkeypatch):
+    service = LookupService(str(outputs), rows_cache_size=1)
+    calls = []
+    def slow_rows(pdf):
+        calls.append(pdf)
+        time.sleep(0.05)
+        return [{"page": 1, "text": "x", "serial": "1", "court": None}]
+    monkeypatch.setattr(lookup_server, "load_rows", slow_rows)
+    pdf = str(outputs / "site" / "2025-10-19" / "j1.pdf")
+    threads = [threading.Thread(target=service._rows_for, args=(pdf,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [pdf] and not service._loading
+    service._rows_for("other.pdf")
+    assert list(service._rows) == ["other.pdf"]
+
+def test_queries_do_not_rerun_the_schema(outputs, monkeypatch):
+    service = LookupService(str(outputs))
+    monkeypatch.setattr(cause_list_index, "open_index", lambda path: pytest.fail("schema set up per query"))
+    assert len(service.search("Crl 5/2024")[0]) == 1
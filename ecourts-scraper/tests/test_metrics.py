@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from metrics import RunMetrics, timed_stage
+
+def test_stage_counts_time_and_failures():
+    m = RunMetrics()
+    with m.stage("download", item="a.pdf") as rec:
+        rec.add(bytes=1000, retries=1)
+    with pytest.raises(ValueError):
+        with m.stage("download", item="b.pdf"):
+            raise ValueError("boom")
+    s = m.report()["stages"]["download"]
+    assert (s["calls"], s["bytes"], s["retries"], s["failures"]) == (2, 1000, 1, 1)
+    assert [i.get("error") for i in m.report()["items"]] == [None, "ValueError: boom"]
+
+def test_merge_adds_worker_snapshots():
+    parent, worker = RunMetrics(), RunMetrics()
+    parent.record("search", 1.0, item="a", pages=2)
+    worker.record("search", 2.0, item="b", pages=3)
+    parent.merge(worker.snapshot_and_reset())
+    s = parent.report()["stages"]["search"]
+    assert (s["calls"], s["seconds"], s["pages"], s["pages_per_s"]) == (2, 3.0, 5, 1.67)
+    assert worker.report()["stages"] == {}
+
+def test_timed_stage_uses_the_item_argument(monkeypatch):
+    import metrics
+    m = RunMetrics()
+    monkeypatch.setattr(metrics, "stage", m.stage)
+
+    @timed_stage("parse")
+    def parse(path):
+        return path.upper()
+
+    assert parse("x.pdf") == "X.PDF"
+    assert m.report()["items"][0]["item"] == "x.pdf"
+
+def test_reports_and_sections(tmp_path):
+    m = RunMetrics()
+    m.add_section("hosts", lambda: {"h": 1})
+    m.record("download", 0.5, bytes=2_000_000)
+    with open(m.write_report(str(tmp_path), "2025-10-19"), encoding="utf-8") as fh:
+        rep = json.load(fh)
+    assert rep["hosts"] == {"h": 1} and rep["stages"]["download"]["mb_per_s"] == 4.0
+    text = open(m.write_prometheus(str(tmp_path / "m.prom")), encoding="utf-8").read()
+    assert 'ecourts_stage_bytes_total{stage="download"} 2000000' in text
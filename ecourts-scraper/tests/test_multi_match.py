@@ -0,0 +1,47 @@
+import random
+
+from multi_match import AhoCorasick
+from pdf_search import find_occurrences, find_occurrences_multi, load_queries, search_folder_multi, search_pdf
+
+def _brute_force(patterns, text):
+    low = text.lower()
+    return sorted((i, pid) for pid, p in enumerate(patterns)
+                  for i in range(len(low)) if low.startswith(p.lower(), i))
+
+def test_finds_overlapping_and_nested_patterns():
+    ac = AhoCorasick(["he", "she", "his", "hers", "HE"])
+    assert ac.patterns == ["he", "she", "his", "hers"]
+    text = "ushers and HIS hens"
+    assert sorted(ac.finditer(text)) == _brute_force(ac.patterns, text)
+
+def test_matches_brute_force_on_random_text():
+    rng = random.Random(7)
+    patterns = ["".join(rng.choice("ab/1") for _ in range(rng.randint(1, 5))) for _ in range(40)]
+    ac = AhoCorasick(patterns)
+    text = "".join(rng.choice("ab/1AB") for _ in range(2000))
+    assert sorted(ac.finditer(text)) == _brute_force(ac.patterns, text)
+
+def test_multi_gives_the_same_hits_as_single_queries():
+    text = "DLND01-000001-2024 listed; CS 12/2025 and cs 12/2025 again; aaaa"
+    queries = ["cs 12/2025", "DLND01", "aa", "absent"]
+    multi = find_occurrences_multi(text, AhoCorasick(queries))
+    for q in queries:
+        assert multi.get(q, []) == find_occurrences(text, q)
+
+def test_search_folder_multi(make_pdf, tmp_path):
+    make_pdf(tmp_path / "j1.pdf", ["1. CS-1234-2025 A vs B\n2. CNRDLND010000012024 C vs D"])
+    make_pdf(tmp_path / "j2.pdf", ["1. C.S. No. 1234 of 2025 E vs F"])
+    qfile = tmp_path / "queries.txt"
+    qfile.write_text("# watch\nCS 1234/2025\n\nDLND010000012024\nnot listed\n", encoding="utf-8")
+    queries = load_queries(str(qfile))
+    assert queries == ["CS 1234/2025", "DLND010000012024", "not listed"]
+    results = search_folder_multi(str(tmp_path), queries, out_json=str(tmp_path / "out.json"))
+    found = sorted((r["query"], r["pdf"].rsplit("/", 1)[-1], r["num_hits"]) for r in results)
+    assert found == [("CS 1234/2025", "j1.pdf", 1), ("CS 1234/2025", "j2.pdf", 1), ("DLND010000012024", "j1.pdf", 1)]
+
+def test_search_folder_multi_matches_single_queries(make_pdf, tmp_path):
+    make_pdf(tmp_path / "b.pdf", ["1. CIVIL 1234 2025 A vs B\n2. CS/1234/2025 C vs D\n3. Bail Matters 3056/2025 E vs F"])
+    queries = ["CIVIL 1234 2025", "bail matters", "FIR/123/2024"]
+    multi = {r["query"]: r["num_hits"] for r in search_folder_multi(str(tmp_path), queries, use_cache=False)}
+    single = {q: search_pdf(str(tmp_path / "b.pdf"), q, use_cache=False)["num_hits"] for q in queries}
+    assert multi == {q: n for q, n in single.items() if n}
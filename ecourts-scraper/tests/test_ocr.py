@@ -0,0 +1,40 @@
+import ocr
+import pdf_pool
+import text_cache
+from text_cache import extract_pages
+
+def _ocr_workers(_path):
+    return ocr.settings["workers"]
+
+def test_pool_workers_do_not_start_ocr_pools(tmp_path):
+    paths = [str(tmp_path / f"{i}.pdf") for i in range(3)]
+    results = list(pdf_pool.map_pdfs(_ocr_workers, paths, workers=2))
+    assert [(r, e) for _, r, e in results] == [(1, None)] * 3
+
+def test_ocr_flags_configure_ocr(monkeypatch):
+    import argparse
+    monkeypatch.setattr(ocr, "settings", dict(ocr.settings, enabled=True))
+    parser = argparse.ArgumentParser()
+    ocr.add_ocr_args(parser)
+    ocr.apply_ocr_args(parser.parse_args(["--ocr-dpi", "150", "--ocr-lang", "eng+hin"]))
+    assert (ocr.settings["enabled"], ocr.settings["dpi"], ocr.settings["lang"]) == (True, 150, "eng+hin")
+    ocr.apply_ocr_args(parser.parse_args(["--no-ocr"]))
+    assert not ocr.settings["enabled"] and not ocr.ocr_available()
+
+def test_scanned_pages_are_extracted_once_and_ocrd_in_one_batch(make_pdf, tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path / "scan.pdf", ["text 0", "", "text 2", ""])
+    extracted, batches = [], []
+    page_text = text_cache._page_text
+    monkeypatch.setattr(text_cache, "_page_text", lambda page: extracted.append(page.number) or page_text(page))
+    monkeypatch.setattr(ocr, "ocr_available", lambda: True)
+    monkeypatch.setattr(ocr, "ocr_pages", lambda doc, idx, cache=None: batches.append(list(idx)) or
+                        {i: f"ocr {i}" for i in idx})
+    pages = [p.strip() for p in extract_pages(pdf)]
+    assert pages == ["text 0", "ocr 1", "text 2", "ocr 3"]
+    assert extracted == [0, 1, 2, 3]
+    assert batches == [[1, 3]]
+
+def test_no_ocr_when_unavailable(make_pdf, tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path / "scan.pdf", ["", "text"])
+    monkeypatch.setattr(ocr, "ocr_available", lambda: False)
+    assert [p.strip() for p in extract_pages(pdf)] == ["", "text"]
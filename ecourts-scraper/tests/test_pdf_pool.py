@@ -0,0 +1,29 @@
+import os
+
+from pdf_pool import map_pdfs
+from pdf_search import search_folder
+
+def _work(path, suffix):
+    name = os.path.basename(path)
+    if name.startswith("bad"):
+        raise ValueError("cannot parse")
+    if name.startswith("crash"):
+        os._exit(1)  # a PDF that takes its worker process down
+    return name + suffix
+
+def test_serial_results_in_sorted_order():
+    out = list(map_pdfs(_work, ["b.pdf", "a.pdf", "bad.pdf"], "!"))
+    assert out == [("a.pdf", "a.pdf!", None), ("b.pdf", "b.pdf!", None), ("bad.pdf", None, "ValueError: cannot parse")]
+
+def test_pool_isolates_a_crashing_pdf():
+    paths = ["a.pdf", "b.pdf", "crash.pdf", "d.pdf", "e.pdf"]
+    out = {p: (r, e) for p, r, e in map_pdfs(_work, paths, "!", workers=2)}
+    assert out["crash.pdf"] == (None, "worker process crashed")
+    assert all(out[p] == (p + "!", None) for p in paths if p != "crash.pdf")
+
+def test_parallel_search_matches_serial(make_pdf, tmp_path):
+    for i in range(4):
+        make_pdf(tmp_path / f"j{i}.pdf", [f"Court {i}\n1. CS {i}/2025 A vs B", "2. CS 7/2025 C vs D"])
+    serial = search_folder(str(tmp_path), "CS 7/2025", workers=1)
+    parallel = search_folder(str(tmp_path), "CS 7/2025", workers=3)
+    assert parallel == serial and [r["num_hits"] for r in serial] == [1, 1, 1, 1]
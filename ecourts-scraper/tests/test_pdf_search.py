@@ -0,0 +1,26 @@
+import os
+
+from pdf_search import search_folder, search_pdf
+
+BOARD = "Court of Judge 1\n1. CIVIL 1234 2025 A vs B\n2. CS/1234/2025 C vs D\n3. Bail Matters 3056/2025 E vs F"
+
+def test_free_text_query(make_pdf, tmp_path):
+    pdf = make_pdf(tmp_path / "b.pdf", [BOARD, "Court of Judge 2\nnothing"])
+    r = search_pdf(pdf, "court of judge", use_cache=False)
+    assert [h["page"] for h in r["hits"]] == [1, 2]
+
+def test_first_hit_stops_reading_pages(make_pdf, tmp_path, monkeypatch):
+    import text_cache
+    pdf = make_pdf(tmp_path / "long.pdf", ["CS 1/2025 listed"] + [f"page {i}" for i in range(2, 10)])
+    read = []
+    page_text = text_cache._page_text
+    monkeypatch.setattr(text_cache, "_page_text", lambda page: read.append(page.number) or page_text(page))
+    r = search_pdf(pdf, "CS 1/2025", use_cache=False, max_hits=1)
+    assert r["num_hits"] == 1 and read == [0]
+
+def test_stop_on_first_skips_remaining_pdfs(make_pdf, tmp_path):
+    make_pdf(tmp_path / "a.pdf", ["nothing here"])
+    make_pdf(tmp_path / "b.pdf", ["CS 1/2025 listed"])
+    make_pdf(tmp_path / "c.pdf", ["CS 1/2025 listed too"])
+    results = search_folder(str(tmp_path), "CS 1/2025", use_cache=False, max_hits=1, stop_on_first=True)
+    assert [(os.path.basename(r["pdf"]), r["num_hits"]) for r in results] == [("a.pdf", 0), ("b.pdf", 1)]
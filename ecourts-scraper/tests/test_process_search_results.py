@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from process_search_results import iter_records, summarize
+
+ENTRIES = [{"pdf": f"p{i}.pdf", "num_hits": i % 2, "hits": [{"snippet": "x, [y]", "heuristics": {}}] * (i % 2)}
+           for i in range(50)]
+
+def test_reads_json_list_in_small_chunks(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps(ENTRIES, indent=2), encoding="utf-8")
+    assert list(iter_records(str(path), chunk_size=7)) == ENTRIES
+
+def test_reads_json_lines(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in ENTRIES), encoding="utf-8")
+    assert list(iter_records(str(path), chunk_size=64)) == ENTRIES
+    assert list(iter_records(str(path))) == ENTRIES
+
+def test_empty_and_truncated_files(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text("[]", encoding="utf-8")
+    assert list(iter_records(str(path))) == []
+    path.write_text(json.dumps(ENTRIES)[:-20], encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_records(str(path), chunk_size=16))
+
+def test_summarize(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in ENTRIES[:2]), encoding="utf-8")
+    summarize(str(path), str(tmp_path / "s.csv"))
+    lines = (tmp_path / "s.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[1:] == ["p0.pdf,0,,", 'p1.pdf,1,,,"x, [y]"']
+
+def test_summarize_rows_matches_like_pdf_search(make_pdf, tmp_path):
+    from pdf_search import search_pdf_rows
+    from process_search_results import summarize_rows
+    pdf = make_pdf(tmp_path / "board" / "j1.pdf",
+                   ["Court of Judge 1\n1. CIVIL 1234 2025 A vs B\n2. CS/1234/2025 C vs D\n3. Crl 5/2024 E vs F"])
+    for query in ("CS 1234/2025", "civil suit 1234 of 2025", "A vs B"):
+        summarize_rows(str(tmp_path / "board"), query, str(tmp_path / "s.csv"))
+        num_hits = (tmp_path / "s.csv").read_text(encoding="utf-8").splitlines()[1].split(",")[1]
+        assert int(num_hits) == search_pdf_rows(pdf, query)["num_hits"] > 0
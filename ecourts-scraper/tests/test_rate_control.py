@@ -0,0 +1,111 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+import requests
+
+import rate_control
+from rate_control import CircuitOpenError, HostController
+
+class FakeResponse:
+    def __init__(self, status, retry_after=None, latency=0.01):
+        self.status_code = status
+        self.headers = {"Retry-After": retry_after} if retry_after else {}
+        self.elapsed = timedelta(seconds=latency)
+
+    def close(self):
+        pass
+
+class FakeSession:
+    """Answers with the scripted statuses in order (an exception instance is raised instead)."""
+
+    def __init__(self, script, delay=0.0):
+        self.script = list(script)
+        self.delay = delay
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        item = self.script.pop(0) if self.script else 200
+        if isinstance(item, BaseException):
+            raise item
+        return FakeResponse(item)
+
+@pytest.fixture(autouse=True)
+def fast(monkeypatch):
+    monkeypatch.setattr(rate_control, "backoff_delay", lambda attempt, retry_after=None: 0)
+    monkeypatch.setattr(rate_control, "RETRIES", 3)
+    monkeypatch.setattr(rate_control, "CIRCUIT_THRESHOLD", 3)
+
+def _get(ctl, session):
+    with ctl.request(session, "GET", "http://h/x") as r:
+        return r.status_code
+
+def test_retries_until_success():
+    ctl = HostController("h", rate=1000)
+    session = FakeSession([503, requests.ConnectionError("reset"), 200])
+    assert _get(ctl, session) == 200 and session.calls == 3
+    s = ctl.report()
+    assert (s["ok"], s["server_errors"], s["connection_errors"], s["retries"]) == (1, 1, 1, 2)
+
+def test_last_error_status_is_returned(monkeypatch):
+    monkeypatch.setattr(rate_control, "CIRCUIT_THRESHOLD", 10)
+    ctl = HostController("h", rate=1000)
+    assert _get(ctl, FakeSession([500] * 4)) == 500
+
+def test_throttling_halves_rate():
+    ctl = HostController("h", rate=1000)
+    _get(ctl, FakeSession([429, 200]))
+    assert ctl.report()["throttled"] == 1 and ctl.rate < 1000
+
+def test_circuit_opens_and_fails_fast():
+    ctl = HostController("h", rate=1000)
+    with pytest.raises(requests.ConnectionError):
+        _get(ctl, FakeSession([requests.ConnectionError("down")] * 4))
+    session = FakeSession([])
+    with pytest.raises(CircuitOpenError):
+        _get(ctl, session)
+    assert session.calls == 0 and ctl.report()["circuit"] == "open"
+    # After the cool-down one probe goes through and closes the circuit again.
+    ctl.open_until = time.monotonic() - 1
+    assert _get(ctl, session) == 200 and ctl.report()["circuit"] == "closed"
+
+def test_concurrency_stays_within_the_limit():
+    ctl = HostController("h", max_concurrency=3, rate=1000)
+    session = FakeSession([], delay=0.02)
+    threads = [threading.Thread(target=_get, args=(ctl, session)) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert session.calls == 12 and 1 <= ctl.peak_in_flight <= 3
+
+def test_rate_limit_spaces_requests():
+    ctl = HostController("h", rate=20)
+    session = FakeSession([])
+    t0 = time.monotonic()
+    for _ in range(25):
+        _get(ctl, session)
+    # 20 tokens up front, then 5 more at 20/s.
+    assert time.monotonic() - t0 >= 0.2
+
+def test_other_errors_give_back_the_slot():
+    ctl = HostController("h", max_concurrency=2, rate=1000)
+    session = FakeSession([requests.TooManyRedirects("loop"), requests.exceptions.InvalidURL("bad"), 200])
+    for _ in range(2):
+        with pytest.raises(requests.RequestException):
+            _get(ctl, session)
+    assert ctl.in_flight == 0 and session.calls == 2
+    assert _get(ctl, session) == 200
+    s = ctl.report()
+    assert (s["errors"], s["ok"], s["retries"]) == (2, 1, 0)
+
+def test_probe_is_given_back_after_another_error():
+    ctl = HostController("h", rate=1000)
+    ctl.open_until = time.monotonic() - 1
+    with pytest.raises(KeyboardInterrupt):
+        _get(ctl, FakeSession([KeyboardInterrupt()]))
+    assert not ctl.probing and ctl.in_flight == 0
+    assert _get(ctl, FakeSession([])) == 200 and ctl.report()["circuit"] == "closed"
@@ -0,0 +1,24 @@
+import os
+
+from ecourts_scraper import search_pdf_text, stream_search
+
+def _serve(http_files, make_pdf, tmp_path):
+    for name, text in (("j1", "1. CS 1234/2025 A vs B"), ("j2", "1. Crl 5/2024 C vs D")):
+        pdf = make_pdf(tmp_path / "src" / f"{name}.pdf", [text])
+        http_files.files[f"/{name}.pdf"] = open(pdf, "rb").read()
+    return [{"url": http_files.url(f"/{n}.pdf"), "text": n} for n in ("j1", "j2")]
+
+def test_search_from_memory_without_saving(http_files, make_pdf, tmp_path):
+    links = _serve(http_files, make_pdf, tmp_path)
+    downloaded, searched = stream_search(links, None, "civil suit 1234 of 2025", workers=2)
+    assert [d["url"] for d in downloaded] == [links[0]["url"], links[1]["url"]]
+    assert all(d["path"] is None for d in downloaded)
+    assert [len(searched[link["url"]]) for link in links] == [1, 0]
+
+def test_streamed_pdfs_are_saved_and_match_a_disk_search(http_files, make_pdf, tmp_path):
+    links = _serve(http_files, make_pdf, tmp_path)
+    out = tmp_path / "out"
+    downloaded, searched = stream_search(links, str(out), "Crl 5/2024", workers=2)
+    paths = [d["path"] for d in downloaded]
+    assert all(os.path.exists(p) for p in paths)
+    assert {p: searched[p] for p in paths} == {p: search_pdf_text(p, "Crl 5/2024") for p in paths}
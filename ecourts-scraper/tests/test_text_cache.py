@@ -0,0 +1,63 @@
+import hashlib
+import sqlite3
+
+import pytest
+
+from text_cache import TextCache
+
+@pytest.fixture
+def cache(tmp_path):
+    c = TextCache(str(tmp_path / "cache.sqlite"))
+    yield c
+    c.close()
+
+def test_extract_and_cache(make_pdf, tmp_path, cache):
+    pdf = make_pdf(tmp_path / "a.pdf", ["first page", "second page"])
+    pages = list(cache.iter_page_texts(pdf))
+    assert [p.strip() for p in pages] == ["first page", "second page"]
+    digest = cache.file_sha256(pdf)
+    assert cache.get(digest) == pages
+    assert cache.page_texts(pdf) == pages
+
+def test_partly_read_document_is_not_cached(make_pdf, tmp_path, cache):
+    pdf = make_pdf(tmp_path / "a.pdf", ["first page", "second page"])
+    next(iter(cache.iter_page_texts(pdf)))
+    assert cache.get(cache.file_sha256(pdf)) is None
+
+def test_in_memory_data(make_pdf, tmp_path, cache):
+    pdf = make_pdf(tmp_path / "a.pdf", ["from memory"])
+    data = open(pdf, "rb").read()
+    assert [p.strip() for p in cache.iter_page_texts("not/on/disk.pdf", data=data)] == ["from memory"]
+
+def test_eviction_keeps_cache_bounded(cache):
+    cache.max_bytes = 200
+    cache.put("old", ["x" * 50 + str(i) for i in range(20)])
+    cache.put("new", ["fresh"])
+    assert cache.get("new") == ["fresh"]
+    assert cache.get("old") is None
+
+def test_ocr_results_and_file_digests_count_towards_the_bound(make_pdf, tmp_path, cache):
+    noise = "".join(hashlib.sha256(str(i).encode()).hexdigest() for i in range(20))
+    pdf = make_pdf(tmp_path / "a.pdf", ["page"])
+    cache.file_sha256(pdf)
+    cache.put_ocr("img-old", "eng", noise)
+    cache.max_bytes = cache.size_bytes()
+    cache.put_ocr("img-new", "eng", noise[::-1])
+    assert cache.size_bytes() <= cache.max_bytes
+    assert cache.get_ocr("img-new", "eng") == noise[::-1]
+    assert cache.get_ocr("img-old", "eng") is None
+    assert cache.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+
+def test_old_cache_gains_last_used_columns(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, sha256 TEXT NOT NULL);"
+        "CREATE TABLE ocr (image_sha256 TEXT NOT NULL, lang TEXT NOT NULL, text BLOB NOT NULL,"
+        " PRIMARY KEY (image_sha256, lang));"
+    )
+    conn.close()
+    cache = TextCache(path)
+    cache.put_ocr("img", "eng", "scanned")
+    assert cache.get_ocr("img", "eng") == "scanned"
+    cache.close()
@@ -0,0 +1,30 @@
+from watchlist import WatchStore
+
+def test_check_all_reads_each_board_once_per_watch(make_pdf, tmp_path, monkeypatch):
+    import watchlist
+    from watchlist import check_all, iter_alerts
+    out = tmp_path / "outputs"
+    pdf = make_pdf(out / "site" / "2025-10-19" / "j1.pdf",
+                   ["Court of Judge 1\n1. CS/1234/2025 A vs B\n2. Crl 5/2024 C vs D"])
+    store = WatchStore(str(tmp_path / "watchlist.sqlite"))
+    store.add("civil suit 1234 of 2025")
+    read = []
+    find_listings = watchlist.find_listings
+
+    def counting(path, matcher):
+        read.append(sum(map(len, matcher.by_text.values())))
+        return find_listings(path, matcher)
+
+    monkeypatch.setattr(watchlist, "find_listings", counting)
+
+    [alert] = check_all(store, str(out))
+    assert (alert["site"], alert["date"], alert["serial"], alert["pdf"]) == ("site", "2025-10-19", "1", pdf)
+    # Nothing new: the board is not read again.
+    assert check_all(store, str(out)) == [] and read == [1]
+    # A new watch runs alone against the unchanged board.
+    store.add("Crl 5/2024")
+    assert [a["serial"] for a in check_all(store, str(out))] == ["2"] and read == [1, 1]
+    # A re-published board is read again, but listings are alerted only once.
+    make_pdf(pdf, ["Court of Judge 1\n1. CS/1234/2025 A vs B\n2. Crl 5/2024 C vs D\n3. New row"])
+    assert check_all(store, str(out)) == [] and read == [1, 1, 2]
+    assert len(list(iter_alerts(store.alerts_path))) == 2
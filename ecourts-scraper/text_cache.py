@@ -0,0 +1,425 @@
+"""
+text_cache.py
+Persistent cache of extracted PDF text, keyed by the file's sha256 and the extractor version.
+
+Text is stored per page (zlib-compressed) in one SQLite file, so repeated searches over the
+same outputs/<site>/<date>/ folders only run PyMuPDF on new or changed PDFs. The cache is
+bounded by total size: documents, OCR results and remembered file digests all count, and
+the least recently used entries of any kind are evicted first.
+
+Each page's case-key map (case_keys.page_key_map) is built when its text is cached and is
+stored next to it, so a case-number or CNR query over cached text is a dictionary lookup.
+
+Pages without a text layer are OCR'd through ocr.py when Tesseract is available; the OCR
+settings become part of the extractor key, and OCR text is also cached per page image.
+
+Location: $ECOURTS_TEXT_CACHE, or ~/.cache/ecourts-scraper/text_cache.sqlite by default.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import ocr
+from blob_store import packed_sha256, pdf_data
+from case_keys import KEYS_VERSION, page_key_map
+from metrics import METRICS
+
+try:
+    import fitz
+    EXTRACTOR_VERSION = f"pymupdf-{fitz.VersionBind}-text-1"
+except Exception:
+    fitz = None
+    EXTRACTOR_VERSION = None
+
+def extractor_version():
+    """Cache key for the current extraction settings (text layer, plus OCR when active)."""
+    ocr_key = ocr.ocr_version()
+    return f"{EXTRACTOR_VERSION}+{ocr_key}" if ocr_key else EXTRACTOR_VERSION
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "ECOURTS_TEXT_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ecourts-scraper", "text_cache.sqlite"),
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    sha256 TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    num_pages INTEGER NOT NULL,
+    nbytes INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (sha256, extractor)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    sha256 TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    page_no INTEGER NOT NULL,
+    text BLOB NOT NULL,
+    PRIMARY KEY (sha256, extractor, page_no)
+);
+CREATE TABLE IF NOT EXISTS page_keys (
+    sha256 TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    page_no INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    keys BLOB NOT NULL,
+    PRIMARY KEY (sha256, extractor, page_no)
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    last_used REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS ocr (
+    image_sha256 TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    text BLOB NOT NULL,
+    last_used REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (image_sha256, lang)
+);
+CREATE INDEX IF NOT EXISTS docs_last_used ON docs (last_used);
+"""
+
+# Approximate stored size of one files row besides its path (digest, size, mtime, last_used).
+FILE_ROW_BYTES = 96
+# A remembered digest's last_used is refreshed at most this often, to keep hits read-only.
+TOUCH_INTERVAL = 3600
+
+def sha256_of(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _compress(text):
+    return zlib.compress(text.encode("utf-8"))
+
+def _compress_keys(key_map):
+    return _compress(json.dumps(key_map, separators=(",", ":")))
+
+def _decompress_keys(blob):
+    return {k: [tuple(span) for span in spans] for k, spans in json.loads(zlib.decompress(blob)).items()}
+
+def _page_text(page):
+    try:
+        return page.get_text("text") or ""
+    except Exception:
+        return ""
+
+def iter_extract_pages(pdf_path, cache=None, data=None):
+    """
+    Run PyMuPDF page by page, yielding each page's text; only one page is held at a time.
+    From the first page without a text layer on (when OCR is available), page texts are
+    held back instead: the text-less ones are OCR'd in one parallel batch once the last
+    page has been read, and everything held back is then yielded in page order.
+    `data` is the PDF's bytes when it is already in memory; `pdf_path` then only names it.
+    A packed PDF (blob_store.py) is read from its mapped blob.
+    """
+    if fitz is None:
+        raise RuntimeError("PyMuPDF not installed. Run: pip install pymupdf")
+    if data is None:
+        data = pdf_data(pdf_path)
+    # Timed by hand: only time spent here counts, not the consumer's work between pages.
+    t0 = time.perf_counter()
+    doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(pdf_path)
+    held = None
+    elapsed = 0.0
+    pages = 0
+    try:
+        for i, page in enumerate(doc):
+            text = _page_text(page)
+            pages += 1
+            if held is None and ocr.is_text_less(text) and ocr.ocr_available():
+                held = []
+            if held is not None:
+                held.append(text)
+                continue
+            elapsed += time.perf_counter() - t0
+            yield text
+            t0 = time.perf_counter()
+        if held:
+            first = pages - len(held)
+            todo = [first + k for k, text in enumerate(held) if ocr.is_text_less(text)]
+            ocr_text = ocr.ocr_pages(doc, todo, cache=cache)
+            for k, text in enumerate(held):
+                elapsed += time.perf_counter() - t0
+                yield ocr_text.get(first + k, text)
+                t0 = time.perf_counter()
+    finally:
+        doc.close()
+        METRICS.record("extract_text", elapsed + time.perf_counter() - t0, item=str(pdf_path), pages=pages)
+
+def extract_pages(pdf_path, cache=None):
+    """Run PyMuPDF over every page and return a list of page texts."""
+    return list(iter_extract_pages(pdf_path, cache=cache))
+
+class TextCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        for table in ("files", "ocr"):
+            # Caches created before these tables counted towards max_bytes.
+            if "last_used" not in {r[1] for r in self.conn.execute(f"PRAGMA table_info({table})")}:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.conn.close()
+
+    def file_sha256(self, pdf_path):
+        """sha256 of a file, reusing the stored digest while size and mtime are unchanged."""
+        packed = packed_sha256(pdf_path)
+        if packed:
+            return packed
+        st = os.stat(pdf_path)
+        key = os.path.abspath(pdf_path)
+        row = self.conn.execute("SELECT size, mtime, sha256, last_used FROM files WHERE path = ?", (key,)).fetchone()
+        now = time.time()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime:
+            if now - row[3] > TOUCH_INTERVAL:
+                with self.conn:
+                    self.conn.execute("UPDATE files SET last_used = ? WHERE path = ?", (now, key))
+            return row[2]
+        digest = sha256_of(pdf_path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", (key, st.st_size, st.st_mtime, digest, now)
+            )
+        self.evict()
+        return digest
+
+    def has(self, sha256, extractor=None):
+        extractor = extractor or extractor_version()
+        row = self.conn.execute(
+            "SELECT 1 FROM docs WHERE sha256 = ? AND extractor = ?", (sha256, extractor)
+        ).fetchone()
+        return row is not None
+
+    def iter_pages(self, sha256, extractor=None):
+        """Yield cached page texts one at a time (caller must check has() first)."""
+        extractor = extractor or extractor_version()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE docs SET last_used = ? WHERE sha256 = ? AND extractor = ?", (time.time(), sha256, extractor)
+            )
+        rows = self.conn.execute(
+            "SELECT text FROM pages WHERE sha256 = ? AND extractor = ? ORDER BY page_no", (sha256, extractor)
+        ).fetchall()
+        for r in rows:
+            yield zlib.decompress(r[0]).decode("utf-8")
+
+    def get(self, sha256, extractor=None):
+        if not self.has(sha256, extractor):
+            return None
+        return list(self.iter_pages(sha256, extractor))
+
+    def put(self, sha256, pages, extractor=None):
+        self.put_compressed(sha256, [_compress(p) for p in pages], extractor,
+                            [_compress_keys(page_key_map(p)) for p in pages])
+
+    def put_compressed(self, sha256, blobs, extractor=None, key_blobs=None):
+        extractor = extractor or extractor_version()
+        now = time.time()
+        with self.conn:
+            self.conn.execute("DELETE FROM pages WHERE sha256 = ? AND extractor = ?", (sha256, extractor))
+            self.conn.execute("DELETE FROM page_keys WHERE sha256 = ? AND extractor = ?", (sha256, extractor))
+            self.conn.executemany(
+                "INSERT INTO pages VALUES (?, ?, ?, ?)", [(sha256, extractor, i, b) for i, b in enumerate(blobs)]
+            )
+            if key_blobs is not None:
+                self.conn.executemany(
+                    "INSERT INTO page_keys VALUES (?, ?, ?, ?, ?)",
+                    [(sha256, extractor, i, KEYS_VERSION, b) for i, b in enumerate(key_blobs)],
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?, ?)",
+                (sha256, extractor, len(blobs), sum(len(b) for b in blobs) + sum(len(b) for b in key_blobs or ()),
+                 now, now),
+            )
+        self.evict()
+
+    def page_key_maps(self, sha256, extractor=None):
+        """Stored case-key maps of a cached document's pages; None if missing or from another KEYS_VERSION."""
+        extractor = extractor or extractor_version()
+        rows = self.conn.execute(
+            "SELECT version, keys FROM page_keys WHERE sha256 = ? AND extractor = ? ORDER BY page_no",
+            (sha256, extractor),
+        ).fetchall()
+        if not rows or any(r[0] != KEYS_VERSION for r in rows):
+            return None
+        return [_decompress_keys(r[1]) for r in rows]
+
+    def put_page_keys(self, sha256, key_maps, extractor=None):
+        """Store key maps for a document cached without them (or with an older KEYS_VERSION)."""
+        extractor = extractor or extractor_version()
+        blobs = [_compress_keys(m) for m in key_maps]
+        with self.conn:
+            old = self.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(keys)), 0) FROM page_keys WHERE sha256 = ? AND extractor = ?",
+                (sha256, extractor),
+            ).fetchone()[0]
+            self.conn.execute("DELETE FROM page_keys WHERE sha256 = ? AND extractor = ?", (sha256, extractor))
+            self.conn.executemany(
+                "INSERT INTO page_keys VALUES (?, ?, ?, ?, ?)",
+                [(sha256, extractor, i, KEYS_VERSION, b) for i, b in enumerate(blobs)],
+            )
+            self.conn.execute(
+                "UPDATE docs SET nbytes = nbytes + ? WHERE sha256 = ? AND extractor = ?",
+                (sum(len(b) for b in blobs) - old, sha256, extractor),
+            )
+
+    def get_ocr(self, image_sha256, lang):
+        row = self.conn.execute(
+            "SELECT text FROM ocr WHERE image_sha256 = ? AND lang = ?", (image_sha256, lang)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE ocr SET last_used = ? WHERE image_sha256 = ? AND lang = ?", (time.time(), image_sha256, lang)
+            )
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put_ocr(self, image_sha256, lang, text):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ocr VALUES (?, ?, ?, ?)", (image_sha256, lang, _compress(text), time.time())
+            )
+        self.evict()
+
+    def size_bytes(self):
+        """Bytes counted against max_bytes: documents (text and key maps), OCR text and file digests."""
+        return self.conn.execute(
+            "SELECT (SELECT COALESCE(SUM(nbytes), 0) FROM docs)"
+            " + (SELECT COALESCE(SUM(LENGTH(text)), 0) FROM ocr)"
+            " + (SELECT COALESCE(SUM(LENGTH(path) + ?), 0) FROM files)",
+            (FILE_ROW_BYTES,),
+        ).fetchone()[0]
+
+    def evict(self):
+        """Drop the least recently used documents, OCR results and file digests until the cache fits in max_bytes."""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return
+        victims = {"doc": [], "ocr": [], "file": []}
+        for kind, a, b, nbytes, _ in self.conn.execute(
+            "SELECT 'doc', sha256, extractor, nbytes, last_used FROM docs"
+            " UNION ALL SELECT 'ocr', image_sha256, lang, LENGTH(text), last_used FROM ocr"
+            " UNION ALL SELECT 'file', path, NULL, LENGTH(path) + ?, last_used FROM files"
+            " ORDER BY 5",
+            (FILE_ROW_BYTES,),
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            victims[kind].append((a, b) if kind != "file" else (a,))
+            total -= nbytes
+        with self.conn:
+            self.conn.executemany("DELETE FROM pages WHERE sha256 = ? AND extractor = ?", victims["doc"])
+            self.conn.executemany("DELETE FROM page_keys WHERE sha256 = ? AND extractor = ?", victims["doc"])
+            self.conn.executemany("DELETE FROM docs WHERE sha256 = ? AND extractor = ?", victims["doc"])
+            self.conn.executemany("DELETE FROM ocr WHERE image_sha256 = ? AND lang = ?", victims["ocr"])
+            self.conn.executemany("DELETE FROM files WHERE path = ?", victims["file"])
+
+    def _iter_pages(self, pdf_path, data, keys):
+        """
+        Yield (text, key_map) per page; key_map is None on a cache hit unless `keys` is set.
+        On a miss pages are extracted lazily, each page's key map is built as it is read, and
+        the document is cached only if the caller consumes every page.
+        """
+        digest = hashlib.sha256(data).hexdigest() if data is not None else self.file_sha256(pdf_path)
+        if self.has(digest):
+            if not keys:
+                for text in self.iter_pages(digest):
+                    yield text, None
+                return
+            key_maps = self.page_key_maps(digest)
+            if key_maps is not None:
+                yield from zip(self.iter_pages(digest), key_maps)
+                return
+            # Cached before key maps were stored, or by another KEYS_VERSION: build them once.
+            key_maps = []
+            for text in self.iter_pages(digest):
+                key_maps.append(page_key_map(text))
+                yield text, key_maps[-1]
+            self.put_page_keys(digest, key_maps)
+            return
+        blobs, key_blobs = [], []
+        for text in iter_extract_pages(pdf_path, cache=self, data=data):
+            key_map = page_key_map(text)
+            blobs.append(_compress(text))
+            key_blobs.append(_compress_keys(key_map))
+            yield text, key_map
+        self.put_compressed(digest, blobs, key_blobs=key_blobs)
+
+    def iter_page_texts(self, pdf_path, data=None):
+        """Yield per-page text for `pdf_path` (or its in-memory bytes `data`), see _iter_pages."""
+        pages = self._iter_pages(pdf_path, data, keys=False)
+        try:
+            for text, _ in pages:
+                yield text
+        finally:
+            pages.close()
+
+    def iter_keyed_pages(self, pdf_path, data=None):
+        """Yield (text, case_keys.page_key_map(text)) per page, the maps read from the cache when stored."""
+        return self._iter_pages(pdf_path, data, keys=True)
+
+    def page_texts(self, pdf_path):
+        """Per-page text for `pdf_path`, extracting and storing it only on a cache miss."""
+        digest = self.file_sha256(pdf_path)
+        pages = self.get(digest)
+        if pages is None:
+            pages = extract_pages(pdf_path, cache=self)
+            self.put(digest, pages)
+        return pages
+
+_local = threading.local()
+
+def default_cache():
+    """The default cache for the calling thread (SQLite connections cannot cross threads)."""
+    cache = getattr(_local, "cache", None)
+    if cache is None:
+        cache = _local.cache = TextCache()
+    return cache
+
+def reset_default_cache():
+    """Forget the inherited connection; call in a freshly forked child process."""
+    global _local
+    _local = threading.local()
+
+def iter_page_texts(pdf_path, use_cache=True, data=None):
+    """
+    Lazily yield per-page text of a PDF, served from the default cache unless `use_cache` is False.
+    Pass the PDF's bytes as `data` to read it from memory instead of from `pdf_path`.
+    """
+    if not use_cache:
+        return iter_extract_pages(pdf_path, data=data)
+    return default_cache().iter_page_texts(pdf_path, data=data)
+
+def iter_keyed_page_texts(pdf_path, use_cache=True, data=None):
+    """
+    Lazily yield (text, case-key map) per page: the maps are stored in the default cache
+    alongside the text, or built page by page when `use_cache` is False.
+    """
+    if not use_cache:
+        return ((text, page_key_map(text)) for text in iter_extract_pages(pdf_path, data=data))
+    return default_cache().iter_keyed_pages(pdf_path, data=data)
+
+def page_texts(pdf_path, use_cache=True):
+    """Per-page text of a PDF, served from the default cache unless `use_cache` is False."""
+    if not use_cache:
+        return extract_pages(pdf_path)
+    return default_cache().page_texts(pdf_path)
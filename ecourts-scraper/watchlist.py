@@ -0,0 +1,326 @@
+"""
+watchlist.py
+Persistent watchlist of CNRs / case numbers, checked against every newly downloaded cause list.
+
+Watched cases live in <out>/watchlist.sqlite together with the sha256 of each PDF already
+checked. After a download, ecourts_scraper.py and download_all_judges.py (and batch_crawl.py)
+hand over that run's PDFs: only boards whose hash has not been checked yet are read, and
+only watches added since a board was last checked are run against an unchanged one. Every
+listing of a watched case is appended to <out>/watch_alerts.jsonl with site, date, court,
+serial and page, so the work per run follows the new boards, not history x watchlist size.
+
+Case numbers and CNRs match in any spelling (case_keys.py), anything else as plain text.
+Boards are read as structured rows (cause_list_rows.load_rows) so court and serial come
+from the row; scanned boards without rows fall back to page text. A listing is alerted
+once, even when its board is re-published.
+
+Usage:
+  (venv) python watchlist.py --out outputs add "DLND010000012024" "CS 1234/2025" --label "client A"
+  (venv) python watchlist.py --out outputs list
+  (venv) python watchlist.py --out outputs check
+  (venv) python watchlist.py --out outputs alerts --since 2025-10-01
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from case_keys import merge_spans, page_key_map, query_key
+from cause_list_index import iter_cause_list_pdfs, load_judge_names
+from cause_list_rows import load_rows
+from change_detect import pdf_hashes
+from metrics import stage
+from multi_match import AhoCorasick
+from ocr import add_ocr_args, apply_ocr_args
+from pdf_search import heuristics_parse, load_queries
+from text_cache import default_cache, iter_keyed_page_texts
+
+WATCHLIST_NAME = "watchlist.sqlite"
+ALERTS_NAME = "watch_alerts.jsonl"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query TEXT NOT NULL UNIQUE,
+    key TEXT,
+    label TEXT,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checked (
+    pdf_path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    watch_id INTEGER NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alerted (
+    watch_id INTEGER NOT NULL,
+    pdf_path TEXT NOT NULL,
+    serial TEXT NOT NULL,
+    PRIMARY KEY (watch_id, pdf_path, serial)
+);
+"""
+
+class Matcher:
+    """
+    Finds every watch in a text: each watch's literal text in one Aho-Corasick pass, plus the
+    other spellings of keyed watches (case numbers / CNRs) via the page key map.
+    """
+
+    def __init__(self, watches):
+        self.by_key = {}
+        self.by_text = {}
+        for w in watches:
+            if w["key"]:
+                self.by_key.setdefault(w["key"], []).append(w)
+            self.by_text.setdefault(w["query"].lower(), []).append(w)
+        self.automaton = AhoCorasick(list(self.by_text))
+
+    def matches(self, text, key_map=None):
+        """
+        Yield (watch, start, end) for every watched case found in `text`, one per offset.
+        `key_map` is the text's case_keys.page_key_map() when already built (e.g. from the text cache).
+        """
+        watches = {}
+        spans = {}
+        if self.by_key:
+            for key, key_spans in (page_key_map(text) if key_map is None else key_map).items():
+                for w in self.by_key.get(key, ()):
+                    watches[w["id"]] = w
+                    spans.setdefault(w["id"], []).extend(key_spans)
+        if self.by_text:
+            for i, pid in self.automaton.finditer(text):
+                q = self.automaton.patterns[pid]
+                for w in self.by_text[q]:
+                    watches[w["id"]] = w
+                    spans.setdefault(w["id"], []).append((i, i + len(q)))
+        for wid, found in spans.items():
+            for a, b in merge_spans(found):
+                yield watches[wid], a, b
+
+class WatchStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+        self.alerts_path = os.path.join(os.path.dirname(os.path.abspath(path)), ALERTS_NAME)
+
+    def close(self):
+        self.conn.close()
+
+    def add(self, query, label=None):
+        """Watch `query`; returns False if it (or another spelling of the same case) is already watched."""
+        query = query.strip()
+        key = query_key(query)
+        if key and self.conn.execute("SELECT 1 FROM watches WHERE key = ?", (key,)).fetchone():
+            return False
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO watches (query, key, label, added_at) VALUES (?, ?, ?, ?)",
+                (query, key, label, time.time()),
+            )
+        return cur.rowcount == 1
+
+    def remove(self, query):
+        key = query_key(query)
+        with self.conn:
+            if key:
+                cur = self.conn.execute("DELETE FROM watches WHERE key = ?", (key,))
+            else:
+                cur = self.conn.execute("DELETE FROM watches WHERE query = ?", (query.strip(),))
+        return cur.rowcount
+
+    def watches(self):
+        return [dict(r) for r in self.conn.execute("SELECT * FROM watches ORDER BY id")]
+
+    def pending_since(self, pdf_path, sha256):
+        """
+        Id of the last watch already run against this exact PDF content: None for a new or
+        changed PDF (every watch must run), else only watches with a larger id are new to it.
+        """
+        row = self.conn.execute("SELECT sha256, watch_id FROM checked WHERE pdf_path = ?", (pdf_path,)).fetchone()
+        return row["watch_id"] if row and row["sha256"] == sha256 else None
+
+    def mark_checked(self, pdf_path, sha256, watch_id):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO checked VALUES (?, ?, ?, ?)",
+                              (pdf_path, sha256, watch_id, time.time()))
+
+    def record_alerts(self, alerts):
+        """Append the alerts not seen before to the alerts log; returns those."""
+        fresh = []
+        with self.conn:
+            for a in alerts:
+                cur = self.conn.execute("INSERT OR IGNORE INTO alerted VALUES (?, ?, ?)",
+                                        (a["watch_id"], a["pdf"], a["serial"] or f"p{a['page']}"))
+                if cur.rowcount:
+                    fresh.append(a)
+        if fresh:
+            with open(self.alerts_path, "a", encoding="utf-8") as fh:
+                for a in fresh:
+                    fh.write(json.dumps(a, ensure_ascii=False) + "\n")
+        return fresh
+
+def _snippet(text, start, end, context=80):
+    return " ".join(text[max(0, start - context):end + context].split())
+
+def find_listings(pdf_path, matcher):
+    """(watch, page, serial, court, snippet) for every listing of a watched case in one PDF."""
+    found = []
+    rows = list(load_rows(pdf_path))
+    for row in rows:
+        seen = set()
+        for w, a, b in matcher.matches(row["text"]):
+            if w["id"] not in seen:
+                seen.add(w["id"])
+                found.append((w, row["page"], row["serial"], row["court"], row["text"]))
+    if rows:
+        return found
+    # No structured rows (e.g. an OCR'd scan): fall back to page text and snippet heuristics.
+    for page_no, (text, key_map) in enumerate(iter_keyed_page_texts(pdf_path), start=1):
+        for w, a, b in matcher.matches(text, key_map):
+            snippet = _snippet(text, a, b)
+            heur = heuristics_parse(snippet)
+            found.append((w, page_no, heur["serial"], heur["court"], snippet))
+    return found
+
+def check_pdfs(store, pdfs, site, date_str):
+    """
+    Run the watchlist over `pdfs` ([{"path", "sha256", "url", "court"}, ...]) from one
+    <site>/<date> folder, skipping content already checked. Returns the new alerts.
+    """
+    all_watches = store.watches()
+    if not all_watches:
+        return []
+    last_id = all_watches[-1]["id"]
+    matchers = {}
+    alerts = []
+    for p in pdfs:
+        sha = p.get("sha256") or default_cache().file_sha256(p["path"])
+        since = store.pending_since(p["path"], sha)
+        if since == last_id:
+            continue
+        since = since or 0
+        if since not in matchers:
+            matchers[since] = Matcher([w for w in all_watches if w["id"] > since])
+        try:
+            with stage("watch", item=p["path"]):
+                found = find_listings(p["path"], matchers[since])
+        except Exception as e:
+            print("  ! watchlist check failed for", p["path"], e)
+            continue
+        for w, page, serial, court, snippet in found:
+            alerts.append({
+                "alerted_at": datetime.now().isoformat(timespec="seconds"),
+                "watch_id": w["id"],
+                "query": w["query"],
+                "label": w["label"],
+                "site": site,
+                "date": date_str,
+                "court": court or p.get("court"),
+                "serial": serial,
+                "page": page,
+                "pdf": p["path"],
+                "pdf_url": p.get("url"),
+                "snippet": snippet,
+            })
+        store.mark_checked(p["path"], sha, last_id)
+    return store.record_alerts(alerts)
+
+def print_alerts(alerts):
+    for a in alerts:
+        print(f"[!] Watchlist: '{a['query']}' listed on {a['date']} at {a['site']}, "
+              f"serial {a['serial'] or '?'}, court: {a['court'] or '?'} (p.{a['page']} of {os.path.basename(a['pdf'])})")
+
+def check_downloads(out_folder, date_str, downloaded, store_path):
+    """
+    Download-step hook: check `downloaded` ([{"url", "path", "court"}, ...]) against the
+    watchlist at `store_path`. Does nothing when no watchlist was set up there.
+    """
+    if not os.path.exists(store_path):
+        return []
+    pdfs = [d for d in downloaded if d.get("path")]
+    hashes = pdf_hashes(out_folder, [d["url"] for d in pdfs])
+    store = WatchStore(store_path)
+    try:
+        alerts = check_pdfs(store, [dict(d, sha256=hashes.get(d["url"])) for d in pdfs],
+                            os.path.basename(os.path.dirname(os.path.abspath(out_folder))), date_str)
+    finally:
+        store.close()
+    print_alerts(alerts)
+    if alerts:
+        print(f"[+] {len(alerts)} watchlist alert(s) appended to", store.alerts_path)
+    return alerts
+
+def check_all(store, out_root):
+    """Check every PDF under <out_root>/<site>/<date>/ (new boards, and old ones for new watches)."""
+    by_folder = {}
+    for site, date, pdf in iter_cause_list_pdfs(out_root):
+        by_folder.setdefault((site, date, pdf.parent), []).append(pdf)
+    alerts = []
+    for (site, date, folder), pdfs in by_folder.items():
+        judges = load_judge_names(folder)
+        alerts += check_pdfs(store, [{"path": str(p), "court": judges.get(p.name)} for p in pdfs], site, date)
+    return alerts
+
+def iter_alerts(path, since=None):
+    try:
+        fh = open(path, "r", encoding="utf-8")
+    except OSError:
+        return
+    with fh:
+        for line in fh:
+            if line.strip():
+                a = json.loads(line)
+                if not since or a["date"] >= since:
+                    yield a
+
+def main():
+    parser = argparse.ArgumentParser(description="Watchlist of CNRs / case numbers checked after every download")
+    parser.add_argument("--out", default="outputs", help="Outputs folder containing <site>/<date>/ PDFs")
+    parser.add_argument("--watchlist", help=f"Watchlist store (default: <out>/{WATCHLIST_NAME})")
+    add_ocr_args(parser)
+    sub = parser.add_subparsers(dest="command", required=True)
+    a = sub.add_parser("add", help="Watch one or more CNRs / case numbers")
+    a.add_argument("queries", nargs="*", help="CNR, case number in any spelling, or text")
+    a.add_argument("--file", help="Also add every line of this file (blank and '#' lines ignored)")
+    a.add_argument("--label", help="Free-text label stored with the watches (client, matter, ...)")
+    r = sub.add_parser("remove", help="Stop watching cases")
+    r.add_argument("queries", nargs="+")
+    sub.add_parser("list", help="Show watched cases")
+    sub.add_parser("check", help="Check every downloaded PDF not checked yet (and all PDFs for new watches)")
+    al = sub.add_parser("alerts", help="Show the alerts log")
+    al.add_argument("--since", help="Only listings on or after this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    apply_ocr_args(args)
+
+    store = WatchStore(args.watchlist or os.path.join(args.out, WATCHLIST_NAME))
+    try:
+        if args.command == "add":
+            queries = list(args.queries)
+            if args.file:
+                queries += load_queries(args.file)
+            added = sum(store.add(q, label=args.label) for q in queries)
+            print(f"[+] {added} watch(es) added, {len(queries) - added} already watched.")
+        elif args.command == "remove":
+            print(f"[+] {sum(store.remove(q) for q in args.queries)} watch(es) removed.")
+        elif args.command == "list":
+            for w in store.watches():
+                print(f"{w['query']:30} {w['key'] or '(text)':22} {w['label'] or ''}")
+        elif args.command == "check":
+            t0 = time.perf_counter()
+            alerts = check_all(store, args.out)
+            print_alerts(alerts)
+            print(f"[+] {len(alerts)} new alert(s) in {time.perf_counter() - t0:.2f}s. Log: {store.alerts_path}")
+        else:
+            for a in iter_alerts(store.alerts_path, since=args.since):
+                print(f"{a['date']}  {a['site']}  serial {a['serial'] or '?':>4}  {a['query']}  {a['court'] or ''}")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()